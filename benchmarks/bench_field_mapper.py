@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark for FieldMapper.map_product_fields
+
+Compares the precompiled converter plan against the previous per-value
+if/elif dispatch on the Eshop type name.
+
+Usage:
+    python benchmarks/bench_field_mapper.py
+    python benchmarks/bench_field_mapper.py --rows 100000
+"""
+
+import argparse
+import logging
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.field_mapper import FieldMapper
+
+FIELD_MAPPINGS = {
+    "ItemName": "name",
+    "ItemPrice": "price",
+    "ItemDescription": "description",
+    "ItemStock": "stock"
+}
+ESHOP_FIELD_TYPES = {"id": "int", "sku": "str", "name": "str", "price": "float", "description": "str", "stock": "int"}
+
+
+class LegacyFieldMapper(FieldMapper):
+    """FieldMapper with the previous per-value type-name dispatch"""
+
+    def cast_to_eshop_type(self, value, eshop_field):
+        if value is None:
+            return None
+
+        target_type = self.eshop_field_types.get(eshop_field, type(value).__name__)
+
+        try:
+            if target_type == "str":
+                return str(value)
+            elif target_type == "int":
+                return int(value)
+            elif target_type == "float":
+                return float(value)
+            elif target_type == "bool":
+                return bool(value)
+            elif target_type == "list":
+                return list(value)
+            elif target_type == "dict":
+                return dict(value)
+            else:
+                return value
+        except Exception as e:
+            logging.warning(f"Failed to cast value {value} to type {target_type}: {e}")
+            return value
+
+    def map_product_fields(self, erp_product, eshop_product):
+        mapped_product = {}
+        mapped_product["id"] = eshop_product.get("id")
+        mapped_product["sku"] = eshop_product.get("sku")
+        for erp_field, eshop_field in self.field_mappings.items():
+            erp_value = erp_product.get(erp_field, eshop_product.get(eshop_field))
+            mapped_product[eshop_field] = self.cast_to_eshop_type(erp_value, eshop_field)
+        return mapped_product
+
+
+def make_pairs(rows):
+    """Generate (ERP, Eshop) product pairs"""
+    pairs = []
+    for i in range(rows):
+        sku = f"SKU-{i:08d}"
+        erp_product = {
+            "ItemSku": sku,
+            "ItemName": f"Product {i}",
+            "ItemPrice": f"{i % 1000 + 1}.{i % 100:02d}",
+            "ItemDescription": "Generated product description",
+            "ItemStock": str(i % 50)
+        }
+        eshop_product = {"id": i, "sku": sku, "name": "", "price": 1.0, "description": "", "stock": 0}
+        pairs.append((erp_product, eshop_product))
+    return pairs
+
+
+def bench(mapper, pairs):
+    """Return rows per second for mapping every pair"""
+    map_product_fields = mapper.map_product_fields
+    start = time.perf_counter()
+    for erp_product, eshop_product in pairs:
+        map_product_fields(erp_product, eshop_product)
+    return len(pairs) / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark FieldMapper.map_product_fields")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    pairs = make_pairs(args.rows)
+    legacy = LegacyFieldMapper(FIELD_MAPPINGS, {}, ESHOP_FIELD_TYPES)
+    compiled = FieldMapper(FIELD_MAPPINGS, {}, ESHOP_FIELD_TYPES)
+
+    assert all(legacy.map_product_fields(*pair) == compiled.map_product_fields(*pair) for pair in pairs[:1000])
+
+    before = bench(legacy, pairs)
+    after = bench(compiled, pairs)
+    print(f"rows:     {args.rows}")
+    print(f"before:   {before:,.0f} rows/sec")
+    print(f"after:    {after:,.0f} rows/sec")
+    print(f"speedup:  {after / before:.2f}x")
+
+
+if __name__ == "__main__":
+    main()
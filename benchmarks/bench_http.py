@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the async HTTP ERP source and Eshop sink
+
+Runs against the in-process stub server with simulated per-request latency and
+compares one request at a time with concurrent pooled requests.
+
+Usage:
+    python benchmarks/bench_http.py
+    python benchmarks/bench_http.py --products 50000 --latency 0.05
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.http_adapters import AsyncHttpClient, HttpErpSource, HttpEshopSink
+from tests.stub_server import StubServer
+
+
+async def bench(products, latency, page_size, in_flight):
+    """Return (fetch seconds, write seconds, connections opened)"""
+    async with StubServer(products, latency=latency) as server:
+        async with AsyncHttpClient(server.url, max_connections=in_flight) as client:
+            start = time.perf_counter()
+            fetched = await HttpErpSource(client, page_size=page_size, max_in_flight=in_flight).fetch_products()
+            fetch_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            await HttpEshopSink(client, batch_size=page_size, max_in_flight=in_flight).write_products(fetched)
+            write_seconds = time.perf_counter() - start
+
+            assert len(server.received) == len(products)
+            return fetch_seconds, write_seconds, client.connections_opened
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the async HTTP adapters")
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--page-size", type=int, default=250)
+    parser.add_argument("--latency", type=float, default=0.02, help="Simulated seconds per request")
+    parser.add_argument("--in-flight", type=int, nargs="+", default=[1, 4, 16])
+    args = parser.parse_args()
+
+    products = [{"ItemSku": f"SKU-{i:08d}", "ItemPrice": "10.00", "ItemStock": "5"} for i in range(args.products)]
+
+    print(f"{'in flight':>10} {'fetch s':>10} {'write s':>10} {'rows/sec':>12} {'connections':>12}")
+    for in_flight in args.in_flight:
+        fetch_seconds, write_seconds, connections = asyncio.run(
+            bench(products, args.latency, args.page_size, in_flight)
+        )
+        rows_per_sec = args.products / (fetch_seconds + write_seconds)
+        print(f"{in_flight:>10} {fetch_seconds:>10.3f} {write_seconds:>10.3f} {rows_per_sec:>12,.0f} {connections:>12}")
+
+
+if __name__ == "__main__":
+    main()
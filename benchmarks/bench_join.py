@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ERP SKU join used by ProductSync
+
+Builds the SKU index and matches every Eshop product against it at several
+catalog sizes. Time per SKU should stay flat as the catalog grows.
+
+Usage:
+    python benchmarks/bench_join.py
+    python benchmarks/bench_join.py --sizes 1000 100000 --legacy-max 5000
+"""
+
+import argparse
+import os
+import sys
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.product_sync import ProductSync
+
+DEFAULT_SIZES = [1_000, 100_000, 1_000_000]
+
+
+def make_config():
+    """Minimal sync configuration for the benchmark"""
+    return {
+        "ERP_DATA_FILE": "",
+        "ESHOP_DATA_FILE": "",
+        "OUTPUT_FILE": "",
+        "LOG_FILE": os.devnull,
+        "ERP_IDENTIFIER_FIELD": "ItemSku",
+        "ESHOP_IDENTIFIER_FIELD": "sku",
+        "FIELD_MAPPINGS": {},
+        "VALIDATION_RULES": {}
+    }
+
+
+def make_products(size):
+    """Generate matching ERP and Eshop product lists (Eshop in reverse order)"""
+    erp_products = [{"ItemSku": f"SKU-{i:08d}", "ItemPrice": "10.00"} for i in range(size)]
+    eshop_products = [{"id": i, "sku": f"SKU-{i:08d}"} for i in reversed(range(size))]
+    return erp_products, eshop_products
+
+
+def bench_indexed(sync, erp_products, eshop_products):
+    """Time index build plus one lookup per Eshop product"""
+    start = time.perf_counter()
+    erp_index = sync._build_erp_index(erp_products, "ItemSku")
+    matched = sum(1 for product in eshop_products if erp_index.get(product["sku"]) is not None)
+    return time.perf_counter() - start, matched
+
+
+def bench_linear(sync, erp_products, eshop_products):
+    """Time the legacy per-product linear scan"""
+    start = time.perf_counter()
+    matched = sum(
+        1 for product in eshop_products
+        if sync._find_matching_erp_product(erp_products, product["sku"], "ItemSku") is not None
+    )
+    return time.perf_counter() - start, matched
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the ERP SKU join")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--legacy-max", type=int, default=2_000,
+                        help="Largest size to also run the legacy linear scan on")
+    args = parser.parse_args()
+
+    sync = ProductSync(make_config())
+
+    print(f"{'SKUs':>10} {'method':>8} {'seconds':>10} {'ns/SKU':>10} {'matched':>10}")
+    for size in args.sizes:
+        erp_products, eshop_products = make_products(size)
+
+        elapsed, matched = bench_indexed(sync, erp_products, eshop_products)
+        print(f"{size:>10} {'index':>8} {elapsed:>10.4f} {elapsed / size * 1e9:>10.1f} {matched:>10}")
+
+        if size <= args.legacy_max:
+            elapsed, matched = bench_linear(sync, erp_products, eshop_products)
+            print(f"{size:>10} {'linear':>8} {elapsed:>10.4f} {elapsed / size * 1e9:>10.1f} {matched:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the JSON codec backends
+
+Generates an Eshop catalog of about --size-mb megabytes, then for every
+installed backend times loading it the way DataLoader does and writing the
+products through SyncedProductWriter in each output layout. Parsing the default
+500 MB catalog needs several GB of memory.
+
+Usage:
+    python benchmarks/bench_json.py
+    python benchmarks/bench_json.py --size-mb 100
+"""
+
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src import json_codec
+from src.output_writer import SyncedProductWriter
+
+# Output layouts as (OUTPUT_FORMAT, OUTPUT_COMPACT)
+LAYOUTS = (("json", False), ("json", True), ("ndjson", False), ("ndjson", True))
+
+
+def write_catalog(file_path, size_mb):
+    """Write Eshop products shaped like the sample data until the file reaches size_mb
+
+    Returns:
+        Number of products written
+    """
+    limit = size_mb * 2 ** 20
+    count = 0
+    with open(file_path, "w", encoding="utf-8") as f:
+        f.write('{"products": [')
+        while f.tell() < limit:
+            batch = [json_codec.get_codec("json").dumps({
+                "id": i + 1,
+                "name": f"Προϊόν {i}" if i % 10 == 0 else f"Product {i}",
+                "price": float(i % 1000) + 0.99,
+                "sku": f"SKU-{i:08d}",
+                "stock": i % 50,
+                "description": "Generated product description",
+                "active": bool(i % 2)
+            }) for i in range(count, count + 10000)]
+            f.write((", " if count else "") + ", ".join(batch))
+            count += len(batch)
+        f.write("]}")
+    return count
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark JSON codec backends on a generated catalog")
+    parser.add_argument("--size-mb", type=int, default=500)
+    args = parser.parse_args()
+
+    backends = []
+    for backend in json_codec.BACKENDS:
+        try:
+            backends.append(json_codec.get_codec(backend).name)
+        except ValueError:
+            print(f"{backend}: not installed")
+
+    with tempfile.TemporaryDirectory() as tmpdir:
+        catalog_path = os.path.join(tmpdir, "products_eshop.json")
+        output_path = os.path.join(tmpdir, "output.json")
+        count = write_catalog(catalog_path, args.size_mb)
+        print(f"catalog: {count:,} products, {os.path.getsize(catalog_path) / 2 ** 20:,.0f} MB")
+
+        for backend in backends:
+            json_codec.set_backend(backend)
+
+            def load():
+                with open(catalog_path, "rb") as f:
+                    return json_codec.load(f)["products"]
+
+            products, load_seconds = timed(load)
+            print(f"{backend:7} load:                {load_seconds:7.2f}s")
+
+            for output_format, compact in LAYOUTS:
+                def write():
+                    with SyncedProductWriter(output_path, output_format, compact) as writer:
+                        for product in products:
+                            writer.write(product)
+
+                _, write_seconds = timed(write)
+                layout = f"{output_format}{' compact' if compact else ''}"
+                print(f"{backend:7} write {layout:15} {write_seconds:7.2f}s")
+
+            del products
+            gc.collect()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Benchmark for parsing ERP price strings
+
+Compares Money.parse (integer minor units) with float() and decimal.Decimal()
+on price strings shaped like ERP exports ("600", "32.00"), and checks that the
+Money path totals exactly like Decimal while float drifts.
+
+Usage:
+    python benchmarks/bench_money.py
+    python benchmarks/bench_money.py --count 100000
+"""
+
+import argparse
+import os
+import sys
+import time
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.money import Money, parse_minor_units
+
+
+def make_prices(count):
+    """Generate ERP price strings, a tenth of them without decimals"""
+    prices = []
+    for i in range(count):
+        if i % 10 == 0:
+            prices.append(str(i % 5000 + 1))
+        else:
+            prices.append(f"{i % 5000 + 1}.{i * 7 % 100:02d}")
+    return prices
+
+
+def bench(parse, prices):
+    """Return (values per second, parsed values) for parsing every price"""
+    start = time.perf_counter()
+    values = [parse(price) for price in prices]
+    return len(prices) / (time.perf_counter() - start), values
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark money parsing against float and Decimal")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    prices = make_prices(args.count)
+
+    float_rate, floats = bench(float, prices)
+    decimal_rate, decimals = bench(Decimal, prices)
+    decimal_minor_rate, _ = bench(lambda price: int(Decimal(price).scaleb(2)), prices)
+    minor_rate, minors = bench(parse_minor_units, prices)
+    money_rate, _ = bench(Money.parse, prices)
+
+    exact_total = sum(decimals)
+    assert Money(sum(minors)).to_decimal() == exact_total
+
+    print(f"prices:             {args.count}")
+    print(f"float():            {float_rate:,.0f} values/sec")
+    print(f"Decimal():          {decimal_rate:,.0f} values/sec")
+    print(f"Decimal -> minor:   {decimal_minor_rate:,.0f} values/sec")
+    print(f"parse_minor_units:  {minor_rate:,.0f} values/sec")
+    print(f"Money.parse:        {money_rate:,.0f} values/sec")
+    print(f"exact total:        {exact_total}")
+    print(f"float total:        {sum(floats)!r}")
+    print(f"minor units total:  {Money(sum(minors))}")
+
+
+if __name__ == "__main__":
+    main()
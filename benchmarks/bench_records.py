@@ -0,0 +1,117 @@
+#!/usr/bin/env python3
+"""
+Memory benchmark for COMPACT_RECORDS
+
+Measures, with tracemalloc, the memory held per product by the ERP index, the
+loaded Eshop products and a list of mapped products (as kept by watch mode),
+with products as parsed dicts and as slot-based records. Mapping throughput is
+reported for both.
+
+Usage:
+    python benchmarks/bench_records.py
+    python benchmarks/bench_records.py --count 100000
+"""
+
+import argparse
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.product_sync import ProductSync
+
+FIELD_MAPPINGS = {"ItemName": "name", "ItemPrice": "price", "ItemStock": "stock"}
+
+
+def make_documents(count):
+    """Generate ERP and Eshop JSON documents shaped like the sample data"""
+    erp_products = []
+    eshop_products = []
+    for i in range(count):
+        sku = f"SKU-{i:08d}"
+        erp_products.append({
+            "ItemId": str(i),
+            "ItemName": f"Product {i}",
+            "ItemPrice": f"{i % 1000 + 1}.{i % 100:02d}",
+            "ItemSku": sku,
+            "ItemStock": str(i % 50),
+            "ItemDescription": "Generated product description"
+        })
+        eshop_products.append({
+            "id": i + 1, "name": f"Old product {i}", "price": 1.0, "sku": sku, "stock": 0,
+            "description": "Generated product description", "category": "General"
+        })
+    return json.dumps({"products": erp_products}), json.dumps({"products": eshop_products})
+
+
+def traced(build):
+    """Return (result, bytes still allocated by build once it returns)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    gc.collect()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def run(compact, erp_document, eshop_document):
+    """Return (bytes per product for each structure, mapped rows per second)"""
+    sync = ProductSync({
+        "LOG_FILE": os.devnull,
+        "VALIDATION_RULES": {},
+        "FIELD_MAPPINGS": FIELD_MAPPINGS,
+        "ERP_IDENTIFIER_FIELD": "ItemSku",
+        "ESHOP_IDENTIFIER_FIELD": "sku",
+        "COMPACT_RECORDS": compact
+    })
+    sync.stats = {}
+
+    def load_erp():
+        return sync._build_erp_index(json.loads(erp_document)["products"], "ItemSku")
+
+    def load_eshop():
+        products = json.loads(eshop_document)["products"]
+        if sync.eshop_record is not None:
+            from_mapping = sync.eshop_record.from_mapping
+            for position, product in enumerate(products):
+                products[position] = from_mapping(product)
+        return products
+
+    erp_index, erp_bytes = traced(load_erp)
+    eshop_products, eshop_bytes = traced(load_eshop)
+
+    mapper = sync.create_field_mapper({}, {"name": "str", "price": "float", "stock": "int"})
+    start = time.perf_counter()
+    mapped, mapped_bytes = traced(
+        lambda: [mapper.map_product_fields(erp_index[product["sku"]], product) for product in eshop_products]
+    )
+    rate = len(mapped) / (time.perf_counter() - start)
+
+    count = len(eshop_products)
+    return (erp_bytes / count, eshop_bytes / count, mapped_bytes / count), rate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure memory per product with and without COMPACT_RECORDS")
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    erp_document, eshop_document = make_documents(args.count)
+    before, before_rate = run(False, erp_document, eshop_document)
+    after, after_rate = run(True, erp_document, eshop_document)
+
+    print(f"products:          {args.count}")
+    for label, dict_bytes, record_bytes in zip(("ERP index", "Eshop products", "mapped products"), before, after):
+        print(f"{label + ':':18s} {dict_bytes:6.0f} -> {record_bytes:6.0f} bytes/product "
+              f"({dict_bytes * args.count / 2 ** 20:,.0f} -> {record_bytes * args.count / 2 ** 20:,.0f} MB)")
+    print(f"total:             {sum(before):6.0f} -> {sum(after):6.0f} bytes/product")
+    print(f"mapping:           {before_rate:,.0f} -> {after_rate:,.0f} rows/sec (under tracemalloc)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the memory-mapped Eshop snapshot
+
+Compares loading a generated Eshop file with json.load against opening its
+snapshot (checking the source file's size and mtime, and hashing it after a
+touch) and decoding products from it, either only the fields a sync reads or
+all of them.
+
+Usage:
+    python benchmarks/bench_snapshot.py
+    python benchmarks/bench_snapshot.py --rows 100000
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.data_loader import DataLoader
+
+
+def write_catalog(file_path, rows):
+    """Write an Eshop file shaped like the sample data"""
+    products = [
+        {"id": i + 1, "name": f"Product {i}", "price": float(i % 1000) + 0.99, "sku": f"SKU-{i:08d}",
+         "stock": i % 50, "description": "Generated product description", "active": bool(i % 2)}
+        for i in range(rows)
+    ]
+    with open(file_path, "w", encoding="utf-8") as f:
+        json.dump({"products": products}, f)
+
+
+def timed(function):
+    start = time.perf_counter()
+    result = function()
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark Eshop snapshot loading against json.load")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    loader = DataLoader(os.devnull)
+    with tempfile.TemporaryDirectory() as tmpdir:
+        file_path = os.path.join(tmpdir, "products_eshop.json")
+        snapshot_path = os.path.join(tmpdir, "products_eshop.snapshot")
+        write_catalog(file_path, args.rows)
+
+        products, load_seconds = timed(lambda: loader.load_eshop_products(file_path))
+        skus, dict_scan_seconds = timed(lambda: [product.get("sku") for product in products])
+        _, write_seconds = timed(lambda: loader.write_eshop_snapshot(file_path, snapshot_path, "sku", products))
+        del products
+
+        sync_fields = ("id", "sku", "price", "stock")
+        snapshot, open_seconds = timed(lambda: loader.open_eshop_snapshot(file_path, snapshot_path, sync_fields))
+        snapshot_skus, scan_seconds = timed(lambda: [product.get("sku") for product in snapshot])
+        assert snapshot_skus == skus
+        _, find_seconds = timed(lambda: [snapshot.find(sku) for sku in skus[:100000]])
+        snapshot.close()
+
+        snapshot = loader.open_eshop_snapshot(file_path, snapshot_path)
+        _, full_seconds = timed(lambda: [product.get("sku") for product in snapshot])
+        snapshot.close()
+
+        # A new mtime with unchanged content makes open hash the JSON file
+        stat = os.stat(file_path)
+        os.utime(file_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        snapshot, touched_open_seconds = timed(lambda: loader.open_eshop_snapshot(file_path, snapshot_path))
+        assert snapshot is not None
+        snapshot.close()
+
+        print(f"rows:                {args.rows}")
+        print(f"JSON file:           {os.path.getsize(file_path) / 2 ** 20:,.0f} MB")
+        print(f"snapshot file:       {os.path.getsize(snapshot_path) / 2 ** 20:,.0f} MB")
+        print(f"json.load:           {load_seconds:.3f}s")
+        print(f"write snapshot:      {write_seconds:.3f}s")
+        print(f"open snapshot:       {open_seconds:.3f}s")
+        print(f"open after touch:    {touched_open_seconds:.3f}s (hashes the JSON file)")
+        print(f"iterate (dicts):     {dict_scan_seconds:.3f}s")
+        print(f"iterate 4 fields:    {scan_seconds:.3f}s")
+        print(f"iterate all fields:  {full_seconds:.3f}s")
+        print(f"find by SKU:         {find_seconds / min(len(skus), 100000) * 1e6:.2f} us/lookup")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,197 @@
+#!/usr/bin/env python3
+"""
+Benchmark suite for DataLoader, FieldMapper, ProductValidator and ProductSync
+
+Generates a catalog with catalog_generator.py at each size and times loading
+both files, mapping and validating every matched product, and a full
+ProductSync.sync_products() run. Results are written as JSON (by default to
+benchmarks/results/<commit>.json) and can be compared with an earlier results
+file to spot regressions between commits.
+
+Usage:
+    python benchmarks/bench_suite.py
+    python benchmarks/bench_suite.py --sizes 10000 100000 --repeat 3
+    python benchmarks/bench_suite.py --compare benchmarks/results/abc1234.json
+"""
+
+import argparse
+import gc
+import logging
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.catalog_generator import (
+    write_catalog, FIELD_MAPPINGS, VALIDATION_RULES, ERP_IDENTIFIER_FIELD, ESHOP_IDENTIFIER_FIELD
+)
+from src import json_codec
+from src.data_loader import DataLoader
+from src.field_mapper import FieldMapper
+from src.product_sync import ProductSync
+from src.validator import ProductValidator
+
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+RESULTS_DIR = os.path.join(os.path.dirname(__file__), "results")
+
+
+def git_commit():
+    """Short hash of the checked out commit, or None outside a git checkout"""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+            cwd=os.path.dirname(os.path.abspath(__file__))
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def best_of(repeat, function):
+    """Run a function repeat times and return its last result and the fastest time"""
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return result, best
+
+
+def result(seconds, rows, **extra):
+    """Benchmark result entry"""
+    return dict(seconds=round(seconds, 6), rows=rows, rows_per_sec=round(rows / seconds, 1) if seconds else None,
+                **extra)
+
+
+def run_size(size, repeat, tmpdir):
+    """Run every benchmark on a generated catalog of one size
+
+    Returns:
+        Dictionary of benchmark name -> result entry
+    """
+    catalog_dir = os.path.join(tmpdir, str(size))
+    start = time.perf_counter()
+    erp_file, eshop_file = write_catalog(catalog_dir, size)
+    results = {"generate": result(time.perf_counter() - start, size)}
+
+    loader = DataLoader(os.devnull)
+    erp_products, seconds = best_of(repeat, lambda: loader.load_erp_products(erp_file))
+    results["load_erp"] = result(seconds, len(erp_products))
+    eshop_products, seconds = best_of(repeat, lambda: loader.load_eshop_products(eshop_file))
+    results["load_eshop"] = result(seconds, len(eshop_products))
+
+    erp_index = {}
+    for erp_product in erp_products:
+        erp_index.setdefault(erp_product[ERP_IDENTIFIER_FIELD], erp_product)
+    pairs = [(erp_index[product[ESHOP_IDENTIFIER_FIELD]], product) for product in eshop_products
+             if product[ESHOP_IDENTIFIER_FIELD] in erp_index]
+    mapper = FieldMapper(FIELD_MAPPINGS, loader.get_field_types(erp_products), loader.get_field_types(eshop_products))
+    del erp_products, eshop_products, erp_index
+
+    map_product = mapper.map_product_fields
+    mapped, seconds = best_of(repeat, lambda: [map_product(erp_product, product) for erp_product, product in pairs])
+    results["field_mapper"] = result(seconds, len(pairs))
+    del pairs
+
+    validate = ProductValidator(VALIDATION_RULES).validate_product
+    failures, seconds = best_of(repeat, lambda: sum(1 for product in mapped if validate(product)))
+    results["validator"] = result(seconds, len(mapped), failed=failures)
+    del mapped
+
+    config = {
+        "ERP_DATA_FILE": erp_file,
+        "ESHOP_DATA_FILE": eshop_file,
+        "OUTPUT_FILE": os.path.join(catalog_dir, "output.json"),
+        "LOG_FILE": os.devnull,
+        "ERP_IDENTIFIER_FIELD": ERP_IDENTIFIER_FIELD,
+        "ESHOP_IDENTIFIER_FIELD": ESHOP_IDENTIFIER_FIELD,
+        "FIELD_MAPPINGS": FIELD_MAPPINGS,
+        "VALIDATION_RULES": VALIDATION_RULES
+    }
+
+    def sync():
+        sync = ProductSync(config)
+        synced = len(sync.sync_products())
+        return synced, sync.metrics.to_dict()
+
+    (synced, metrics), seconds = best_of(repeat, sync)
+    results["sync_products"] = result(seconds, size, synced=synced, peak_rss_bytes=metrics["peak_rss_bytes"],
+                                      stages=metrics["stages"])
+    return results
+
+
+def compare(previous, current, threshold):
+    """Print per-benchmark changes against an earlier results document
+
+    Returns:
+        Number of benchmarks slower than the threshold
+    """
+    regressions = 0
+    print(f"\nCompared with {previous.get('commit') or 'previous run'} ({previous.get('created')}):")
+    for size, benchmarks in current["results"].items():
+        for name, entry in benchmarks.items():
+            old = previous.get("results", {}).get(size, {}).get(name)
+            if name == "generate" or not old or not old.get("seconds"):
+                continue
+            change = entry["seconds"] / old["seconds"] - 1
+            flag = ""
+            if change > threshold:
+                flag = "  REGRESSION"
+                regressions += 1
+            print(f"{size:>10} {name:>14} {old['seconds']:>10.3f}s -> {entry['seconds']:>8.3f}s {change:>+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the benchmark suite on generated catalogs")
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; the fastest counts")
+    parser.add_argument("--output", help="Results JSON file (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="Earlier results JSON file to compare with")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Slowdown reported as a regression when comparing (0.10 is 10%%)")
+    args = parser.parse_args()
+
+    # Validation failures are logged; keep the formatting cost without the console output
+    logging.basicConfig(level=logging.INFO, handlers=[logging.FileHandler(os.devnull)])
+
+    commit = git_commit()
+    document = {
+        "commit": commit,
+        "created": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "json_backend": json_codec.backend(),
+        "repeat": args.repeat,
+        "results": {}
+    }
+
+    print(f"{'rows':>10} {'benchmark':>14} {'seconds':>10} {'rows/sec':>12}")
+    with tempfile.TemporaryDirectory() as tmpdir:
+        for size in args.sizes:
+            results = run_size(size, args.repeat, tmpdir)
+            document["results"][str(size)] = results
+            for name, entry in results.items():
+                print(f"{size:>10} {name:>14} {entry['seconds']:>10.3f} {entry['rows_per_sec'] or 0:>12,.0f}")
+
+    output = args.output or os.path.join(RESULTS_DIR, f"{commit or 'local'}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json_codec.dump(document, f, indent=4)
+    print(f"\nResults written to {output}")
+
+    if args.compare:
+        with open(args.compare, "rb") as f:
+            regressions = compare(json_codec.load(f), document, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
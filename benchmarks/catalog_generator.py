@@ -0,0 +1,198 @@
+#!/usr/bin/env python3
+"""
+Deterministic generator of ERP/Eshop catalog pairs
+
+Writes products_erp.json and products_eshop.json shaped like the files in
+data/ for any number of products. The same arguments always produce the same
+files. Rates control how many Eshop products have no ERP counterpart, how many
+ERP products fail the default validation rules and how many ERP products repeat
+an earlier SKU.
+
+Usage:
+    python benchmarks/catalog_generator.py --rows 100000 --output-dir /tmp/catalog
+    python benchmarks/catalog_generator.py --rows 10000 --mismatch-rate 0.2 --seed 7
+
+    from benchmarks.catalog_generator import write_catalog
+    erp_file, eshop_file = write_catalog("/tmp/catalog", 100000)
+"""
+
+import argparse
+import os
+import random
+import sys
+from typing import Dict, Any, Iterator, Optional, Tuple
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.json_codec import get_codec
+
+# Field mappings, identifiers and validation rules the generated files fit
+FIELD_MAPPINGS = {
+    "ItemName": "name",
+    "ItemPrice": "price",
+    "ItemDescription": "description",
+    "ItemStock": "stock"
+}
+VALIDATION_RULES = {
+    "required_fields": ["id", "sku"],
+    "positive_fields": ["price"],
+    "non_null_fields": ["stock"]
+}
+ERP_IDENTIFIER_FIELD = "ItemSku"
+ESHOP_IDENTIFIER_FIELD = "sku"
+
+# Fixed so generated files do not depend on the current date
+DATE_GENERATED = "2026-01-01T00:00:00Z"
+
+_NOUNS = ("Laptop", "Mouse", "Keyboard", "Monitor", "Headset", "Cable", "Charger", "Speaker", "Webcam", "Dock")
+_ADJECTIVES = ("Wireless", "Ergonomic", "Compact", "Pro", "Ultra", "Mini", "Smart", "Portable", "Gaming", "USB-C")
+_WORDS = ("high-performance", "adjustable", "durable", "lightweight", "with", "and", "for", "office", "travel",
+          "settings", "battery", "premium", "quality", "design", "Ελληνικά", "café")
+
+
+def _description(rng: random.Random, min_length: int, max_length: int) -> str:
+    length = rng.randint(min_length, max_length)
+    words = []
+    size = -1
+    while size < length:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        size += len(word) + 1
+    return " ".join(words)[:length]
+
+
+def iter_catalog(rows: int, seed: int = 0, mismatch_rate: float = 0.05, invalid_rate: float = 0.02,
+                 duplicate_rate: float = 0.01, description_length: Tuple[int, int] = (20, 200)
+                 ) -> Iterator[Tuple[Optional[Dict[str, Any]], Optional[Dict[str, Any]]]]:
+    """Generate catalog rows as (ERP product, Eshop product) pairs
+
+    Every row has an Eshop product. A mismatch_rate share of them have a SKU
+    the ERP does not know and come without an ERP product; a duplicate_rate
+    share of the rows add an ERP product repeating an earlier SKU with other
+    data and no Eshop product. An invalid_rate share of the ERP products have a
+    non-positive or unparseable price or a missing stock.
+
+    Args:
+        rows: Number of Eshop products
+        seed: Random seed; equal arguments generate equal catalogs
+        mismatch_rate: Share of Eshop products missing in the ERP
+        invalid_rate: Share of ERP products failing validation
+        duplicate_rate: Share of extra ERP products with a duplicated SKU
+        description_length: Minimum and maximum description length in characters
+
+    Yields:
+        (ERP product or None, Eshop product or None) in file order
+    """
+    rng = random.Random(seed)
+    min_length, max_length = description_length
+    for i in range(rows):
+        name = f"{rng.choice(_ADJECTIVES)} {rng.choice(_NOUNS)} {i}"
+        sku = f"SKU-{i:08d}"
+        eshop_product = {
+            "id": 100000 + i,
+            "name": name,
+            "description": _description(rng, min_length, max_length),
+            "price": round(rng.uniform(1, 2000), 2),
+            "sku": sku,
+            "stock": rng.randint(0, 500)
+        }
+
+        if rng.random() < mismatch_rate:
+            eshop_product["sku"] = f"ESHOP-ONLY-{i:08d}"
+            yield None, eshop_product
+        else:
+            price = rng.randint(100, 200000)
+            wholesale = price * 8 // 10
+            erp_product = {
+                "ItemId": str(i),
+                "ItemName": name,
+                "ItemDescription": _description(rng, min_length, max_length),
+                "ItemPrice": f"{price // 100}.{price % 100:02d}",
+                "ItemWholesalePrice": f"{wholesale // 100}.{wholesale % 100:02d}",
+                "ItemSku": sku,
+                "ItemStock": str(rng.randint(0, 500))
+            }
+            if rng.random() < invalid_rate:
+                problem = rng.randrange(3)
+                if problem == 0:
+                    erp_product["ItemPrice"] = "0.00"
+                elif problem == 1:
+                    erp_product["ItemPrice"] = "N/A"
+                else:
+                    erp_product["ItemStock"] = None
+            yield erp_product, eshop_product
+
+        if i and rng.random() < duplicate_rate:
+            duplicate = rng.randrange(i)
+            yield {
+                "ItemId": f"{duplicate}-dup",
+                "ItemName": f"Duplicate {duplicate}",
+                "ItemDescription": "Duplicated SKU",
+                "ItemPrice": "1.00",
+                "ItemWholesalePrice": "0.80",
+                "ItemSku": f"SKU-{duplicate:08d}",
+                "ItemStock": "1"
+            }, None
+
+
+def write_catalog(output_dir: str, rows: int, **options) -> Tuple[str, str]:
+    """Write products_erp.json and products_eshop.json to a directory
+
+    Products are written as they are generated, so memory stays flat for any
+    number of rows.
+
+    Args:
+        output_dir: Directory receiving the files (created if missing)
+        rows: Number of Eshop products
+        **options: Rates, seed and description length as for iter_catalog
+
+    Returns:
+        Tuple of (ERP file path, Eshop file path)
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    erp_file = os.path.join(output_dir, "products_erp.json")
+    eshop_file = os.path.join(output_dir, "products_eshop.json")
+    # The standard library codec writes the same bytes whatever is installed
+    codec = get_codec("json")
+
+    with open(erp_file, "w", encoding="utf-8") as erp_out, open(eshop_file, "w", encoding="utf-8") as eshop_out:
+        erp_out.write(f'{{"date_generated": "{DATE_GENERATED}", "products": [')
+        eshop_out.write('{"products": [')
+        erp_separator = eshop_separator = "\n"
+        for erp_product, eshop_product in iter_catalog(rows, **options):
+            if erp_product is not None:
+                erp_out.write(erp_separator + codec.dumps(erp_product))
+                erp_separator = ",\n"
+            if eshop_product is not None:
+                eshop_out.write(eshop_separator + codec.dumps(eshop_product))
+                eshop_separator = ",\n"
+        erp_out.write("\n]}\n")
+        eshop_out.write("\n]}\n")
+    return erp_file, eshop_file
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a deterministic ERP/Eshop catalog pair")
+    parser.add_argument("--rows", type=int, default=10_000, help="Number of Eshop products")
+    parser.add_argument("--output-dir", default="generated_catalog")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--mismatch-rate", type=float, default=0.05,
+                        help="Share of Eshop products missing in the ERP")
+    parser.add_argument("--invalid-rate", type=float, default=0.02,
+                        help="Share of ERP products failing validation")
+    parser.add_argument("--duplicate-rate", type=float, default=0.01,
+                        help="Share of extra ERP products repeating a SKU")
+    parser.add_argument("--description-length", type=int, nargs=2, default=(20, 200), metavar=("MIN", "MAX"))
+    args = parser.parse_args()
+
+    erp_file, eshop_file = write_catalog(
+        args.output_dir, args.rows, seed=args.seed, mismatch_rate=args.mismatch_rate,
+        invalid_rate=args.invalid_rate, duplicate_rate=args.duplicate_rate,
+        description_length=tuple(args.description_length)
+    )
+    for file_path in (erp_file, eshop_file):
+        print(f"{file_path}: {os.path.getsize(file_path) / 2 ** 20:,.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
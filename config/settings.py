@@ -5,13 +5,122 @@ Configuration settings for ERP to Eshop sync
 # File paths
 ERP_DATA_FILE = "data/products_erp.json"
 ESHOP_DATA_FILE = "data/products_eshop.json"
+
+# Paginated ERP API used instead of ERP_DATA_FILE when set
+ERP_API_URL = None
+ERP_API_PAGE_SIZE = 500
+ERP_API_MAX_IN_FLIGHT = 8
+
+# Eshop bulk update API receiving synced products instead of OUTPUT_FILE when set
+ESHOP_API_URL = None
+ESHOP_API_BULK_PATH = "/products/bulk"
+
+# Batch sizing for synced product writes; the size adapts between the bounds
+# from observed throughput and shrinks when the Eshop throttles or times out
+SINK_BATCH_SIZE = 500
+SINK_MIN_BATCH_SIZE = 50
+SINK_MAX_BATCH_SIZE = 5000
+SINK_MAX_RETRIES = 5
+
+# Failed sink writes (5xx, connection errors) are retried after a random delay
+# of up to SINK_RETRY_BASE_DELAY * 2^n seconds; delays, including Retry-After,
+# are capped at SINK_RETRY_MAX_DELAY. Requests time out after SINK_TIMEOUT
+SINK_RETRY_BASE_DELAY = 0.5
+SINK_RETRY_MAX_DELAY = 30.0
+SINK_TIMEOUT = 30.0
+
+# Consecutive failures that open an endpoint's circuit, and seconds until a trial
+# batch is sent again; batches fail without being sent while it is open
+SINK_CIRCUIT_FAILURE_THRESHOLD = 5
+SINK_CIRCUIT_RESET_TIMEOUT = 30.0
+
+# JSONL file receiving batches the sink did not accept, resent with
+# main.py --replay-dead-letters (None stops the run at the first failed batch)
+SINK_DEAD_LETTER_FILE = None
+
 OUTPUT_FILE = "synced_from_erp.json"
 LOG_FILE = "sync.log"
 
+# ERP updates for fields FIELD_OWNERSHIP gives to the Eshop or shares, one record
+# with the ERP identifier, changed ERP fields and "adjustments" per product, in
+# OUTPUT_FORMAT (None to disable)
+ERP_UPDATE_FILE = None
+
+# Optional JSONL report with one record per product that failed validation
+ERROR_REPORT_FILE = None
+
+# Number of failing products buffered before the error log is written
+ERROR_LOG_FLUSH_EVERY = 1000
+
+# JSON report with per-stage wall/CPU timings, rows/sec and peak RSS for each
+# run (None to disable)
+RUN_REPORT_FILE = None
+
+# Prometheus metrics: node_exporter textfile written after each run and/or a
+# local HTTP port serving /metrics (None to disable)
+METRICS_TEXTFILE = None
+METRICS_PORT = None
+METRICS_HOST = "127.0.0.1"
+
+# Output file format: "json" (array) or "ndjson" (one product per line)
+OUTPUT_FORMAT = "json"
+OUTPUT_COMPACT = False
+
+# JSON library: "auto" (orjson, then ujson, then the standard library), "orjson",
+# "ujson" or "json"
+JSON_BACKEND = "auto"
+
+# Only emit products whose mapped fields differ from the Eshop
+DELTA_SYNC = False
+
+# SQLite file storing hashes of synced ERP products; unchanged products are
+# skipped on the next run (None to disable)
+STATE_STORE_FILE = None
+
+# Number of worker processes for mapping and validation (1 runs in-process).
+# Workers only pay off with several free cores; see "Parallel Sync" in the README
+SYNC_WORKERS = 1
+
+# Eshop products sent to a worker at a time; at most two chunks per worker are
+# in flight
+SYNC_CHUNK_SIZE = 5000
+
+# Watch mode (main.py --watch): seconds between checks of ERP_DATA_FILE when
+# inotify is unavailable, and seconds a changed file must stay unchanged
+# before it is synced
+WATCH_INTERVAL = 1.0
+WATCH_DEBOUNCE = 0.5
+
+# Read input files incrementally instead of loading them in full
+STREAM_INPUT = False
+
+# Keep ERP, Eshop and synced products in slot-based records holding only the
+# mapped fields instead of dicts (less than half the memory, slower mapping)
+COMPACT_RECORDS = False
+
+# Eshop fields (e.g. ["price"]) cast to exact Money amounts held in integer
+# minor units instead of floats, and the number of decimal places they keep
+MONEY_FIELDS = []
+MONEY_DECIMALS = 2
+
+# Number of products field types are inferred from (0 reads all products)
+SCHEMA_SAMPLE_SIZE = 1000
+
+# JSON file caching inferred field types per input source, so later runs skip
+# inference (None infers types on every run)
+SCHEMA_CACHE_FILE = None
+
+# Binary snapshot of the Eshop file that later runs memory-map instead of parsing
+# the JSON; rewritten when the file changes (None always parses the JSON)
+ESHOP_SNAPSHOT_FILE = None
+
 # Field identifiers
 ERP_IDENTIFIER_FIELD = "ItemSku"
 ESHOP_IDENTIFIER_FIELD = "sku"
 
+# How to handle ERP products sharing a SKU: "first", "last" or "reject"
+ERP_DUPLICATE_SKU_POLICY = "first"
+
 # Field mapping from ERP to Eshop
 FIELD_MAPPINGS = {
     "ItemName": "name",
@@ -20,9 +129,26 @@ FIELD_MAPPINGS = {
     "ItemStock": "stock"
 }
 
+# Owner of each mapped Eshop field: "erp" syncs the ERP value to the Eshop,
+# "eshop" keeps the Eshop value and maps it back to the ERP, and "shared" (e.g.
+# {"stock": "shared"} for stock restocked in the ERP and sold in the Eshop,
+# needs STATE_STORE_FILE) exchanges each side's changes since the last sync.
+# Unlisted fields are owned by the ERP
+FIELD_OWNERSHIP = {}
+
 # Validation rules
 VALIDATION_RULES = {
     "required_fields": ["id", "sku"],
     "positive_fields": ["price"],
     "non_null_fields": ["stock"]
 }
+
+# Eshop storefronts synced from a single ERP load (empty syncs ESHOP_DATA_FILE
+# only). Each channel has a "name" and the settings it overrides, e.g.
+# {"name": "shop-b", "ESHOP_DATA_FILE": "data/shop_b.json", "FIELD_MAPPINGS": {...}}.
+# Output, log and report files default to the top-level paths with the channel
+# name before the extension
+CHANNELS = []
+
+# Number of channels synced at the same time
+CHANNEL_WORKERS = 4
@@ -2,6 +2,7 @@
 ERP to Eshop Product Sync - Main Entry Point
 """
 
+import argparse
 import logging
 import sys
 import os
@@ -11,7 +12,11 @@ import json
 sys.path.append(os.path.join(os.path.dirname(__file__), 'src'))
 
 from config.settings import *
+from src import json_codec
 from src.product_sync import ProductSync
+from src.sinks import HttpSink, SinkError
+from src.daemon import SyncDaemon
+from src.channels import MultiChannelSync
 
 def setup_logging():
     """Configure logging for the application
@@ -37,12 +42,29 @@ def setup_logging():
             handlers=[logging.StreamHandler()]
         )
 
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="ERP to Eshop product sync")
+    parser.add_argument(
+        "--watch", action="store_true",
+        help="keep running and re-sync whenever ERP_DATA_FILE changes"
+    )
+    parser.add_argument(
+        "--replay-dead-letters", action="store_true",
+        help="resend the batches in SINK_DEAD_LETTER_FILE to ESHOP_API_URL and exit"
+    )
+    return parser.parse_args(argv)
+
 def main():
     """Main application entry point
     
     Handles the complete product synchronization process with proper error handling
-    and recovery mechanisms.
+    and recovery mechanisms. With --watch the process keeps running and re-syncs
+    whenever the ERP data file changes. With CHANNELS set, the ERP data is loaded
+    once and synced to every channel's Eshop. With --replay-dead-letters the
+    batches the Eshop API did not accept earlier are sent again.
     """
+    args = parse_args()
     setup_logging()
     
     logging.info("Starting ERP to Eshop product sync")
@@ -51,25 +73,111 @@ def main():
     config = {
         "ERP_DATA_FILE": ERP_DATA_FILE,
         "ESHOP_DATA_FILE": ESHOP_DATA_FILE,
+        "ERP_API_URL": ERP_API_URL,
+        "ERP_API_PAGE_SIZE": ERP_API_PAGE_SIZE,
+        "ERP_API_MAX_IN_FLIGHT": ERP_API_MAX_IN_FLIGHT,
+        "ESHOP_API_URL": ESHOP_API_URL,
+        "ESHOP_API_BULK_PATH": ESHOP_API_BULK_PATH,
+        "SINK_BATCH_SIZE": SINK_BATCH_SIZE,
+        "SINK_MIN_BATCH_SIZE": SINK_MIN_BATCH_SIZE,
+        "SINK_MAX_BATCH_SIZE": SINK_MAX_BATCH_SIZE,
+        "SINK_MAX_RETRIES": SINK_MAX_RETRIES,
+        "SINK_RETRY_BASE_DELAY": SINK_RETRY_BASE_DELAY,
+        "SINK_RETRY_MAX_DELAY": SINK_RETRY_MAX_DELAY,
+        "SINK_TIMEOUT": SINK_TIMEOUT,
+        "SINK_CIRCUIT_FAILURE_THRESHOLD": SINK_CIRCUIT_FAILURE_THRESHOLD,
+        "SINK_CIRCUIT_RESET_TIMEOUT": SINK_CIRCUIT_RESET_TIMEOUT,
+        "SINK_DEAD_LETTER_FILE": SINK_DEAD_LETTER_FILE,
         "OUTPUT_FILE": OUTPUT_FILE,
         "LOG_FILE": LOG_FILE,
+        "ERP_UPDATE_FILE": ERP_UPDATE_FILE,
+        "ERROR_REPORT_FILE": ERROR_REPORT_FILE,
+        "ERROR_LOG_FLUSH_EVERY": ERROR_LOG_FLUSH_EVERY,
+        "RUN_REPORT_FILE": RUN_REPORT_FILE,
+        "METRICS_TEXTFILE": METRICS_TEXTFILE,
+        "METRICS_PORT": METRICS_PORT,
+        "OUTPUT_FORMAT": OUTPUT_FORMAT,
+        "OUTPUT_COMPACT": OUTPUT_COMPACT,
+        "JSON_BACKEND": JSON_BACKEND,
+        "STREAM_INPUT": STREAM_INPUT,
+        "COMPACT_RECORDS": COMPACT_RECORDS,
+        "MONEY_FIELDS": MONEY_FIELDS,
+        "MONEY_DECIMALS": MONEY_DECIMALS,
+        "SCHEMA_SAMPLE_SIZE": SCHEMA_SAMPLE_SIZE,
+        "SCHEMA_CACHE_FILE": SCHEMA_CACHE_FILE,
+        "ESHOP_SNAPSHOT_FILE": ESHOP_SNAPSHOT_FILE,
+        "DELTA_SYNC": DELTA_SYNC,
+        "STATE_STORE_FILE": STATE_STORE_FILE,
+        "SYNC_WORKERS": SYNC_WORKERS,
+        "SYNC_CHUNK_SIZE": SYNC_CHUNK_SIZE,
+        "WATCH_INTERVAL": WATCH_INTERVAL,
+        "WATCH_DEBOUNCE": WATCH_DEBOUNCE,
         "ERP_IDENTIFIER_FIELD": ERP_IDENTIFIER_FIELD,
         "ESHOP_IDENTIFIER_FIELD": ESHOP_IDENTIFIER_FIELD,
+        "ERP_DUPLICATE_SKU_POLICY": ERP_DUPLICATE_SKU_POLICY,
         "FIELD_MAPPINGS": FIELD_MAPPINGS,
-        "VALIDATION_RULES": VALIDATION_RULES
+        "FIELD_OWNERSHIP": FIELD_OWNERSHIP,
+        "VALIDATION_RULES": VALIDATION_RULES,
+        "CHANNELS": CHANNELS,
+        "CHANNEL_WORKERS": CHANNEL_WORKERS
     }
     
+    if CHANNELS and args.watch:
+        logging.error("Watch mode syncs a single Eshop; it does not support CHANNELS")
+        sys.exit(2)
+    if args.replay_dead_letters and (CHANNELS or not ESHOP_API_URL):
+        logging.error("--replay-dead-letters needs ESHOP_API_URL and does not support CHANNELS")
+        sys.exit(2)
+    
     try:
+        # JSON library for every file and HTTP body, selected once for the process
+        json_codec.set_backend(JSON_BACKEND)
+        
+        if CHANNELS:
+            counts = MultiChannelSync(config).run()
+            logging.info(
+                f"Sync completed successfully. Processed {sum(counts.values())} products "
+                f"across {len(counts)} channels."
+            )
+            return
+        
         # Initialize sync processor
         sync_processor = ProductSync(config)
+        if METRICS_PORT:
+            sync_processor.exporter.serve(METRICS_PORT, METRICS_HOST)
+        
+        if args.replay_dead_letters:
+            replayed = sync_processor.replay_dead_letters(
+                HttpSink(ESHOP_API_URL, ESHOP_API_BULK_PATH, SINK_TIMEOUT)
+            )
+            logging.info(f"Replay completed. Sent {replayed} products.")
+            return
         
-        # Perform sync
-        synced_products = sync_processor.sync_products()
+        if args.watch:
+            daemon = SyncDaemon(sync_processor)
+            try:
+                daemon.run()
+            except KeyboardInterrupt:
+                logging.info("Watch mode stopped")
+            finally:
+                daemon.close()
+            return
         
-        # Save results
-        sync_processor.save_synced_products(synced_products)
+        # Perform sync, writing products as they pass validation
+        synced_products = sync_processor.iter_synced_products()
         
-        logging.info(f"Sync completed successfully. Processed {len(synced_products)} products.")
+        # Save results to the Eshop API in bulk batches, or to the output file
+        if ESHOP_API_URL:
+            synced_count = sync_processor.push_to_sink(
+                synced_products, HttpSink(ESHOP_API_URL, ESHOP_API_BULK_PATH, SINK_TIMEOUT)
+            )
+        else:
+            synced_count = sync_processor.save_synced_products(synced_products)
+        
+        logging.info(f"Sync completed successfully. Processed {synced_count} products.")
+        logging.info(sync_processor.metrics.summary())
+        if RUN_REPORT_FILE:
+            sync_processor.write_run_report(RUN_REPORT_FILE)
         
     except FileNotFoundError as e:
         logging.error(f"Configuration error - missing file: {e}")
@@ -86,6 +194,11 @@ def main():
         logging.error("Please check data integrity and validation rules.")
         sys.exit(4)
         
+    except SinkError as e:
+        logging.error(f"Eshop update error: {e}")
+        logging.error("Please check the Eshop API URL and its availability.")
+        sys.exit(6)
+        
     except PermissionError as e:
         logging.error(f"Permission error: {e}")
         logging.error("Please check file and directory permissions.")
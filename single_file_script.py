@@ -4,6 +4,12 @@
 import logging
 import json
 
+# orjson parses JSON several times faster when installed
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Setup logging first
 LOG_FILE = "./single_file_sync.log"
 logging.basicConfig(
@@ -39,14 +45,24 @@ VALIDATION_RULES = {
     "non_null_fields": ["stock"]
 }
 
+def load_json(file_path):
+    """Parse a JSON file with orjson if installed, otherwise with the json module"""
+    with open(file_path, "rb") as f:
+        data = f.read()
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # Let json accept NaN/Infinity or report the error
+    return json.loads(data)
+
 # Initiate empty variables to hold the products
 erp_products = []
 eshop_products = []
 
 # Receive ERP products
 try:
-    with open(ERP_DATA_FILE, "r", encoding="utf-8") as f:
-        erp_response = json.load(f)
+    erp_response = load_json(ERP_DATA_FILE)
     
     if not erp_response.get("products") or len(erp_response["products"]) == 0:
         logging.error("No products found in ERP response")
@@ -63,8 +79,7 @@ except json.JSONDecodeError as e:
 
 # Query eshop products
 try:
-    with open(ESHOP_DATA_FILE, "r", encoding="utf-8") as f:
-        eshop_response = json.load(f)
+    eshop_response = load_json(ESHOP_DATA_FILE)
     
     if not eshop_response.get("products") or len(eshop_response["products"]) == 0:
         logging.error("No products found in Eshop response")
@@ -215,6 +230,7 @@ for eshop_product in eshop_products:
 
 # Save results
 try:
+    # json writes the indented output byte for byte as before
     with open(OUTPUT_FILE, "w", encoding="utf-8") as outfile:
         json.dump(updated_eshop_products, outfile, indent=4, ensure_ascii=False)
     logging.info(f"Successfully synced {len(updated_eshop_products)} products to {OUTPUT_FILE}")
@@ -0,0 +1,200 @@
+"""
+Multi-channel sync of one ERP catalog to several Eshops
+"""
+
+import logging
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any
+
+from .product_sync import ProductSync
+from .sinks import HttpSink, DEFAULT_TIMEOUT
+
+# Settings every channel shares with the ERP side; channels cannot override them
+SHARED_SETTINGS = (
+    "ERP_DATA_FILE", "ERP_API_URL", "ERP_API_PAGE_SIZE", "ERP_API_MAX_IN_FLIGHT",
+    "ERP_IDENTIFIER_FIELD", "ERP_DUPLICATE_SKU_POLICY", "JSON_BACKEND", "SCHEMA_CACHE_FILE"
+)
+
+# Files written per channel. A channel that does not set one gets the top-level
+# path with its name before the extension (synced_from_erp.json becomes
+# synced_from_erp.shop-a.json)
+CHANNEL_FILE_SETTINGS = (
+    "OUTPUT_FILE", "LOG_FILE", "ERROR_REPORT_FILE", "ERP_UPDATE_FILE", "STATE_STORE_FILE",
+    "ESHOP_SNAPSHOT_FILE", "RUN_REPORT_FILE", "METRICS_TEXTFILE", "SINK_DEAD_LETTER_FILE"
+)
+
+DEFAULT_CHANNEL_WORKERS = 4
+
+_CHANNEL_NAME = re.compile(r"[A-Za-z0-9_.-]+")
+
+
+def channel_config(config: Dict[str, Any], channel: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the configuration of one channel
+
+    Args:
+        config: Top-level configuration
+        channel: Channel entry of CHANNELS: a "name" and the settings it overrides
+            (typically ESHOP_DATA_FILE, FIELD_MAPPINGS and VALIDATION_RULES)
+
+    Returns:
+        Top-level configuration updated with the channel's settings and file paths
+
+    Raises:
+        ValueError: If the name is missing or invalid or a shared setting is overridden
+    """
+    name = channel.get("name")
+    if not isinstance(name, str) or not _CHANNEL_NAME.fullmatch(name):
+        raise ValueError(f"Invalid channel name {name!r}: use letters, digits, '_', '-' and '.'")
+    shared = sorted(set(channel) & set(SHARED_SETTINGS))
+    if shared:
+        raise ValueError(f"Channel {name} cannot override shared settings: {', '.join(shared)}")
+
+    merged = {key: value for key, value in config.items() if key not in ("CHANNELS", "CHANNEL_WORKERS")}
+    for setting in CHANNEL_FILE_SETTINGS:
+        if setting not in channel and merged.get(setting):
+            root, extension = os.path.splitext(merged[setting])
+            merged[setting] = f"{root}.{name}{extension}"
+    merged.update((key, value) for key, value in channel.items() if key != "name")
+    return merged
+
+
+class MultiChannelSync:
+    """Syncs one ERP catalog to every Eshop channel in CHANNELS
+
+    ERP products are loaded and indexed once per run, however many channels
+    there are. Each channel then loads its own Eshop catalog, maps and validates
+    it with its own FIELD_MAPPINGS and VALIDATION_RULES against the shared index,
+    and writes its own output, error log and reports. Channels run concurrently
+    in up to CHANNEL_WORKERS threads, which overlaps their file and HTTP I/O;
+    set SYNC_WORKERS on a channel to also map and validate it in a process
+    pool. CPU times in the metrics of concurrent channels overlap.
+
+    Usage:
+        counts = MultiChannelSync(config).run()
+    """
+
+    def __init__(self, config: Dict[str, Any]):
+        """Initialize the ERP sync and one ProductSync per channel
+
+        Args:
+            config: Top-level configuration with a non-empty CHANNELS list
+
+        Raises:
+            ValueError: If CHANNELS is empty or invalid or channels share an output file
+        """
+        channels = config.get("CHANNELS") or []
+        if not channels:
+            raise ValueError("CHANNELS must list at least one channel")
+
+        self.config = config
+        self.workers = config.get("CHANNEL_WORKERS", DEFAULT_CHANNEL_WORKERS)
+        self.channels = {}
+        for channel in channels:
+            channel_settings = channel_config(config, channel)
+            if channel["name"] in self.channels:
+                raise ValueError(f"Duplicate channel name {channel['name']}")
+            self.channels[channel["name"]] = channel_settings
+        self._check_files()
+
+        # The ERP side indexes the fields every channel maps
+        erp_fields = {}
+        for channel_settings in self.channels.values():
+            erp_fields.update(channel_settings["FIELD_MAPPINGS"])
+        self.erp_sync = ProductSync(dict(
+            config, FIELD_MAPPINGS=erp_fields, FIELD_OWNERSHIP=None, STATE_STORE_FILE=None,
+            METRICS_TEXTFILE=None, METRICS_PORT=None
+        ))
+
+        self.syncs = {name: ProductSync(settings) for name, settings in self.channels.items()}
+        # One schema cache, so concurrent channels do not overwrite each other's entries
+        for sync in self.syncs.values():
+            sync.schema_cache = self.erp_sync.schema_cache
+
+        self.failures = {}
+
+    def _check_files(self):
+        """Raise ValueError if two channels would write the same file"""
+        owners = {}
+        for name, settings in self.channels.items():
+            for setting in CHANNEL_FILE_SETTINGS:
+                if setting == "OUTPUT_FILE" and settings.get("ESHOP_API_URL"):
+                    continue
+                path = settings.get(setting)
+                if not path:
+                    continue
+                key = os.path.abspath(path)
+                if key in owners:
+                    raise ValueError(f"Channels {owners[key]} and {name} both write {setting} {path}")
+                owners[key] = name
+
+    def run(self) -> Dict[str, int]:
+        """Load and index the ERP products, then sync every channel
+
+        A failing channel does not stop the others. Its error is logged, kept in
+        self.failures and raised once every channel has finished.
+
+        Returns:
+            Dictionary of channel name -> number of products written
+
+        Raises:
+            FileNotFoundError: If a data file is not found
+            ValueError: If data validation fails
+            json.JSONDecodeError: If JSON parsing fails
+        """
+        erp_sync = self.erp_sync
+        erp_sync.start_run()
+        erp_index, erp_field_types = erp_sync.load_erp_index()
+        erp_sync.metrics.finish()
+        logging.info(f"Indexed {len(erp_index)} ERP products for {len(self.syncs)} channels")
+
+        self.failures = {}
+        counts = {}
+        workers = max(1, min(self.workers, len(self.syncs)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="channel") as executor:
+            futures = [
+                (name, executor.submit(self._sync_channel, name, erp_index, erp_field_types))
+                for name in self.syncs
+            ]
+            for name, future in futures:
+                try:
+                    counts[name] = future.result()
+                except Exception as e:
+                    logging.error(f"Channel {name} failed: {e}")
+                    self.failures[name] = e
+
+        if self.failures:
+            raise next(iter(self.failures.values()))
+        return counts
+
+    def _sync_channel(self, name: str, erp_index: Dict[str, Dict[str, Any]],
+                      erp_field_types: Dict[str, str]) -> int:
+        """Sync one channel against the shared ERP index and write its output
+
+        Returns:
+            Number of products written
+        """
+        sync = self.syncs[name]
+        config = sync.config
+        sync.start_run()
+        # The channel's stats and metrics include the shared ERP load
+        sync.stats.update(self.erp_sync.stats)
+        sync.metrics.merge(self.erp_sync.metrics.to_dict()["stages"])
+
+        eshop_products, eshop_field_types = sync.load_eshop_products()
+        field_mapper = sync.create_field_mapper(erp_field_types, eshop_field_types)
+        products = sync.sync_loaded_products(eshop_products, erp_index, field_mapper)
+
+        if config.get("ESHOP_API_URL"):
+            count = sync.push_to_sink(
+                products, HttpSink(config["ESHOP_API_URL"], config.get("ESHOP_API_BULK_PATH", "/products/bulk"),
+                                   config.get("SINK_TIMEOUT", DEFAULT_TIMEOUT))
+            )
+        else:
+            count = sync.save_synced_products(products)
+
+        logging.info(f"Channel {name}: processed {count} products. {sync.metrics.summary()}")
+        if config.get("RUN_REPORT_FILE"):
+            sync.write_run_report(config["RUN_REPORT_FILE"])
+        return count
@@ -0,0 +1,184 @@
+"""
+Long-running sync that re-syncs whenever the ERP data file changes
+"""
+
+import logging
+import threading
+from typing import Dict, Any, List
+
+from .product_sync import ProductSync
+from .sinks import HttpSink, DEFAULT_TIMEOUT
+from .watcher import FileWatcher, file_signature
+
+
+class SyncDaemon:
+    """Watches ERP_DATA_FILE and runs an incremental sync on every change
+
+    Between runs the daemon keeps the Eshop products, their SKU positions, the
+    ERP index of the last run, the compiled field mapper and validator and the
+    last synced version of every product in memory. When the ERP file changes
+    only Eshop products whose ERP record was added, changed or removed are
+    mapped and validated again. The Eshop file is reloaded, and everything
+    re-synced, only when it changes too, when the ERP field types change or
+    after a failed run.
+
+    With ESHOP_API_URL set, each run sends only the products it re-synced;
+    otherwise OUTPUT_FILE is rewritten with the full set of synced products.
+
+    Usage:
+        daemon = SyncDaemon(ProductSync(config))
+        daemon.run()
+    """
+
+    def __init__(self, sync: ProductSync, watcher: FileWatcher = None):
+        """Initialize the daemon
+
+        Args:
+            sync: Configured ProductSync reused for every run
+            watcher: Watcher for ERP_DATA_FILE (built from WATCH_INTERVAL and
+                WATCH_DEBOUNCE when omitted)
+        """
+        self.sync = sync
+        self.config = sync.config
+        self.watcher = watcher or FileWatcher(
+            self.config["ERP_DATA_FILE"],
+            self.config.get("WATCH_INTERVAL", 1.0),
+            self.config.get("WATCH_DEBOUNCE", 0.5)
+        )
+        self.stop_event = threading.Event()
+        self.runs = 0
+
+        self._eshop_products = None
+        self._eshop_signature = None
+        self._eshop_field_types = None
+        self._positions = {}       # Eshop (sku, id) -> position in the Eshop file
+        self._sku_positions = {}   # Eshop SKU -> positions in the Eshop file
+        self._erp_index = None
+        self._erp_field_types = None
+        self._field_mapper = None
+        self._synced = []          # Position -> last synced product (None if not synced)
+        self._needs_full_sync = True
+
+    def run(self, max_runs: int = None):
+        """Sync now, then again after every change until stopped
+
+        Errors in the first run are raised; errors in later runs are logged and
+        the previous state is kept until the next change.
+
+        Args:
+            max_runs: Stop after this many runs (None runs until stop() is called)
+        """
+        self.run_once()
+        watching = "inotify" if self.watcher.uses_inotify else "polling"
+        logging.info(f"Watching {self.config['ERP_DATA_FILE']} for changes ({watching})")
+
+        while max_runs is None or self.runs < max_runs:
+            if not self.watcher.wait_for_change(stop_event=self.stop_event):
+                break
+            try:
+                self.run_once()
+            except Exception as e:
+                logging.error(f"Sync after ERP change failed, keeping previous state: {e}")
+
+    def stop(self):
+        """Ask run() to return after the current run"""
+        self.stop_event.set()
+
+    def close(self):
+        self.stop()
+        self.watcher.close()
+
+    def run_once(self) -> int:
+        """Sync the current ERP data, incrementally after the first run
+
+        Returns:
+            Number of products written to the sink in this run
+
+        Raises:
+            FileNotFoundError: If a data file is not found
+            ValueError: If data validation fails
+            json.JSONDecodeError: If JSON parsing fails
+        """
+        sync = self.sync
+        sync.start_run()
+
+        erp_index, erp_field_types = sync.load_erp_index()
+
+        full_sync = (self._reload_eshop_if_changed() or self._needs_full_sync
+                     or erp_field_types != self._erp_field_types)
+        # A run that fails part way leaves the cached state incomplete
+        self._needs_full_sync = True
+        if full_sync:
+            self._field_mapper = sync.create_field_mapper(erp_field_types, self._eshop_field_types)
+            positions = range(len(self._eshop_products))
+        else:
+            positions = self._changed_positions(erp_index)
+
+        self._erp_index = erp_index
+        self._erp_field_types = erp_field_types
+
+        for position in positions:
+            self._synced[position] = None
+        subset = [self._eshop_products[position] for position in positions]
+        identifier_field = self.config["ESHOP_IDENTIFIER_FIELD"]
+        changed = []
+        for product in sync.sync_loaded_products(subset, erp_index, self._field_mapper):
+            position = self._positions.get((product.get(identifier_field), product.get("id")))
+            if position is not None:
+                self._synced[position] = product
+            changed.append(product)
+
+        sync.stats["resynced"] = len(subset)
+        self.runs += 1
+        logging.info(
+            f"{'Full' if full_sync else 'Incremental'} sync: {len(subset)} Eshop products re-synced, "
+            f"{len(changed)} updated"
+        )
+        count = self._write(changed)
+        self._needs_full_sync = False
+
+        logging.info(sync.metrics.summary())
+        if self.config.get("RUN_REPORT_FILE"):
+            sync.write_run_report(self.config["RUN_REPORT_FILE"])
+        return count
+
+    def _reload_eshop_if_changed(self) -> bool:
+        """Reload the Eshop file on the first run or when it changed"""
+        signature = file_signature(self.config["ESHOP_DATA_FILE"])
+        if self._eshop_products is not None and signature == self._eshop_signature:
+            return False
+
+        eshop_products, self._eshop_field_types = self.sync.load_eshop_products()
+        self._eshop_products = list(eshop_products)
+        self._eshop_signature = signature
+
+        identifier_field = self.config["ESHOP_IDENTIFIER_FIELD"]
+        self._positions = {}
+        self._sku_positions = {}
+        for position, product in enumerate(self._eshop_products):
+            sku = product.get(identifier_field)
+            self._positions[(sku, product.get("id"))] = position
+            self._sku_positions.setdefault(sku, []).append(position)
+        self._synced = [None] * len(self._eshop_products)
+        return True
+
+    def _changed_positions(self, erp_index: Dict[str, Dict[str, Any]]) -> List[int]:
+        """Return Eshop positions whose ERP record was added, changed or removed since the last run"""
+        previous = self._erp_index
+        changed_skus = [sku for sku, product in erp_index.items() if previous.get(sku) != product]
+        changed_skus.extend(sku for sku in previous if sku not in erp_index)
+
+        positions = []
+        for sku in changed_skus:
+            positions.extend(self._sku_positions.get(sku, ()))
+        positions.sort()
+        return positions
+
+    def _write(self, changed: List[Dict[str, Any]]) -> int:
+        """Send re-synced products to the Eshop API, or rewrite OUTPUT_FILE in full"""
+        if self.config.get("ESHOP_API_URL"):
+            return self.sync.push_to_sink(
+                changed, HttpSink(self.config["ESHOP_API_URL"], self.config.get("ESHOP_API_BULK_PATH", "/products/bulk"),
+                                  self.config.get("SINK_TIMEOUT", DEFAULT_TIMEOUT))
+            )
+        return self.sync.save_synced_products(product for product in self._synced if product is not None)
@@ -4,8 +4,12 @@ Data loading utilities for ERP and Eshop products
 
 import json
 import logging
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Iterable, Iterator, Optional
 from datetime import datetime
+from . import json_codec
+from .json_stream import iter_json_array, DEFAULT_CHUNK_SIZE
+from .schema import Schema
+from .snapshot import EshopSnapshot, source_signature, write_snapshot
 
 class DataLoader:
     """Handles loading and parsing of product data from JSON files"""
@@ -29,8 +33,8 @@ class DataLoader:
             ValueError: If no products are found in the file
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                erp_response = json.load(f)
+            with open(file_path, "rb") as f:
+                erp_response = json_codec.load(f)
             
             if not erp_response.get("products") or len(erp_response["products"]) == 0:
                 logging.error("No products found in ERP response")
@@ -60,8 +64,8 @@ class DataLoader:
             ValueError: If no products are found in the file
         """
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                eshop_response = json.load(f)
+            with open(file_path, "rb") as f:
+                eshop_response = json_codec.load(f)
             
             if not eshop_response.get("products") or len(eshop_response["products"]) == 0:
                 logging.error("No products found in Eshop response")
@@ -76,14 +80,132 @@ class DataLoader:
             logging.error(f"Invalid JSON in Eshop products file: {e}")
             raise
     
-    def get_field_types(self, products: List[Dict[str, Any]]) -> Dict[str, str]:
-        """Extract field types from a list of products
+    def iter_erp_products(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream products from ERP JSON file one at a time with bounded memory
+        
+        Args:
+            file_path: Path to the ERP products JSON file
+            chunk_size: Number of characters read from the file per chunk
+            
+        Yields:
+            ERP product dictionaries in file order
+            
+        Raises:
+            FileNotFoundError: If the ERP file is not found
+            json.JSONDecodeError: If the file contains invalid JSON
+            ValueError: If no products are found in the file
+        """
+        return self._iter_products(file_path, "ERP", chunk_size)
+    
+    def iter_eshop_products(self, file_path: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Stream products from Eshop JSON file one at a time with bounded memory
+        
+        Args:
+            file_path: Path to the Eshop products JSON file
+            chunk_size: Number of characters read from the file per chunk
+            
+        Yields:
+            Eshop product dictionaries in file order
+            
+        Raises:
+            FileNotFoundError: If the Eshop file is not found
+            json.JSONDecodeError: If the file contains invalid JSON
+            ValueError: If no products are found in the file
+        """
+        return self._iter_products(file_path, "Eshop", chunk_size)
+    
+    def open_eshop_snapshot(self, file_path: str, snapshot_path: str,
+                            fields: Iterable[str] = None) -> Optional[EshopSnapshot]:
+        """Open the binary snapshot of an Eshop file if it is still current
+        
+        Args:
+            file_path: Path to the Eshop products JSON file
+            snapshot_path: Path of the snapshot file
+            fields: Fields decoded when iterating the snapshot (None decodes all)
+            
+        Returns:
+            Memory-mapped snapshot, or None if it is missing or the Eshop file's
+            size, mtime or content changed since it was written
+        """
+        return EshopSnapshot.open(snapshot_path, file_path, fields)
+    
+    def write_eshop_snapshot(self, file_path: str, snapshot_path: str, identifier_field: str,
+                             products: List[Dict[str, Any]] = None) -> int:
+        """Write a binary snapshot of an Eshop file for later runs to memory-map
+        
+        Args:
+            file_path: Path to the Eshop products JSON file
+            snapshot_path: Path of the snapshot file
+            identifier_field: Field containing the SKU, indexed in the snapshot
+            products: Products already loaded from file_path (streamed from the
+                file twice when omitted)
+            
+        Returns:
+            Number of products in the snapshot
+            
+        Raises:
+            FileNotFoundError: If the Eshop file is not found
+            json.JSONDecodeError: If the file contains invalid JSON
+            ValueError: If no products are found in the file
+            SnapshotError: If the snapshot cannot be written
+        """
+        try:
+            source = source_signature(file_path)
+        except FileNotFoundError:
+            logging.error(f"Eshop products file not found: {file_path}")
+            raise
+        
+        if products is None:
+            count = write_snapshot(snapshot_path, lambda: self.iter_eshop_products(file_path), identifier_field, source)
+        else:
+            count = write_snapshot(snapshot_path, lambda: products, identifier_field, source)
+        logging.info(f"Wrote Eshop snapshot of {count} products to {snapshot_path}")
+        return count
+    
+    def _iter_products(self, file_path: str, source: str, chunk_size: int) -> Iterator[Dict[str, Any]]:
+        """Stream the "products" array of a JSON file, raising the same errors as the load methods
+        
+        Args:
+            file_path: Path to the products JSON file
+            source: Source name used in log and error messages ("ERP" or "Eshop")
+            chunk_size: Number of characters read from the file per chunk
+            
+        Yields:
+            Product dictionaries in file order
+        """
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                count = 0
+                try:
+                    for product in iter_json_array(f, "products", chunk_size):
+                        count += 1
+                        yield product
+                except (KeyError, TypeError):
+                    count = 0
+                
+                if count == 0:
+                    logging.error(f"No products found in {source} response")
+                    raise ValueError(f"No products found in {source} response")
+                    
+        except FileNotFoundError:
+            logging.error(f"{source} products file not found: {file_path}")
+            raise
+        except json.JSONDecodeError as e:
+            logging.error(f"Invalid JSON in {source} products file: {e}")
+            raise
+    
+    def get_field_types(self, products: List[Dict[str, Any]]) -> Schema:
+        """Infer field types from a sample of products
+        
+        Types are reconciled across all given products: nulls do not decide a
+        field's type, int and float mix to float, and other mixes take the most
+        common type.
         
         Args:
             products: List of product dictionaries
             
         Returns:
-            Dictionary mapping field names to their types
+            Schema (a dictionary mapping field names to their types)
             
         Raises:
             ValueError: If no products are available to determine field types
@@ -91,9 +213,5 @@ class DataLoader:
         if not products:
             logging.error("No products available to determine field types")
             raise ValueError("No products available to determine field types")
-            
-        field_types = {}
-        for key, value in products[0].items():
-            field_types[key] = type(value).__name__
         
-        return field_types
+        return Schema.infer(products)
@@ -0,0 +1,114 @@
+"""
+Buffered validation error logging
+"""
+
+from typing import Dict, Any, Sequence
+
+from . import json_codec
+
+DEFAULT_FLUSH_EVERY = 1000
+
+
+def format_product_errors(product: Dict[str, Any], errors: Sequence[str], start_timestamp: str) -> str:
+    """Format validation errors for a product as human-readable log lines
+
+    Args:
+        product: Product dictionary that failed validation
+        errors: Validation error messages
+        start_timestamp: Timestamp for the sync operation
+
+    Returns:
+        Log entry text, ending with a blank line
+    """
+    lines = [f"[ERP to Eshop at {start_timestamp}] Product with Eshop ID {product.get('id')} could not be updated due to these errors:\n"]
+    for error in errors:
+        lines.append(f"    - {error}\n")
+    lines.append("\n")  # Add a blank line for readability
+    return "".join(lines)
+
+
+class ValidationErrorLog:
+    """Collects validation errors for a whole sync run and writes them in batches
+
+    The log file (and optional JSONL report) is opened on the first error and kept
+    open until close(), instead of being reopened for every failing product.
+    Entries are flushed every ``flush_every`` products and when the log is closed.
+
+    Usage:
+        with ValidationErrorLog("sync.log", start_timestamp) as error_log:
+            error_log.record(product, errors)
+    """
+
+    def __init__(self, log_file: str, start_timestamp: str, report_file: str = None,
+                 flush_every: int = DEFAULT_FLUSH_EVERY):
+        """Initialize the error log
+
+        Args:
+            log_file: Human-readable log file (appended to)
+            start_timestamp: Timestamp for the sync operation
+            report_file: Optional JSONL file receiving one structured record per product
+            flush_every: Number of failing products buffered before writing
+        """
+        self.log_file = log_file
+        self.start_timestamp = start_timestamp
+        self.report_file = report_file
+        self.flush_every = max(1, flush_every)
+        self.count = 0
+        self._log_buffer = []
+        self._report_buffer = []
+        self._log = None
+        self._report = None
+
+    def record(self, product: Dict[str, Any], errors: Sequence[str]):
+        """Buffer validation errors for a product
+
+        Args:
+            product: Product dictionary that failed validation
+            errors: Validation error messages
+        """
+        self._log_buffer.append(format_product_errors(product, errors, self.start_timestamp))
+        if self.report_file:
+            self._report_buffer.append(json_codec.dumps({
+                "timestamp": self.start_timestamp,
+                "id": product.get("id"),
+                "sku": product.get("sku"),
+                "errors": list(errors)
+            }) + "\n")
+        self.count += 1
+
+        if len(self._log_buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write buffered entries to the log file and report"""
+        if self._log_buffer:
+            if self._log is None:
+                self._log = open(self.log_file, "a", encoding="utf-8")
+            self._log.write("".join(self._log_buffer))
+            self._log.flush()
+            self._log_buffer = []
+
+        if self._report_buffer:
+            if self._report is None:
+                self._report = open(self.report_file, "a", encoding="utf-8")
+            self._report.write("".join(self._report_buffer))
+            self._report.flush()
+            self._report_buffer = []
+
+    def close(self):
+        """Flush remaining entries and close the files"""
+        try:
+            self.flush()
+        finally:
+            for handle in (self._log, self._report):
+                if handle is not None:
+                    handle.close()
+            self._log = None
+            self._report = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+        return False
@@ -3,22 +3,146 @@ Field mapping and type conversion utilities
 """
 
 import logging
-from typing import Dict, Any
+from functools import partial
+from typing import Dict, Any, Callable, Iterable, Optional
+
+from .money import Money, DEFAULT_DECIMALS
+
+# Converters for Eshop field type names
+TYPE_CONVERTERS = {
+    "str": str,
+    "int": int,
+    "float": float,
+    "bool": bool,
+    "list": list,
+    "dict": dict
+}
+
+# Owners of a mapped field: the ERP value is synced to the Eshop, the Eshop
+# value is synced back to the ERP, or both sides change a quantity and exchange
+# their changes since the last sync (ERP restocks, Eshop sales)
+FIELD_OWNERS = ("erp", "eshop", "shared")
+
+_MISSING = object()
+
+
+def _cast_to_own_type(value: Any) -> Any:
+    """Fallback converter for fields without a known Eshop type"""
+    converter = TYPE_CONVERTERS.get(type(value).__name__)
+    return converter(value) if converter is not None else value
+
 
 class FieldMapper:
     """Handles field mapping and type conversion between ERP and Eshop"""
     
-    def __init__(self, field_mappings: Dict[str, str], erp_field_types: Dict[str, str], eshop_field_types: Dict[str, str]):
+    def __init__(self, field_mappings: Dict[str, str], erp_field_types: Dict[str, str], eshop_field_types: Dict[str, str],
+                 money_fields: Iterable[str] = (), money_decimals: int = DEFAULT_DECIMALS,
+                 record_type: type = dict, field_ownership: Dict[str, str] = None,
+                 identifier_field: str = "sku"):
         """Initialize FieldMapper with configuration
         
+        Converters are resolved once here, so mapping a product does no
+        type-name dispatch.
+        
         Args:
             field_mappings: Dictionary mapping ERP field names to Eshop field names
             erp_field_types: Dictionary of ERP field types
             eshop_field_types: Dictionary of Eshop field types
+            money_fields: Eshop fields cast to exact Money amounts instead of their Eshop type
+            money_decimals: Decimal places of Money amounts
+            record_type: Type of mapped products, dict or a Record class with the
+                "id", "sku", identifier and mapped Eshop fields
+            field_ownership: Eshop field -> "erp", "eshop" or "shared"; unlisted
+                fields are owned by the ERP. Eshop-owned fields keep their Eshop
+                value and are mapped back to the ERP by map_erp_update. Shared
+                fields are numeric quantities both sides change, reconciled
+                against their last synced value
+            identifier_field: Eshop identifier field, copied along with "id" and "sku"
+                
+        Raises:
+            ValueError: If an owner is unknown or names a field that is not mapped
         """
         self.field_mappings = field_mappings
         self.erp_field_types = erp_field_types
         self.eshop_field_types = eshop_field_types
+        self.money_fields = frozenset(money_fields)
+        self._money_caster = partial(Money.parse, decimals=money_decimals)
+        self.record_type = record_type
+        self.identifier_field = identifier_field
+        
+        # Eshop field -> number of values that could not be cast
+        self.cast_failures = {}
+        
+        self.field_ownership = dict(field_ownership or {})
+        for eshop_field, owner in self.field_ownership.items():
+            if owner not in FIELD_OWNERS:
+                raise ValueError(f"Invalid owner '{owner}' for field {eshop_field}, expected one of {FIELD_OWNERS}")
+            if eshop_field not in field_mappings.values():
+                raise ValueError(f"Field {eshop_field} in FIELD_OWNERSHIP is not a FIELD_MAPPINGS target")
+        
+        # Precompiled (erp_field, eshop_field, converter) tuples for map_product_fields.
+        # Eshop-owned fields have no ERP field, so their Eshop value is kept.
+        self._casters = {}
+        self.mapping_plan = []
+        # Precompiled (eshop_field, erp_field, converter) tuples for map_erp_update
+        # for Eshop-owned fields, and (eshop_field, erp_field) pairs for shared fields
+        self.reverse_plan = []
+        self.shared_plan = []
+        for erp_field, eshop_field in field_mappings.items():
+            owner = self.field_ownership.get(eshop_field)
+            if owner == "eshop":
+                self.mapping_plan.append((None, eshop_field, self._get_caster(eshop_field)))
+                self.reverse_plan.append((eshop_field, erp_field, self._get_erp_caster(erp_field)))
+            else:
+                self.mapping_plan.append((erp_field, eshop_field, self._get_caster(eshop_field)))
+                if owner == "shared":
+                    self.shared_plan.append((eshop_field, erp_field))
+        self.shared_fields = tuple(eshop_field for eshop_field, _ in self.shared_plan)
+        self.reverse_sync = bool(self.reverse_plan or self.shared_plan)
+    
+    def _get_caster(self, eshop_field: str) -> Optional[Callable[[Any], Any]]:
+        """Resolve (and cache) the converter for an Eshop field
+        
+        Args:
+            eshop_field: Target field name in Eshop format
+            
+        Returns:
+            Converter callable, or None if values are passed through unchanged
+        """
+        if eshop_field not in self._casters:
+            if eshop_field in self.money_fields:
+                self._casters[eshop_field] = self._money_caster
+            elif eshop_field in self.eshop_field_types:
+                self._casters[eshop_field] = TYPE_CONVERTERS.get(self.eshop_field_types[eshop_field])
+            else:
+                self._casters[eshop_field] = _cast_to_own_type
+        return self._casters[eshop_field]
+    
+    def _get_erp_caster(self, erp_field: str) -> Optional[Callable[[Any], Any]]:
+        """Resolve the inverse converter from an Eshop value to the ERP field's type
+        
+        Money amounts and other values become text for "str" ERP fields
+        (e.g. Money("12.50") -> "12.50", 42 -> "42").
+        
+        Args:
+            erp_field: Target field name in ERP format
+            
+        Returns:
+            Converter callable, or None if values are passed through unchanged
+        """
+        if erp_field in self.erp_field_types:
+            return TYPE_CONVERTERS.get(self.erp_field_types[erp_field])
+        return None
+    
+    def _cast_failed(self, value: Any, eshop_field: str, error: Exception) -> Any:
+        """Log and count a failed conversion and fall back to the original value"""
+        self.cast_failures[eshop_field] = self.cast_failures.get(eshop_field, 0) + 1
+        if eshop_field in self.money_fields:
+            target_type = "Money"
+        else:
+            target_type = self.eshop_field_types.get(eshop_field, type(value).__name__)
+        logging.warning(f"Failed to cast value {value} to type {target_type}: {error}")
+        return value
     
     def cast_to_eshop_type(self, value: Any, eshop_field: str) -> Any:
         """Cast a value to the expected Eshop field type
@@ -32,47 +156,148 @@ class FieldMapper:
         """
         if value is None:
             return None
-            
-        target_type = self.eshop_field_types.get(eshop_field, type(value).__name__)
+        
+        converter = self._get_caster(eshop_field)
+        if converter is None:
+            return value  # fallback, no conversion
         
         try:
-            if target_type == "str":
-                return str(value)
-            elif target_type == "int":
-                return int(value)
-            elif target_type == "float":
-                return float(value)
-            elif target_type == "bool":
-                return bool(value)
-            elif target_type == "list":
-                return list(value)
-            elif target_type == "dict":
-                return dict(value)
-            else:
-                return value  # fallback, no conversion
+            return converter(value)
         except Exception as e:
-            logging.warning(f"Failed to cast value {value} to type {target_type}: {e}")
-            return value  # fallback if conversion fails
+            return self._cast_failed(value, eshop_field, e)  # fallback if conversion fails
     
-    def map_product_fields(self, erp_product: Dict[str, Any], eshop_product: Dict[str, Any]) -> Dict[str, Any]:
+    def map_product_fields(self, erp_product: Dict[str, Any], eshop_product: Dict[str, Any],
+                           last_synced: Dict[str, Any] = None) -> Dict[str, Any]:
         """Map fields from ERP product to Eshop product format
         
+        A shared field gets the ERP value plus the Eshop's change since the last
+        sync, so ERP restocks reach the Eshop without undoing the Eshop's sales
+        (ERP 12, last synced 10, Eshop 7 after selling 3 -> 9).
+        
         Args:
             erp_product: Source product data from ERP
             eshop_product: Target product data from Eshop (preserves unmapped fields)
+            last_synced: Eshop values of the shared fields after the last sync (None
+                on the first sync, which takes the ERP values as they are)
             
         Returns:
             Product dictionary with fields mapped from ERP to Eshop format
         """
-        mapped_product = {}
+        mapped_product = self.record_type()
         
         # Copy identifier fields
         mapped_product["id"] = eshop_product.get("id")
         mapped_product["sku"] = eshop_product.get("sku")
+        if self.identifier_field != "sku":
+            mapped_product[self.identifier_field] = eshop_product.get(self.identifier_field)
+        
+        # Map fields according to the precompiled plan
+        for erp_field, eshop_field, converter in self.mapping_plan:
+            value = _MISSING if erp_field is None else erp_product.get(erp_field, _MISSING)
+            if value is _MISSING:
+                value = eshop_product.get(eshop_field)
+            
+            if value is not None and converter is not None:
+                try:
+                    value = converter(value)
+                except Exception as e:
+                    value = self._cast_failed(value, eshop_field, e)
+            
+            mapped_product[eshop_field] = value
         
-        # Map fields according to configuration
-        for erp_field, eshop_field in self.field_mappings.items():
-            erp_value = erp_product.get(erp_field, eshop_product.get(eshop_field))
-            mapped_product[eshop_field] = self.cast_to_eshop_type(erp_value, eshop_field)
+        if last_synced:
+            for eshop_field in self.shared_fields:
+                change = self._shared_change(eshop_product, last_synced, eshop_field)
+                if change and mapped_product[eshop_field] is not None:
+                    try:
+                        mapped_product[eshop_field] += change
+                    except TypeError as e:
+                        logging.warning(f"Cannot apply Eshop change {change} to {eshop_field}: {e}")
         
         return mapped_product
+    
+    @staticmethod
+    def _shared_change(eshop_product: Dict[str, Any], last_synced: Dict[str, Any], eshop_field: str) -> Any:
+        """Return the Eshop's change to a shared field since the last sync, or None if unknown"""
+        current = eshop_product.get(eshop_field)
+        last = last_synced.get(eshop_field)
+        if current is None or last is None:
+            return None
+        try:
+            return current - last
+        except TypeError:
+            return None
+    
+    def diff_product_fields(self, mapped_product: Dict[str, Any], eshop_product: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Compare a mapped product with the existing Eshop product
+        
+        Args:
+            mapped_product: Product returned by map_product_fields
+            eshop_product: Current product data from Eshop
+            
+        Returns:
+            Dictionary of changed Eshop fields to {"old": value, "new": value}
+            (empty if nothing changed)
+        """
+        changes = {}
+        
+        for eshop_field in self.field_mappings.values():
+            old_value = eshop_product.get(eshop_field)
+            new_value = mapped_product.get(eshop_field)
+            if new_value != old_value:
+                changes[eshop_field] = {"old": old_value, "new": new_value}
+        
+        return changes
+    
+    def map_erp_update(self, erp_product: Dict[str, Any], eshop_product: Dict[str, Any],
+                       last_synced: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Map Eshop-owned and shared fields back to ERP format
+        
+        Each Eshop-owned value replaces the ERP value. Such a field belongs to the
+        Eshop alone, so no ERP change is lost. Shared fields are changed on both
+        sides, so overwriting the ERP value would undo ERP restocks; for them the
+        Eshop's change since the last sync (e.g. -3 after selling 3) is reported
+        under "adjustments", to be added to the ERP value. Values are cast to the
+        type of their ERP field; adjustments stay numbers, even for text ERP
+        fields, since they are added rather than stored. Values the Eshop does not
+        have (missing or None), values that cannot be cast, values the ERP already
+        holds and zero adjustments are left out.
+        
+        Args:
+            erp_product: Current product data from ERP
+            eshop_product: Source product data from Eshop
+            last_synced: Eshop values of the shared fields after the last sync (None
+                on the first sync, which reports no adjustments)
+            
+        Returns:
+            Dictionary of changed ERP fields to their new values, plus "adjustments"
+            with ERP fields to add to (empty if the ERP is up to date)
+        """
+        update = {}
+        
+        for eshop_field, erp_field, converter in self.reverse_plan:
+            value = eshop_product.get(eshop_field)
+            if value is None:
+                continue
+            
+            if converter is not None:
+                try:
+                    value = converter(value)
+                except Exception as e:
+                    target_type = self.erp_field_types.get(erp_field)
+                    logging.warning(f"Failed to cast value {value} to ERP type {target_type}: {e}")
+                    continue
+            
+            if value != erp_product.get(erp_field):
+                update[erp_field] = value
+        
+        if last_synced:
+            adjustments = {}
+            for eshop_field, erp_field in self.shared_plan:
+                change = self._shared_change(eshop_product, last_synced, eshop_field)
+                if change:
+                    adjustments[erp_field] = change
+            if adjustments:
+                update["adjustments"] = adjustments
+        
+        return update
@@ -0,0 +1,397 @@
+"""
+Async HTTP adapters for fetching ERP products and writing Eshop updates
+"""
+
+import asyncio
+import logging
+import math
+import ssl
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Any, List, Iterable, Optional, Tuple
+from urllib.parse import urlencode, urlsplit
+
+from . import json_codec
+from .records import json_default
+
+DEFAULT_TIMEOUT = 30.0
+
+
+class HttpError(Exception):
+    """Raised for HTTP error responses (status >= 400)"""
+
+    def __init__(self, status: int, body: Any = None, retry_after: Optional[float] = None):
+        super().__init__(f"HTTP {status}: {body}")
+        self.status = status
+        self.body = body
+        self.retry_after = retry_after
+
+
+class _Connection:
+    """A single keep-alive connection"""
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self):
+        self.writer.close()
+
+
+class AsyncHttpClient:
+    """Minimal asyncio HTTP/1.1 JSON client with a pool of keep-alive connections
+
+    At most ``max_connections`` requests are in flight at once; further requests
+    wait for a pooled connection to become free.
+    """
+
+    def __init__(self, base_url: str, max_connections: int = 10, timeout: float = DEFAULT_TIMEOUT,
+                 headers: Dict[str, str] = None):
+        """Initialize the client
+
+        Args:
+            base_url: Base URL such as "http://erp.local:8080/api"
+            max_connections: Maximum number of open connections
+            timeout: Seconds allowed for connecting and for each response
+            headers: Extra headers sent with every request (e.g. authorization)
+
+        Raises:
+            ValueError: If the URL scheme is not http or https
+        """
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"Unsupported URL scheme: {base_url}")
+
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.ssl = ssl.create_default_context() if parts.scheme == "https" else None
+        self.base_path = parts.path.rstrip("/")
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.headers = headers or {}
+        self.connections_opened = 0
+        self._idle = []
+        self._slots = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+        return False
+
+    async def close(self):
+        """Close all idle connections"""
+        while self._idle:
+            self._idle.pop().close()
+
+    async def request(self, method: str, path: str, params: Dict[str, Any] = None,
+                      json_body: Any = None) -> Tuple[int, Any]:
+        """Send a request and return the decoded JSON response
+
+        Args:
+            method: HTTP method
+            path: Path relative to the base URL
+            params: Query string parameters
+            json_body: Value sent as a JSON request body
+
+        Returns:
+            Tuple of (status code, decoded JSON body or None)
+
+        Raises:
+            HttpError: If the response status is 400 or higher (its body is the
+                decoded JSON, or the text of a non-JSON body)
+            json.JSONDecodeError: If a successful response is not valid JSON
+            asyncio.TimeoutError: If connecting or reading the response times out
+            OSError: If the connection fails
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_connections)
+
+        target = self.base_path + path
+        if params:
+            target += "?" + urlencode(params)
+        body = b"" if json_body is None else json_codec.dumps(json_body, compact=True, default=json_default).encode("utf-8")
+
+        async with self._slots:
+            # A pooled connection may have been closed by the server; retry once on a new one
+            for attempt in range(2):
+                reused = bool(self._idle)
+                connection = self._idle.pop() if reused else await self._open()
+                try:
+                    status, headers, payload = await asyncio.wait_for(
+                        self._send(connection, method, target, body), self.timeout
+                    )
+                except (asyncio.IncompleteReadError, ConnectionError) as e:
+                    connection.close()
+                    if reused and attempt == 0:
+                        continue
+                    raise ConnectionError(f"Connection to {self.host}:{self.port} failed: {e}") from e
+                except BaseException:
+                    connection.close()
+                    raise
+                break
+
+            if headers.get("connection", "").lower() == "close":
+                connection.close()
+            else:
+                self._idle.append(connection)
+
+        if status >= 400:
+            raise HttpError(status, _error_body(payload, headers), parse_retry_after(headers.get("retry-after")))
+        return status, json_codec.loads(payload) if payload else None
+
+    async def _open(self) -> _Connection:
+        reader, writer = await asyncio.wait_for(
+            asyncio.open_connection(self.host, self.port, ssl=self.ssl), self.timeout
+        )
+        self.connections_opened += 1
+        return _Connection(reader, writer)
+
+    async def _send(self, connection: _Connection, method: str, target: str,
+                    body: bytes) -> Tuple[int, Dict[str, str], bytes]:
+        lines = [
+            f"{method} {target} HTTP/1.1",
+            f"Host: {self.host}:{self.port}",
+            "Connection: keep-alive",
+            "Accept: application/json",
+            f"Content-Length: {len(body)}"
+        ]
+        if body:
+            lines.append("Content-Type: application/json")
+        lines.extend(f"{name}: {value}" for name, value in self.headers.items())
+        connection.writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1") + body)
+        await connection.writer.drain()
+
+        reader = connection.reader
+        status_line = await reader.readuntil(b"\r\n")
+        status = int(status_line.split()[1])
+
+        headers = {}
+        while True:
+            line = await reader.readuntil(b"\r\n")
+            if line == b"\r\n":
+                break
+            name, _, value = line.decode("latin-1").partition(":")
+            headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    await reader.readuntil(b"\r\n")
+                    break
+                chunks.append(await reader.readexactly(size))
+                await reader.readexactly(2)
+            payload = b"".join(chunks)
+        elif "content-length" in headers:
+            payload = await reader.readexactly(int(headers["content-length"]))
+        elif method == "HEAD" or status in (204, 304) or status < 200:
+            payload = b""
+        else:
+            # Without a length the body ends when the server closes the
+            # connection, so it cannot be reused
+            payload = await reader.read()
+            headers["connection"] = "close"
+
+        return status, headers, payload
+
+
+def parse_retry_after(value: Optional[str], now: datetime = None) -> Optional[float]:
+    """Parse a Retry-After header into seconds
+
+    Args:
+        value: Header value, either delta-seconds ("120") or an HTTP-date
+            ("Wed, 21 Oct 2026 07:28:00 GMT")
+        now: Current time for HTTP-dates (the current UTC time when omitted)
+
+    Returns:
+        Seconds to wait (0 for a date in the past), or None if the value is missing or unparsable
+    """
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            date = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if date.tzinfo is None:
+            date = date.replace(tzinfo=timezone.utc)
+        seconds = (date - (now or datetime.now(timezone.utc))).total_seconds()
+    if not math.isfinite(seconds):
+        return None
+    return max(seconds, 0.0)
+
+
+def _error_body(payload: bytes, headers: Dict[str, str]) -> Any:
+    """Decode an error response body
+
+    Proxies and load balancers often answer errors with HTML or plain text, so
+    the body is decoded as JSON only when it is declared (or undeclared and
+    parses) as JSON; otherwise the text is kept.
+    """
+    if not payload:
+        return None
+    content_type = headers.get("content-type", "").lower()
+    if not content_type or "json" in content_type:
+        try:
+            return json_codec.loads(payload)
+        except ValueError:
+            pass
+    return payload.decode("utf-8", errors="replace")
+
+
+class HttpErpSource:
+    """Fetches ERP products from a paginated JSON API
+
+    Each page is requested as ``GET {path}?page=N&page_size=M`` and must return
+    ``{"products": [...], "total_pages": T}``. The first page is fetched alone to
+    learn the page count; the remaining pages are fetched concurrently with at most
+    ``max_in_flight`` requests outstanding.
+    """
+
+    def __init__(self, client: AsyncHttpClient, path: str = "/products", page_size: int = 500,
+                 max_in_flight: int = 8):
+        self.client = client
+        self.path = path
+        self.page_size = page_size
+        self.max_in_flight = max_in_flight
+
+    async def fetch_page(self, page: int) -> Dict[str, Any]:
+        """Fetch a single page of products
+
+        Args:
+            page: Page number, starting at 1
+
+        Returns:
+            Decoded page response
+        """
+        _, data = await self.client.request("GET", self.path, {"page": page, "page_size": self.page_size})
+        return data or {}
+
+    async def fetch_products(self) -> List[Dict[str, Any]]:
+        """Fetch all products, preserving page order
+
+        Returns:
+            List of ERP product dictionaries
+
+        Raises:
+            ValueError: If no products are returned
+            HttpError: If any page request fails
+        """
+        first_page = await self.fetch_page(1)
+        total_pages = int(first_page.get("total_pages", 1))
+        pages = [first_page]
+
+        if total_pages > 1:
+            in_flight = asyncio.Semaphore(self.max_in_flight)
+
+            async def fetch(page):
+                async with in_flight:
+                    return await self.fetch_page(page)
+
+            pages.extend(await asyncio.gather(*(fetch(page) for page in range(2, total_pages + 1))))
+
+        products = [product for page in pages for product in page.get("products") or []]
+        if not products:
+            logging.error("No products found in ERP response")
+            raise ValueError("No products found in ERP response")
+        return products
+
+
+class HttpEshopSink:
+    """Writes products to an Eshop bulk update endpoint
+
+    Products are grouped into batches of ``batch_size`` and sent as
+    ``POST {path}`` with body ``{"products": [...]}``, with at most
+    ``max_in_flight`` batches outstanding.
+    """
+
+    def __init__(self, client: AsyncHttpClient, path: str = "/products/bulk", batch_size: int = 500,
+                 max_in_flight: int = 4):
+        self.client = client
+        self.path = path
+        self.batch_size = batch_size
+        self.max_in_flight = max_in_flight
+
+    async def write_batch(self, batch: List[Dict[str, Any]]) -> Any:
+        """Send one bulk update
+
+        Args:
+            batch: Products to update
+
+        Returns:
+            Decoded response body
+
+        Raises:
+            HttpError: If the endpoint returns an error status
+        """
+        _, data = await self.client.request("POST", self.path, json_body={"products": batch})
+        return data
+
+    async def write_products(self, products: Iterable[Dict[str, Any]]) -> int:
+        """Send all products in concurrent bulk updates
+
+        Args:
+            products: Products to update (list or generator)
+
+        Returns:
+            Number of products sent
+
+        Raises:
+            HttpError: If any batch fails
+        """
+        in_flight = asyncio.Semaphore(self.max_in_flight)
+        tasks = []
+        count = 0
+
+        async def send(batch):
+            try:
+                await self.write_batch(batch)
+            finally:
+                in_flight.release()
+
+        try:
+            batch = []
+            for product in products:
+                batch.append(product)
+                if len(batch) >= self.batch_size:
+                    await in_flight.acquire()
+                    tasks.append(asyncio.ensure_future(send(batch)))
+                    count += len(batch)
+                    batch = []
+            if batch:
+                await in_flight.acquire()
+                tasks.append(asyncio.ensure_future(send(batch)))
+                count += len(batch)
+            await asyncio.gather(*tasks)
+        except BaseException:
+            for task in tasks:
+                task.cancel()
+            raise
+
+        return count
+
+
+def fetch_erp_products(base_url: str, path: str = "/products", page_size: int = 500,
+                       max_in_flight: int = 8, timeout: float = DEFAULT_TIMEOUT) -> List[Dict[str, Any]]:
+    """Fetch all ERP products from a paginated API (blocking wrapper)
+
+    Args:
+        base_url: ERP API base URL
+        path: Products endpoint path
+        page_size: Products requested per page
+        max_in_flight: Maximum concurrent page requests
+        timeout: Seconds allowed per request
+
+    Returns:
+        List of ERP product dictionaries
+    """
+    async def run():
+        async with AsyncHttpClient(base_url, max_in_flight, timeout) as client:
+            return await HttpErpSource(client, path, page_size, max_in_flight).fetch_products()
+
+    return asyncio.run(run())
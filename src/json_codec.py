@@ -0,0 +1,208 @@
+"""
+Pluggable JSON codec using the fastest installed backend
+"""
+
+import json
+import re
+from functools import lru_cache
+from typing import Any, Callable, IO, Union
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import ujson
+except ImportError:
+    ujson = None
+
+# Backends in order of preference for "auto"
+BACKENDS = ("orjson", "ujson", "json")
+
+# Raised by loads() and load() with every backend
+JSONDecodeError = json.JSONDecodeError
+
+_NESTED_INDENT = re.compile(r"\n( +)")
+
+
+class JsonCodec:
+    """JSON codec backed by the standard library
+
+    Output is what json.dumps writes with ensure_ascii=False: keys in insertion
+    order, non-ASCII text unescaped, ", "/": " separators, or "," and ":" when
+    compact. Faster backends subclass this and fall back to it for anything they
+    cannot encode or decode the same way.
+    """
+
+    name = "json"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        """Decode a JSON document
+
+        Raises:
+            json.JSONDecodeError: If the document is not valid JSON
+        """
+        return json.loads(data)
+
+    def load(self, f: IO) -> Any:
+        """Decode a JSON document from a text or binary file
+
+        Raises:
+            json.JSONDecodeError: If the document is not valid JSON
+        """
+        return self.loads(f.read())
+
+    def dumps(self, obj: Any, indent: int = None, compact: bool = False,
+              default: Callable[[Any], Any] = None, sort_keys: bool = False) -> str:
+        """Encode a value as JSON text
+
+        Args:
+            obj: Value to encode
+            indent: Spaces per indentation level (None writes one line)
+            compact: Drop the spaces after separators
+            default: Called for values the encoder does not support
+            sort_keys: Sort dictionary keys
+
+        Raises:
+            TypeError: If a value cannot be serialized
+            ValueError: For circular references
+        """
+        return _encoder(indent, compact, default, sort_keys).encode(obj)
+
+    def dump(self, obj: Any, f: IO[str], **options):
+        """Encode a value as JSON into a text file (options as for dumps)"""
+        f.write(self.dumps(obj, **options))
+
+
+@lru_cache(maxsize=64)
+def _encoder(indent: int, compact: bool, default: Callable[[Any], Any], sort_keys: bool) -> json.JSONEncoder:
+    # json.dumps builds a new encoder whenever options are passed, which costs
+    # more than encoding a small product
+    return json.JSONEncoder(indent=indent, separators=(",", ":") if compact else None,
+                            ensure_ascii=False, default=default, sort_keys=sort_keys)
+
+
+class OrjsonCodec(JsonCodec):
+    """JSON codec backed by orjson
+
+    orjson writes the same bytes as the standard library for compact and
+    indented output, except that floats below 1e-4 or from 1e16 up use a shorter
+    exponent ("1e16" instead of "1e+16") and NaN and infinities become null.
+    Integers beyond 64 bits are decoded as floats. Single-line output with
+    spaces after separators, odd indents and values orjson rejects (such as
+    lone surrogates or non-string keys) go through the standard library.
+    """
+
+    name = "orjson"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            # NaN and Infinity are accepted by the standard library, which also
+            # raises its own, familiar errors for invalid documents
+            return json.loads(data)
+
+    def dumps(self, obj: Any, indent: int = None, compact: bool = False,
+              default: Callable[[Any], Any] = None, sort_keys: bool = False) -> str:
+        if indent is None and not compact or indent is not None and (indent <= 0 or indent % 2):
+            return super().dumps(obj, indent, compact, default, sort_keys)
+
+        option = orjson.OPT_SORT_KEYS if sort_keys else 0
+        if indent is not None:
+            option |= orjson.OPT_INDENT_2
+        try:
+            text = orjson.dumps(obj, default=default, option=option).decode("utf-8")
+        except orjson.JSONEncodeError:
+            return super().dumps(obj, indent, compact, default, sort_keys)
+
+        if indent is None or indent == 2:
+            return text
+        # orjson only indents by two spaces. Strings never contain raw newlines,
+        # so each newline is followed by indentation only.
+        if "\n    " not in text:
+            return text.replace("\n  ", "\n" + " " * indent)
+        scale = indent // 2
+        return _NESTED_INDENT.sub(lambda match: "\n" + match.group(1) * scale, text)
+
+
+class UjsonCodec(JsonCodec):
+    """JSON codec decoding with ujson and encoding with the standard library
+
+    ujson's float and escape formatting differs from the standard library, so it
+    is only used to decode.
+    """
+
+    name = "ujson"
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        try:
+            return ujson.loads(data)
+        except ValueError:
+            return json.loads(data)
+
+
+_CODECS = {"orjson": OrjsonCodec, "ujson": UjsonCodec, "json": JsonCodec}
+_INSTALLED = {"orjson": orjson is not None, "ujson": ujson is not None, "json": True}
+
+
+def get_codec(backend: str = "auto") -> JsonCodec:
+    """Return a codec for a backend
+
+    Args:
+        backend: "orjson", "ujson", "json" or "auto" for the first installed
+            backend in BACKENDS
+
+    Returns:
+        JSON codec
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    if backend == "auto":
+        backend = next(name for name in BACKENDS if _INSTALLED[name])
+    if backend not in _CODECS:
+        raise ValueError(f"Unknown JSON backend: {backend} (use auto, {', '.join(BACKENDS)})")
+    if not _INSTALLED[backend]:
+        raise ValueError(f"JSON backend {backend} is not installed")
+    return _CODECS[backend]()
+
+
+_codec = get_codec()
+
+
+def set_backend(backend: str) -> JsonCodec:
+    """Select the codec used by the module-level functions
+
+    Raises:
+        ValueError: If the backend is unknown or not installed
+    """
+    global _codec
+    _codec = get_codec(backend)
+    return _codec
+
+
+def backend() -> str:
+    """Name of the backend used by the module-level functions"""
+    return _codec.name
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """Decode a JSON document with the selected backend (see JsonCodec.loads)"""
+    return _codec.loads(data)
+
+
+def load(f: IO) -> Any:
+    """Decode a JSON file with the selected backend (see JsonCodec.load)"""
+    return _codec.load(f)
+
+
+def dumps(obj: Any, **options) -> str:
+    """Encode a value with the selected backend (see JsonCodec.dumps)"""
+    return _codec.dumps(obj, **options)
+
+
+def dump(obj: Any, f: IO[str], **options):
+    """Encode a value into a text file with the selected backend (see JsonCodec.dumps)"""
+    _codec.dump(obj, f, **options)
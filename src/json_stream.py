@@ -0,0 +1,121 @@
+"""
+Incremental JSON parsing for large product exports
+"""
+
+import json
+from typing import Any, Iterator, TextIO
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = " \t\n\r"
+
+
+class _Reader:
+    """Buffered reader that decodes JSON values from a text stream chunk by chunk"""
+
+    def __init__(self, stream: TextIO, chunk_size: int):
+        self.stream = stream
+        self.chunk_size = chunk_size
+        self.decoder = json.JSONDecoder()
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self) -> bool:
+        """Read another chunk into the buffer, dropping consumed text"""
+        if self.eof:
+            return False
+        chunk = self.stream.read(self.chunk_size)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self) -> str:
+        """Return the next non-whitespace character without consuming it ("" at EOF)"""
+        while True:
+            while self.pos < len(self.buffer) and self.buffer[self.pos] in _WHITESPACE:
+                self.pos += 1
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, char: str):
+        """Consume the next non-whitespace character, which must be ``char``"""
+        if self.peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self.buffer, self.pos)
+        self.pos += 1
+
+    def value(self) -> Any:
+        """Decode the next complete JSON value, reading more input as needed"""
+        self.peek()
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError:
+                if not self._fill():
+                    raise
+                continue
+            # A number at the end of the buffer may continue in the next chunk
+            if end == len(self.buffer) and not self.eof and self._fill():
+                continue
+            self.pos = end
+            return value
+
+
+def iter_json_array(stream: TextIO, key: str, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the items of the array stored under ``key`` in a top-level JSON object
+
+    Only one item is held in memory at a time, so memory use is bounded by the
+    largest item rather than the size of the document.
+
+    Args:
+        stream: Text stream positioned at the start of the JSON document
+        key: Top-level key holding the array
+        chunk_size: Number of characters read per chunk
+
+    Yields:
+        Each item of the array in document order
+
+    Raises:
+        json.JSONDecodeError: If the document is not valid JSON
+        KeyError: If the key is not present in the top-level object
+        TypeError: If the value under the key is not an array
+    """
+    reader = _Reader(stream, chunk_size)
+    reader.expect("{")
+    found = False
+
+    if reader.peek() != "}":
+        while True:
+            name = reader.value()
+            reader.expect(":")
+
+            if name == key and not found:
+                found = True
+                if reader.peek() != "[":
+                    raise TypeError(f"Value of '{key}' is not an array")
+                reader.expect("[")
+                if reader.peek() != "]":
+                    while True:
+                        yield reader.value()
+                        if reader.peek() == "]":
+                            break
+                        reader.expect(",")
+                reader.expect("]")
+            else:
+                # Skip values of other keys
+                reader.value()
+
+            if reader.peek() == "}":
+                break
+            reader.expect(",")
+
+    reader.expect("}")
+    if reader.peek():
+        raise json.JSONDecodeError("Extra data", reader.buffer, reader.pos)
+    if not found:
+        raise KeyError(key)
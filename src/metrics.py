@@ -0,0 +1,207 @@
+"""
+Stage timing and throughput metrics for sync runs
+"""
+
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, Any, Iterable, Iterator, Optional
+
+from . import json_codec
+
+try:
+    import resource
+except ImportError:  # not available on Windows
+    resource = None
+
+# Pipeline stages in the order they run
+STAGES = ("load_erp", "load_eshop", "type_inference", "index_build", "match", "map", "validate", "write")
+
+
+def peak_rss_bytes() -> Optional[int]:
+    """Return the peak resident set size of this process in bytes (None if unknown)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in kilobytes elsewhere
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+class _Block:
+    """An open stage() block and the stage times recorded inside it"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.wall_start = time.perf_counter()
+        self.cpu_start = time.process_time()
+        self.timed = {}      # stage -> [wall, cpu] measured with both clocks
+        self.wall_only = {}  # stage -> wall, CPU apportioned at close
+
+
+class SyncMetrics:
+    """Wall and CPU time per pipeline stage, row throughput and peak memory
+
+    Blocks of work are timed with stage(). Work done per product (mapping,
+    validation, reading streamed input) is timed on the wall clock only and
+    reported with add_wall(), since reading the process CPU clock per product
+    costs more than mapping one. Time recorded inside an open stage() block is
+    carved out of that block, and the block's CPU time left after exactly timed
+    work is split between it and the wall-only stages in proportion to wall time.
+
+    Usage:
+        metrics = SyncMetrics()
+        with metrics.stage("load_erp"):
+            products = load()
+        metrics.finish()
+        metrics.to_dict()
+    """
+
+    def __init__(self):
+        self.stages = {}
+        self.rows = 0
+        self.synced = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.peak_rss_bytes = None
+        self._open = []
+        self._wall_start = time.perf_counter()
+        self._cpu_start = time.process_time()
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block of work as the given stage"""
+        block = _Block(name)
+        self._open.append(block)
+        try:
+            yield
+        finally:
+            self._open.remove(block)
+            self._close_block(block)
+
+    def add(self, name: str, wall: float, cpu: float = 0.0, nested: bool = True):
+        """Record time measured with both clocks
+
+        Args:
+            name: Stage name
+            wall: Wall clock seconds
+            cpu: CPU seconds
+            nested: Carve the time out of the innermost open block; pass False for
+                time spent in other processes
+        """
+        if nested and self._open:
+            totals = self._open[-1].timed.setdefault(name, [0.0, 0.0])
+            totals[0] += wall
+            totals[1] += cpu
+        else:
+            self._record(name, wall, cpu)
+
+    def add_wall(self, name: str, wall: float):
+        """Record per-item time measured on the wall clock only
+
+        Outside an open block the stage is recorded with no CPU time.
+        """
+        if self._open:
+            block = self._open[-1]
+            block.wall_only[name] = block.wall_only.get(name, 0.0) + wall
+        else:
+            self._record(name, wall, 0.0)
+
+    def timed(self, items: Iterable[Any], name: str) -> Iterator[Any]:
+        """Wrap an iterable, recording the time spent producing its items as a stage"""
+        iterator = iter(items)
+        elapsed = 0.0
+        try:
+            while True:
+                start = time.perf_counter()
+                try:
+                    item = next(iterator)
+                except StopIteration:
+                    elapsed += time.perf_counter() - start
+                    return
+                elapsed += time.perf_counter() - start
+                yield item
+        finally:
+            self.add_wall(name, elapsed)
+
+    def merge(self, stages: Dict[str, Dict[str, float]]):
+        """Add stage times reported by another process (see to_dict()["stages"])"""
+        for name, times in stages.items():
+            self.add(name, times["wall_seconds"], times["cpu_seconds"], nested=False)
+
+    def finish(self):
+        """Record total run time and peak memory up to now"""
+        self.wall_seconds = time.perf_counter() - self._wall_start
+        self.cpu_seconds = time.process_time() - self._cpu_start
+        self.peak_rss_bytes = peak_rss_bytes()
+
+    @property
+    def rows_per_sec(self) -> float:
+        """Eshop products processed per second of run time"""
+        return self.rows / self.wall_seconds if self.wall_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the metrics as a JSON-serializable dictionary"""
+        names = [name for name in STAGES if name in self.stages]
+        names += sorted(name for name in self.stages if name not in STAGES)
+        return {
+            "stages": {
+                name: {
+                    "wall_seconds": round(self.stages[name][0], 6),
+                    "cpu_seconds": round(self.stages[name][1], 6)
+                }
+                for name in names
+            },
+            "rows": self.rows,
+            "synced": self.synced,
+            "wall_seconds": round(self.wall_seconds, 6),
+            "cpu_seconds": round(self.cpu_seconds, 6),
+            "rows_per_sec": round(self.rows_per_sec, 1),
+            "peak_rss_bytes": self.peak_rss_bytes
+        }
+
+    def summary(self) -> str:
+        """Return a one-line human-readable summary"""
+        stages = ", ".join(
+            f"{name} {times['wall_seconds']:.3f}s (cpu {times['cpu_seconds']:.3f}s)"
+            for name, times in self.to_dict()["stages"].items()
+        )
+        rss = f"{self.peak_rss_bytes / 1048576:.1f} MB" if self.peak_rss_bytes else "unknown"
+        return f"Stage timings: {stages}. {self.rows_per_sec:,.0f} rows/sec, peak RSS {rss}"
+
+    def write_report(self, file_path: str, extra: Dict[str, Any] = None):
+        """Write the metrics to a JSON run report
+
+        Args:
+            file_path: Report file (overwritten)
+            extra: Additional top-level fields (e.g. run timestamp and stats)
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        report = dict(extra or {})
+        report.update(self.to_dict())
+        with open(file_path, "w", encoding="utf-8") as f:
+            json_codec.dump(report, f, indent=4)
+
+    def _record(self, name: str, wall: float, cpu: float):
+        totals = self.stages.setdefault(name, [0.0, 0.0])
+        totals[0] += wall
+        totals[1] += cpu
+
+    def _close_block(self, block: _Block):
+        wall = time.perf_counter() - block.wall_start
+        cpu = time.process_time() - block.cpu_start
+
+        for name, (child_wall, child_cpu) in block.timed.items():
+            self.add(name, child_wall, child_cpu)
+            wall -= child_wall
+            cpu -= child_cpu
+        wall = max(wall, 0.0)
+        cpu = max(cpu, 0.0)
+
+        # Split the remaining CPU time by wall time
+        own_wall = max(wall - sum(block.wall_only.values()), 0.0)
+        for name, child_wall in block.wall_only.items():
+            share = cpu * child_wall / wall if wall > 0 else 0.0
+            self.add(name, child_wall, share)
+        self.add(block.name, own_wall, cpu * own_wall / wall if wall > 0 else cpu)
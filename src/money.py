@@ -0,0 +1,237 @@
+"""
+Exact fixed-point money amounts stored as integer minor units
+"""
+
+import math
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+from functools import total_ordering
+from typing import Any
+
+# Default number of decimal places (cents)
+DEFAULT_DECIMALS = 2
+
+# Amounts with at most this many significant digits serialize as exact JSON numbers
+_FLOAT_EXACT_DIGITS = 15
+
+_SCALES = tuple(10 ** i for i in range(19))
+
+
+def _parse_decimal(value: Any, decimals: int) -> int:
+    """Slow path: parse through Decimal, rounding half up to the given decimals"""
+    try:
+        amount = value if isinstance(value, Decimal) else Decimal(value.strip())
+        if not amount.is_finite():
+            raise ValueError(f"Invalid money amount: {value!r}")
+        return int(amount.scaleb(decimals).quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    except InvalidOperation:
+        raise ValueError(f"Invalid money amount: {value!r}") from None
+
+
+def parse_minor_units(value: Any, decimals: int = DEFAULT_DECIMALS) -> int:
+    """Convert an amount to integer minor units
+
+    Plain decimal strings such as "600" or "-32.00" with at most ``decimals``
+    decimal places are parsed with integer arithmetic only. Other strings
+    (exponents, more decimal places) and Decimal values go through Decimal and
+    are rounded half up. Floats are read from their shortest repr, so 0.1 is
+    10 cents, not 10.000000000000000555 cents.
+
+    Args:
+        value: String, int, float, Decimal or Money amount
+        decimals: Number of decimal places of the minor unit
+
+    Returns:
+        Amount in minor units
+
+    Raises:
+        ValueError: If the value is not a finite number
+        TypeError: If the value has an unsupported type
+    """
+    value_type = type(value)
+
+    if value_type is str:
+        # Fast path: drop the decimal point and scale the integer (int() accepts
+        # the same signs, whitespace and underscores as Decimal)
+        text = value.strip()
+        try:
+            if text[-decimals - 1:-decimals] == ".":
+                return int(text.replace(".", "", 1))
+            point = text.find(".")
+            if point < 0:
+                return int(text) * _SCALES[decimals]
+            places = len(text) - point - 1
+            if places <= decimals:
+                return int(text.replace(".", "", 1)) * _SCALES[decimals - places]
+        except ValueError:
+            pass
+        return _parse_decimal(text, decimals)
+
+    if value_type is int:
+        return value * _SCALES[decimals]
+
+    if value_type is float:
+        if not math.isfinite(value):
+            raise ValueError(f"Invalid money amount: {value!r}")
+        return parse_minor_units(repr(value), decimals)
+
+    if isinstance(value, Money):
+        if value.decimals <= decimals:
+            return value.minor * _SCALES[decimals - value.decimals]
+        return _parse_decimal(value.to_decimal(), decimals)
+
+    if isinstance(value, Decimal):
+        return _parse_decimal(value, decimals)
+
+    raise TypeError(f"Cannot convert {value_type.__name__} to a money amount")
+
+
+@total_ordering
+class Money:
+    """Exact amount of money as integer minor units
+
+    Compares equal to ints, Decimals and floats (read from their shortest repr)
+    of the same value, so delta sync sees ``Money.parse("100.00")`` and an Eshop
+    price of 100.0 as unchanged. Adding or subtracting such a value gives a
+    Money amount with this amount's decimals (the other value rounded half up
+    to them), which is how shared money fields are reconciled.
+
+    Usage:
+        price = Money.parse("32.00")
+        price.minor   # 3200
+        str(price)    # "32.00"
+    """
+
+    __slots__ = ("minor", "decimals")
+
+    def __init__(self, minor: int, decimals: int = DEFAULT_DECIMALS):
+        """Initialize a Money amount
+
+        Args:
+            minor: Amount in minor units (e.g. cents)
+            decimals: Number of decimal places of the minor unit
+        """
+        self.minor = minor
+        self.decimals = decimals
+
+    @classmethod
+    def parse(cls, value: Any, decimals: int = DEFAULT_DECIMALS) -> "Money":
+        """Create a Money amount from a string, int, float, Decimal or Money
+
+        Raises:
+            ValueError: If the value is not a finite number
+            TypeError: If the value has an unsupported type
+        """
+        # Skips __init__; this runs once per mapped value
+        money = object.__new__(cls)
+        money.minor = parse_minor_units(value, decimals)
+        money.decimals = decimals
+        return money
+
+    def to_decimal(self) -> Decimal:
+        return Decimal(self.minor).scaleb(-self.decimals)
+
+    def to_json(self) -> Any:
+        """Return the JSON value of the amount
+
+        Amounts with at most 15 significant digits are returned as floats, whose
+        shortest repr is exactly the decimal amount (trailing zeros dropped);
+        larger amounts are returned as strings to stay exact.
+        """
+        if abs(self.minor) < _SCALES[_FLOAT_EXACT_DIGITS]:
+            return self.minor / _SCALES[self.decimals]
+        return str(self)
+
+    @staticmethod
+    def _decimal_of(other: Any):
+        """Exact decimal value of a comparable amount, or None"""
+        if isinstance(other, Money):
+            return other.to_decimal()
+        if isinstance(other, Decimal):
+            return other
+        if type(other) is int:
+            return Decimal(other)
+        if type(other) is float and math.isfinite(other):
+            return Decimal(repr(other))
+        return None
+
+    def __eq__(self, other: Any) -> bool:
+        if type(other) is Money and other.decimals == self.decimals:
+            return self.minor == other.minor
+        value = self._decimal_of(other)
+        if value is None:
+            return False if isinstance(other, (bool, float)) else NotImplemented
+        return self.to_decimal() == value
+
+    def __lt__(self, other: Any) -> bool:
+        if type(other) is Money and other.decimals == self.decimals:
+            return self.minor < other.minor
+        value = self._decimal_of(other)
+        if value is None:
+            return NotImplemented
+        return self.to_decimal() < value
+
+    def _minor_of(self, other: Any):
+        """Minor units of a comparable amount at this amount's decimals, or None"""
+        if self._decimal_of(other) is None:
+            return None
+        try:
+            return parse_minor_units(other, self.decimals)
+        except (TypeError, ValueError):
+            return None
+
+    def __add__(self, other: Any) -> "Money":
+        minor = self._minor_of(other)
+        if minor is None:
+            return NotImplemented
+        return Money(self.minor + minor, self.decimals)
+
+    __radd__ = __add__
+
+    def __sub__(self, other: Any) -> "Money":
+        minor = self._minor_of(other)
+        if minor is None:
+            return NotImplemented
+        return Money(self.minor - minor, self.decimals)
+
+    def __rsub__(self, other: Any) -> "Money":
+        minor = self._minor_of(other)
+        if minor is None:
+            return NotImplemented
+        return Money(minor - self.minor, self.decimals)
+
+    def __neg__(self) -> "Money":
+        return Money(-self.minor, self.decimals)
+
+    def __hash__(self) -> int:
+        # Matches the hash of an equal int or float
+        return hash(self.minor / _SCALES[self.decimals])
+
+    def __bool__(self) -> bool:
+        return self.minor != 0
+
+    def __float__(self) -> float:
+        return self.minor / _SCALES[self.decimals]
+
+    def __str__(self) -> str:
+        if not self.decimals:
+            return str(self.minor)
+        digits = str(abs(self.minor)).rjust(self.decimals + 1, "0")
+        sign = "-" if self.minor < 0 else ""
+        return f"{sign}{digits[:-self.decimals]}.{digits[-self.decimals:]}"
+
+    def __repr__(self) -> str:
+        return f"Money('{self}')"
+
+    def __reduce__(self):
+        return Money, (self.minor, self.decimals)
+
+
+def json_default(value: Any) -> Any:
+    """``default`` hook for json.dumps that serializes Money amounts
+
+    Raises:
+        TypeError: For any other unserializable value
+    """
+    if isinstance(value, Money):
+        return value.to_json()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
@@ -0,0 +1,208 @@
+"""
+Streaming output writer for synced products
+"""
+
+import os
+import tempfile
+from typing import Dict, Any
+
+from . import json_codec
+from .records import json_default
+
+OUTPUT_FORMATS = ("json", "ndjson")
+
+# Indented JSON records are encoded this many at a time unless the backend is
+# orjson. The standard library indents in pure Python and sets up more per call
+# than it spends encoding one product, so per-record calls were slower than a
+# single json.dump; orjson is fastest per record.
+INDENT_BATCH_SIZE = 1000
+
+
+class OutputWriteError(Exception):
+    """Raised when the output file cannot be written"""
+
+
+def _default_file_mode() -> int:
+    """File mode a plain open() would create, honoring the process umask"""
+    umask = os.umask(0)
+    os.umask(umask)
+    return 0o666 & ~umask
+
+
+# Read once at import: os.umask() can only be read by setting it, which is
+# process-wide and would race with writers opened from other threads
+_FILE_MODE = _default_file_mode()
+
+
+class SyncedProductWriter:
+    """Writes products one at a time as a JSON array or NDJSON
+
+    Records are written to a temporary file next to the target, which is renamed
+    over the target only when the writer is closed successfully. A crash or error
+    mid-run leaves any previous output file untouched. Without orjson, indented
+    JSON arrays are encoded in batches of INDENT_BATCH_SIZE records, so a record
+    that cannot be serialized may only raise on a later write() or on close().
+
+    Usage:
+        with SyncedProductWriter("out.json") as writer:
+            for product in products:
+                writer.write(product)
+    """
+
+    def __init__(self, file_path: str, output_format: str = "json", compact: bool = False):
+        """Initialize the writer
+
+        Args:
+            file_path: Final output file path
+            output_format: "json" for a JSON array or "ndjson" for one record per line
+            compact: Write without indentation or spaces after separators
+
+        Raises:
+            ValueError: If the output format is not supported
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f"Invalid output format '{output_format}', expected one of {OUTPUT_FORMATS}")
+
+        self.file_path = file_path
+        self.output_format = output_format
+        self.compact = compact
+        self.count = 0
+        self._file = None
+        self._temp_path = None
+        self._batched = False
+        self._pending = []
+        self._flushed = False
+
+    def open(self):
+        """Create the temporary output file
+
+        Raises:
+            OutputWriteError: If the temporary file cannot be created
+        """
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        try:
+            fd, self._temp_path = tempfile.mkstemp(
+                dir=directory, prefix=f".{os.path.basename(self.file_path)}.", suffix=".tmp"
+            )
+            os.chmod(self._temp_path, _FILE_MODE)
+            self._file = os.fdopen(fd, "w", encoding="utf-8")
+            self._batched = self.output_format == "json" and not self.compact and json_codec.backend() != "orjson"
+            if self.output_format == "json":
+                self._file.write("[")
+        except OSError as e:
+            self._discard()
+            raise OutputWriteError(e) from e
+
+    def write(self, product: Dict[str, Any]):
+        """Write a single product record
+
+        Args:
+            product: Product dictionary to write
+
+        Raises:
+            OutputWriteError: If the record cannot be serialized or written
+        """
+        try:
+            if self.output_format == "ndjson":
+                self._file.write(json_codec.dumps(product, compact=self.compact, default=json_default))
+                self._file.write("\n")
+            elif self.compact:
+                if self.count:
+                    self._file.write(",")
+                self._file.write(json_codec.dumps(product, compact=True, default=json_default))
+            elif self._batched:
+                self._pending.append(product)
+                if len(self._pending) >= INDENT_BATCH_SIZE:
+                    self._write_pending()
+            else:
+                # Same layout as json.dump(products, indent=4)
+                self._file.write(",\n    " if self.count else "\n    ")
+                self._file.write(json_codec.dumps(product, indent=4, default=json_default).replace("\n", "\n    "))
+        except (OSError, TypeError, ValueError) as e:
+            raise OutputWriteError(e) from e
+
+        self.count += 1
+
+    def _write_pending(self):
+        """Encode and write the buffered records of an indented JSON array"""
+        pending, self._pending = self._pending, []
+        # Same layout as json.dump(products, indent=4): drop the batch's own
+        # brackets and join batches with commas
+        text = json_codec.dumps(pending, indent=4, default=json_default)
+        self._file.write(("," if self._flushed else "") + text[1:-2])
+        self._flushed = True
+
+    def close(self):
+        """Finish the document and atomically replace the target file
+
+        Raises:
+            OutputWriteError: If buffered records cannot be serialized or the file
+                cannot be flushed or renamed
+        """
+        self.finish()
+        self.publish()
+
+    def finish(self):
+        """Finish the document in the temporary file without replacing the target
+
+        Call publish() to replace the target file, or abort() to discard it.
+
+        Raises:
+            OutputWriteError: If buffered records cannot be serialized or the file
+                cannot be flushed
+        """
+        try:
+            if self._pending:
+                self._write_pending()
+            if self.output_format == "json":
+                self._file.write("\n]" if self.count and not self.compact else "]")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._file.close()
+            self._file = None
+        except (OSError, TypeError, ValueError) as e:
+            self._discard()
+            raise OutputWriteError(e) from e
+
+    def publish(self):
+        """Atomically replace the target file with the finished temporary file
+
+        Raises:
+            OutputWriteError: If the file cannot be renamed
+        """
+        try:
+            os.replace(self._temp_path, self.file_path)
+            self._temp_path = None
+        except OSError as e:
+            self._discard()
+            raise OutputWriteError(e) from e
+
+    def abort(self):
+        """Discard everything written so far, leaving the target file untouched"""
+        self._discard()
+
+    def _discard(self):
+        self._pending = []
+        if self._file is not None:
+            try:
+                self._file.close()
+            except OSError:
+                pass
+            self._file = None
+        if self._temp_path is not None:
+            try:
+                os.unlink(self._temp_path)
+            except OSError:
+                pass
+            self._temp_path = None
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
@@ -2,12 +2,204 @@
 Core product synchronization logic
 """
 
-import json
 import logging
-from typing import Dict, Any, List
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor
+from collections import deque
+from collections.abc import Sequence
+from itertools import chain, islice
+from typing import Dict, Any, List, Callable, Iterable, Iterator, Optional, Tuple
 from .data_loader import DataLoader
 from .field_mapper import FieldMapper
 from .validator import ProductValidator
+from .error_log import DEFAULT_FLUSH_EVERY
+from .output_writer import OutputWriteError, SyncedProductWriter
+from .state_store import SyncStateStore
+from .http_adapters import fetch_erp_products
+from .metrics import SyncMetrics
+from .prometheus import SyncExporter
+from .schema import Schema, SchemaCache, DEFAULT_SAMPLE_SIZE
+from .money import DEFAULT_DECIMALS
+from .records import record_type
+from .snapshot import EshopSnapshot, SnapshotError
+from .sinks import ProductSink, FileSink, AdaptiveBatchSizer, SinkError, SinkThrottled, SinkUnavailable
+from .resilience import RetryPolicy, CircuitBreaker, DeadLetterLog
+
+# Eshop products sent to a worker process at a time when SYNC_WORKERS > 1
+DEFAULT_SYNC_CHUNK_SIZE = 5000
+
+# Policies for ERP products sharing the same SKU
+DUPLICATE_SKU_POLICIES = ("first", "last", "reject")
+
+# Outcomes of syncing a single Eshop product
+SYNCED = "synced"
+MISSING_IN_ERP = "missing_in_erp"
+UNCHANGED_SINCE_LAST_RUN = "unchanged_since_last_run"
+UNCHANGED = "unchanged"
+FAILED_VALIDATION = "failed_validation"
+
+
+def process_eshop_products(eshop_products: Iterable[Dict[str, Any]], erp_index: Dict[str, Dict[str, Any]],
+                           field_mapper: FieldMapper, validator: ProductValidator, identifier_field: str,
+                           delta_sync: bool = False, state_store: SyncStateStore = None,
+                           stored_hashes: Dict[str, str] = None,
+                           timings: Dict[str, float] = None,
+                           synced_values: Dict[str, Dict[str, Any]] = None) -> Iterator[Tuple]:
+    """Map and validate Eshop products against their ERP match, without side effects
+    
+    Args:
+        eshop_products: Eshop product dictionaries
+        erp_index: SKU -> ERP product index
+        field_mapper: Configured field mapper
+        validator: Configured product validator
+        identifier_field: Field name containing the SKU in Eshop products
+        delta_sync: Skip products whose mapped fields match the Eshop
+        state_store: State store used to hash ERP products
+        stored_hashes: SKU -> ERP content hash from previous runs (None to disable)
+        timings: Dictionary receiving the wall clock seconds spent in the "map" and
+            "validate" stages once the generator finishes (None to disable timing)
+        synced_values: SKU -> Eshop values of the shared fields after the last sync
+            (None when no field is shared)
+        
+    Yields:
+        (outcome, eshop_sku, product, detail, product_hash, erp_update, shared_values,
+        held_values) for every Eshop product with a SKU. product is the mapped
+        product (None when not mapped), detail holds the validation errors or, for
+        synced products in delta mode, the change set, product_hash is the ERP
+        content hash (None when disabled), erp_update holds the Eshop-owned fields
+        and shared field adjustments the ERP needs (None when there are none),
+        shared_values the Eshop values of the shared fields after this sync (None
+        when unchanged or no field is shared) and held_values, for synced products,
+        the Eshop values of the shared fields before this sync, which the Eshop
+        keeps if the product is not delivered (None otherwise).
+    """
+    clock = time.perf_counter if timings is not None else None
+    map_seconds = validate_seconds = 0.0
+    reverse_sync = field_mapper.reverse_sync
+    shared_fields = field_mapper.shared_fields
+    try:
+        for eshop_product in eshop_products:
+            eshop_sku = eshop_product.get(identifier_field)
+            if not eshop_sku:
+                continue
+            
+            # Find matching ERP product
+            matching_erp_product = erp_index.get(eshop_sku)
+            
+            if not matching_erp_product:
+                yield MISSING_IN_ERP, eshop_sku, None, None, None, None, None, None
+                continue
+            
+            # Map Eshop-owned and shared fields back to the ERP in the same pass; the
+            # Eshop side may have changed even when the ERP product has not
+            erp_update = None
+            last_synced = None
+            if reverse_sync:
+                if synced_values is not None:
+                    last_synced = synced_values.get(eshop_sku)
+                erp_update = field_mapper.map_erp_update(matching_erp_product, eshop_product, last_synced) or None
+            
+            # Skip products whose ERP data is unchanged since the last run, unless
+            # the Eshop changed a shared field that must be mapped again
+            product_hash = None
+            if stored_hashes is not None:
+                product_hash = state_store.hash_product(matching_erp_product)
+                if stored_hashes.get(eshop_sku) == product_hash and not (erp_update and "adjustments" in erp_update):
+                    yield UNCHANGED_SINCE_LAST_RUN, eshop_sku, None, None, product_hash, erp_update, None, None
+                    continue
+            
+            if clock:
+                start = clock()
+            
+            # Map fields from ERP to Eshop
+            updated_product = field_mapper.map_product_fields(matching_erp_product, eshop_product, last_synced)
+            # The Eshop holds the mapped shared values once the product is written
+            shared_values = None
+            if shared_fields:
+                shared_values = {field: updated_product.get(field) for field in shared_fields}
+            
+            # Skip products whose mapped fields already match the Eshop
+            changes = None
+            if delta_sync:
+                changes = field_mapper.diff_product_fields(updated_product, eshop_product)
+                if not changes:
+                    if clock:
+                        map_seconds += clock() - start
+                    yield UNCHANGED, eshop_sku, None, None, product_hash, erp_update, shared_values, None
+                    continue
+            
+            if clock:
+                mapped = clock()
+                map_seconds += mapped - start
+            
+            # Validate the updated product
+            validation_errors = validator.validate_product(updated_product)
+            
+            if clock:
+                validate_seconds += clock() - mapped
+            
+            if validation_errors:
+                # Not written, so the Eshop keeps its values; any adjustments are
+                # still reported and measured from these values next time
+                if shared_fields:
+                    shared_values = {field: eshop_product.get(field) for field in shared_fields}
+                yield (FAILED_VALIDATION, eshop_sku, updated_product, validation_errors, product_hash,
+                       erp_update, shared_values, None)
+                continue
+            
+            if delta_sync:
+                updated_product["changes"] = changes
+            
+            held_values = None
+            if shared_fields:
+                held_values = {field: eshop_product.get(field) for field in shared_fields}
+            yield SYNCED, eshop_sku, updated_product, changes, product_hash, erp_update, shared_values, held_values
+    finally:
+        if timings is not None:
+            timings["map"] = timings.get("map", 0.0) + map_seconds
+            timings["validate"] = timings.get("validate", 0.0) + validate_seconds
+
+
+def _sync_chunk(chunk: List[Dict[str, Any]], erp_chunk: Dict[str, Dict[str, Any]],
+                field_mapper: FieldMapper, validator: ProductValidator, identifier_field: str,
+                delta_sync: bool, state_store: SyncStateStore, stored_hashes: Dict[str, str],
+                synced_values: Dict[str, Dict[str, Any]] = None
+                ) -> Tuple[List[Tuple], Dict[str, Any], Dict[str, Any]]:
+    """Process one chunk of Eshop products in a worker process
+    
+    Args:
+        chunk: Eshop products, in file order
+        erp_chunk: SKU -> ERP product index for the SKUs in this chunk
+        field_mapper: Configured field mapper
+        validator: Configured product validator
+        identifier_field: Field name containing the SKU in Eshop products
+        delta_sync: Skip products whose mapped fields match the Eshop
+        state_store: State store used to hash ERP products
+        stored_hashes: SKU -> ERP content hash for this chunk (None to disable)
+        synced_values: SKU -> shared field values of the last sync for this chunk
+        
+    Returns:
+        Tuple of (list of outcomes in file order, stage timings of the chunk as
+        reported by SyncMetrics.to_dict(), failure counts of the chunk as
+        {"rules": validator counts, "casts": field mapper counts})
+    """
+    # Count only this chunk's failures in the worker's copies
+    validator.failure_counts = {}
+    field_mapper.cast_failures = {}
+    metrics = SyncMetrics()
+    timings = {}
+    with metrics.stage("match"):
+        results = list(process_eshop_products(
+            chunk, erp_chunk, field_mapper, validator, identifier_field, delta_sync,
+            state_store, stored_hashes, timings, synced_values
+        ))
+        for stage, seconds in timings.items():
+            metrics.add_wall(stage, seconds)
+    return results, metrics.to_dict()["stages"], {
+        "rules": validator.failure_counts,
+        "casts": field_mapper.cast_failures
+    }
 
 class ProductSync:
     """Orchestrates the product synchronization process"""
@@ -22,6 +214,83 @@ class ProductSync:
         self.config = config
         self.data_loader = DataLoader(config["LOG_FILE"])
         self.validator = ProductValidator(config["VALIDATION_RULES"])
+        self.duplicate_sku_policy = config.get("ERP_DUPLICATE_SKU_POLICY", "first")
+        if self.duplicate_sku_policy not in DUPLICATE_SKU_POLICIES:
+            raise ValueError(
+                f"Invalid ERP_DUPLICATE_SKU_POLICY '{self.duplicate_sku_policy}', "
+                f"expected one of {DUPLICATE_SKU_POLICIES}"
+            )
+        self.stats = {}
+        self.metrics = SyncMetrics()
+        
+        # Eshop fields read by a sync: identifiers and mapping targets
+        field_mappings = config["FIELD_MAPPINGS"]
+        self.eshop_fields = tuple(dict.fromkeys(
+            ("id", "sku", config["ESHOP_IDENTIFIER_FIELD"], *field_mappings.values())
+        ))
+        
+        # Record classes for COMPACT_RECORDS (None keeps products as dicts)
+        self.erp_record = self.eshop_record = self.output_record = None
+        if config.get("COMPACT_RECORDS", False):
+            self.erp_record = record_type(
+                (config["ERP_IDENTIFIER_FIELD"], *field_mappings), "ErpRecord"
+            )
+            self.eshop_record = record_type(self.eshop_fields, "EshopRecord")
+            output_fields = tuple(dict.fromkeys(
+                ("id", "sku", config["ESHOP_IDENTIFIER_FIELD"], *field_mappings.values())
+            ))
+            if config.get("DELTA_SYNC", False):
+                output_fields += ("changes",)
+            self.output_record = record_type(output_fields, "SyncedRecord")
+        
+        # Inferred field types reused across runs
+        self.schema_cache = None
+        if config.get("SCHEMA_CACHE_FILE"):
+            self.schema_cache = SchemaCache(config["SCHEMA_CACHE_FILE"])
+        
+        # Prometheus metrics for dashboards, when a textfile or port is configured
+        self.exporter = None
+        if config.get("METRICS_TEXTFILE") or config.get("METRICS_PORT"):
+            self.exporter = SyncExporter()
+        
+        # Retries, per-endpoint circuit breakers and dead letters for sink writes
+        self.retry_policy = RetryPolicy(
+            config.get("SINK_RETRY_BASE_DELAY", 0.5),
+            config.get("SINK_RETRY_MAX_DELAY", 30.0)
+        )
+        self.circuit_breakers = {}
+        self.dead_letters = None
+        if config.get("SINK_DEAD_LETTER_FILE"):
+            self.dead_letters = DeadLetterLog(config["SINK_DEAD_LETTER_FILE"])
+        
+        # Optional store of ERP product hashes from previous runs
+        self.state_store = None
+        self._pending_hashes = {}
+        self._pending_synced_values = {}
+        self._pending_held_values = {}
+        self._pending_erp_updates = None
+        field_ownership = config.get("FIELD_OWNERSHIP") or {}
+        if "shared" in field_ownership.values() and not config.get("STATE_STORE_FILE"):
+            raise ValueError("Shared fields in FIELD_OWNERSHIP need STATE_STORE_FILE to keep their last synced values")
+        if config.get("STATE_STORE_FILE"):
+            fingerprint_parts = [
+                config["FIELD_MAPPINGS"],
+                config["VALIDATION_RULES"],
+                config["ESHOP_IDENTIFIER_FIELD"],
+                config["ERP_IDENTIFIER_FIELD"],
+                config.get("DELTA_SYNC", False),
+                sorted(config.get("MONEY_FIELDS", ())),
+                config.get("MONEY_DECIMALS", DEFAULT_DECIMALS)
+            ]
+            # Ownership changes which values are synced; existing stores stay
+            # valid while every field is owned by the ERP
+            if any(owner != "erp" for owner in field_ownership.values()):
+                fingerprint_parts.append(field_ownership)
+            self.state_store = SyncStateStore(
+                config["STATE_STORE_FILE"],
+                list(config["FIELD_MAPPINGS"].keys()),
+                SyncStateStore.fingerprint(*fingerprint_parts)
+            )
         
     def sync_products(self) -> List[Dict[str, Any]]:
         """Main sync process - returns list of successfully synced products
@@ -34,57 +303,530 @@ class ProductSync:
             ValueError: If data validation fails
             json.JSONDecodeError: If JSON parsing fails
         """
+        return list(self.iter_synced_products())
+    
+    def iter_synced_products(self) -> Iterator[Dict[str, Any]]:
+        """Prepare the sync and return a generator of successfully synced products
+        
+        Loading, type inference and ERP indexing happen when this method is called,
+        so data errors are raised here. Eshop products are then mapped and validated
+        lazily as the generator is consumed. With STREAM_INPUT enabled both files are
+        read incrementally instead of being loaded in full. With DELTA_SYNC enabled
+        only products whose mapped fields changed are returned, each with a
+        "changes" field holding the per-field old and new values. With
+        STATE_STORE_FILE set, products whose ERP data is unchanged since the last
+        committed run are skipped without mapping or validation. With ERP_API_URL
+        set, ERP products are fetched from a paginated API instead of ERP_DATA_FILE.
+        Fields FIELD_OWNERSHIP gives to the Eshop keep their Eshop value and, in the
+        same pass, changed values are written back in ERP format to ERP_UPDATE_FILE;
+        shared fields add the Eshop's change since the last sync to the ERP value
+        and write that change to ERP_UPDATE_FILE as an adjustment.
+        Stage timings for the run are collected in self.metrics.
+        
+        Returns:
+            Generator of products that were successfully synced and validated
+            
+        Raises:
+            FileNotFoundError: If data files are not found
+            ValueError: If data validation fails
+            json.JSONDecodeError: If JSON parsing fails
+        """
+        self.start_run()
+        erp_index, erp_field_types = self.load_erp_index()
+        eshop_products, eshop_field_types = self.load_eshop_products()
         
-        # Load data
-        erp_products = self.data_loader.load_erp_products(self.config["ERP_DATA_FILE"])
-        eshop_products = self.data_loader.load_eshop_products(self.config["ESHOP_DATA_FILE"])
+        field_mapper = self.create_field_mapper(erp_field_types, eshop_field_types)
         
-        # Get field types
-        erp_field_types = self.data_loader.get_field_types(erp_products)
-        eshop_field_types = self.data_loader.get_field_types(eshop_products)
+        return self.sync_loaded_products(eshop_products, erp_index, field_mapper)
+    
+    def create_field_mapper(self, erp_field_types: Dict[str, str], eshop_field_types: Dict[str, str]) -> FieldMapper:
+        """Create the field mapper for a run from FIELD_MAPPINGS, FIELD_OWNERSHIP, MONEY_FIELDS and COMPACT_RECORDS
         
-        # Initialize field mapper
-        field_mapper = FieldMapper(
+        Args:
+            erp_field_types: Field types of the ERP products
+            eshop_field_types: Field types of the Eshop products
+            
+        Returns:
+            Configured field mapper
+            
+        Raises:
+            ValueError: If FIELD_OWNERSHIP is invalid
+        """
+        return FieldMapper(
             self.config["FIELD_MAPPINGS"],
             erp_field_types,
-            eshop_field_types
+            eshop_field_types,
+            self.config.get("MONEY_FIELDS", ()),
+            self.config.get("MONEY_DECIMALS", DEFAULT_DECIMALS),
+            self.output_record or dict,
+            self.config.get("FIELD_OWNERSHIP"),
+            self.config["ESHOP_IDENTIFIER_FIELD"]
         )
+    
+    def start_run(self):
+        """Reset stats and metrics before a sync run"""
+        self.metrics = SyncMetrics()
+        self.stats = {"missing_in_erp": 0, "failed_validation": 0}
+    
+    def load_erp_index(self) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+        """Load ERP products and index them by SKU
         
-        # Process each Eshop product
-        updated_eshop_products = []
+        Products come from ERP_API_URL when set, otherwise from ERP_DATA_FILE (read
+        incrementally with STREAM_INPUT).
         
-        for eshop_product in eshop_products:
-            eshop_sku = eshop_product.get(self.config["ESHOP_IDENTIFIER_FIELD"])
-            if not eshop_sku:
-                continue
+        Returns:
+            Tuple of (SKU -> ERP product index, ERP field types)
             
-            # Find matching ERP product
-            matching_erp_product = self._find_matching_erp_product(
-                erp_products, eshop_sku, self.config["ERP_IDENTIFIER_FIELD"]
-            )
+        Raises:
+            FileNotFoundError: If the ERP file is not found
+            ValueError: If no products are found or duplicate SKUs are rejected
+            json.JSONDecodeError: If JSON parsing fails
+        """
+        metrics = self.metrics
+        stream_input = self.config.get("STREAM_INPUT", False)
+        with metrics.stage("load_erp"):
+            if self.config.get("ERP_API_URL"):
+                erp_products = fetch_erp_products(
+                    self.config["ERP_API_URL"],
+                    page_size=self.config.get("ERP_API_PAGE_SIZE", 500),
+                    max_in_flight=self.config.get("ERP_API_MAX_IN_FLIGHT", 8)
+                )
+            elif stream_input:
+                erp_products = self.data_loader.iter_erp_products(self.config["ERP_DATA_FILE"])
+            else:
+                erp_products = self.data_loader.load_erp_products(self.config["ERP_DATA_FILE"])
+        
+        erp_field_types, erp_products = self._load_field_types(
+            "erp:" + (self.config.get("ERP_API_URL") or self.config["ERP_DATA_FILE"]), "load_erp", erp_products,
+            lambda: self.data_loader.iter_erp_products(self.config["ERP_DATA_FILE"])
+        )
+        
+        # Streamed files are read while indexing; time the reads separately
+        if stream_input:
+            erp_products = metrics.timed(erp_products, "load_erp")
+        
+        # Index ERP products by SKU once per run
+        with metrics.stage("index_build"):
+            erp_index = self._build_erp_index(erp_products, self.config["ERP_IDENTIFIER_FIELD"])
+        
+        return erp_index, erp_field_types
+    
+    def load_eshop_products(self) -> Tuple[Iterable[Dict[str, Any]], Dict[str, str]]:
+        """Load Eshop products from ESHOP_DATA_FILE
+        
+        With ESHOP_SNAPSHOT_FILE set, products are read from a memory-mapped binary
+        snapshot of the file, which is rewritten whenever the file changes. Only the
+        fields a sync reads (identifiers and mapping targets) are decoded from it.
+        
+        Returns:
+            Tuple of (Eshop products, Eshop field types). The products are a list,
+            a one-pass stream with STREAM_INPUT, or an EshopSnapshot sequence.
             
-            if not matching_erp_product:
-                logging.warning(f"Product with SKU {eshop_sku} found in Eshop but missing in ERP")
-                continue
+        Raises:
+            FileNotFoundError: If the Eshop file is not found
+            ValueError: If no products are found
+            json.JSONDecodeError: If JSON parsing fails
+        """
+        metrics = self.metrics
+        stream_input = self.config.get("STREAM_INPUT", False)
+        with metrics.stage("load_eshop"):
+            eshop_products = None
+            if self.config.get("ESHOP_SNAPSHOT_FILE"):
+                eshop_products = self._load_eshop_snapshot(stream_input)
+            if eshop_products is not None:
+                stream_input = False
+            elif stream_input:
+                eshop_products = self.data_loader.iter_eshop_products(self.config["ESHOP_DATA_FILE"])
+            else:
+                eshop_products = self.data_loader.load_eshop_products(self.config["ESHOP_DATA_FILE"])
+        
+        eshop_field_types, eshop_products = self._load_field_types(
+            "eshop:" + self.config["ESHOP_DATA_FILE"], "load_eshop", eshop_products,
+            lambda: self.data_loader.iter_eshop_products(self.config["ESHOP_DATA_FILE"])
+        )
+        
+        # Streamed files are read while syncing; time the reads separately
+        if stream_input:
+            eshop_products = metrics.timed(eshop_products, "load_eshop")
+        elif self.eshop_record is not None and isinstance(eshop_products, list):
+            # Replace dicts one by one so they are freed as the records are built
+            with metrics.stage("load_eshop"):
+                from_mapping = self.eshop_record.from_mapping
+                for position, eshop_product in enumerate(eshop_products):
+                    eshop_products[position] = from_mapping(eshop_product)
+        
+        return eshop_products, eshop_field_types
+    
+    def _load_eshop_snapshot(self, stream_input: bool) -> Optional[EshopSnapshot]:
+        """Open the Eshop snapshot, rewriting it from ESHOP_DATA_FILE if it is out of date
+        
+        Args:
+            stream_input: Stream the Eshop file while writing the snapshot
             
-            # Map fields from ERP to Eshop
-            updated_product = field_mapper.map_product_fields(matching_erp_product, eshop_product)
+        Returns:
+            The snapshot, or None if it could not be written (the caller then
+            loads the Eshop file itself)
             
-            # Validate the updated product
-            validation_errors = self.validator.validate_product(updated_product)
+        Raises:
+            FileNotFoundError: If the Eshop file is not found
+            ValueError: If no products are found
+            json.JSONDecodeError: If JSON parsing fails
+        """
+        file_path = self.config["ESHOP_DATA_FILE"]
+        snapshot_path = self.config["ESHOP_SNAPSHOT_FILE"]
+        snapshot = self.data_loader.open_eshop_snapshot(file_path, snapshot_path, self.eshop_fields)
+        if snapshot is not None:
+            return snapshot
+        
+        products = None if stream_input else self.data_loader.load_eshop_products(file_path)
+        try:
+            self.data_loader.write_eshop_snapshot(file_path, snapshot_path, self.config["ESHOP_IDENTIFIER_FIELD"], products)
+            return EshopSnapshot(snapshot_path, self.eshop_fields)
+        except SnapshotError as e:
+            logging.error(f"Failed to use Eshop snapshot, reading {file_path} instead: {e}")
+            return products
+    
+    def sync_loaded_products(self, eshop_products: Iterable[Dict[str, Any]], erp_index: Dict[str, Dict[str, Any]],
+                             field_mapper: FieldMapper) -> Iterator[Dict[str, Any]]:
+        """Return a generator syncing already loaded Eshop products against an ERP index
+        
+        Lets long-running callers reuse loaded data, indexes and a compiled field
+        mapper across runs. Call start_run() first to reset stats and metrics.
+        
+        Args:
+            eshop_products: Eshop product dictionaries (list or stream)
+            erp_index: SKU -> ERP product index
+            field_mapper: Configured field mapper
             
-            if validation_errors:
-                self.validator.log_product_errors(
-                    updated_product, 
-                    validation_errors, 
-                    self.data_loader.start_timestamp,
-                    self.config["LOG_FILE"]
+        Returns:
+            Generator of products that were successfully synced and validated
+        """
+        # Load hashes and shared field values of products synced by previous runs
+        stored_hashes = synced_values = None
+        self._pending_hashes = {}
+        self._pending_synced_values = {}
+        self._pending_held_values = {}
+        self._discard_erp_updates()
+        if self.state_store is not None:
+            stored_hashes = self.state_store.load_hashes()
+            if field_mapper.shared_fields:
+                synced_values = self.state_store.load_synced_values(field_mapper.cast_to_eshop_type)
+            self.stats["unchanged_since_last_run"] = 0
+        
+        return self._sync_eshop_products(eshop_products, erp_index, field_mapper, stored_hashes, synced_values)
+    
+    def _sync_eshop_products(self, eshop_products: Iterable[Dict[str, Any]], erp_index: Dict[str, Dict[str, Any]],
+                             field_mapper: FieldMapper, stored_hashes: Dict[str, str] = None,
+                             synced_values: Dict[str, Dict[str, Any]] = None) -> Iterator[Dict[str, Any]]:
+        """Map and validate each Eshop product against its ERP match
+        
+        Products are processed in this process, or in a process pool when
+        SYNC_WORKERS is greater than 1. Either way, warnings, error log entries,
+        ERP updates and synced products are emitted in Eshop file order. Time spent
+        here outside mapping, validation and writing is reported as the "match"
+        stage.
+        
+        Args:
+            eshop_products: Eshop product dictionaries (list or stream)
+            erp_index: SKU -> ERP product index
+            field_mapper: Configured field mapper
+            stored_hashes: SKU -> ERP content hash from previous runs (None to disable)
+            synced_values: SKU -> shared field values of the last sync (None when no
+                field is shared)
+            
+        Yields:
+            Products that were successfully synced and validated
+        """
+        delta_sync = self.config.get("DELTA_SYNC", False)
+        if delta_sync:
+            self.stats["changed"] = 0
+            self.stats["unchanged"] = 0
+        
+        # ERP updates for Eshop-owned and shared fields, written next to the synced
+        # products and published by commit_state together with the sync state
+        erp_updates = None
+        if field_mapper.reverse_sync:
+            self.stats["erp_updates"] = 0
+            if self.config.get("ERP_UPDATE_FILE"):
+                erp_updates = SyncedProductWriter(
+                    self.config["ERP_UPDATE_FILE"],
+                    self.config.get("OUTPUT_FORMAT", "json"),
+                    self.config.get("OUTPUT_COMPACT", False)
                 )
+        erp_identifier_field = self.config["ERP_IDENTIFIER_FIELD"]
+        
+        metrics = self.metrics
+        timings = {}
+        workers = self.config.get("SYNC_WORKERS", 1)
+        if workers > 1:
+            outcomes = self._process_parallel(
+                eshop_products, erp_index, field_mapper, delta_sync, stored_hashes, synced_values, workers
+            )
+        else:
+            outcomes = process_eshop_products(
+                eshop_products, erp_index, field_mapper, self.validator,
+                self.config["ESHOP_IDENTIFIER_FIELD"], delta_sync, self.state_store, stored_hashes,
+                timings, synced_values
+            )
+        
+        rows = synced = 0
+        failures_before = dict(self.validator.failure_counts)
+        casts_before = dict(field_mapper.cast_failures)
+        with metrics.stage("match"), self.validator.open_error_log(
+            self.config["LOG_FILE"],
+            self.data_loader.start_timestamp,
+            self.config.get("ERROR_REPORT_FILE"),
+            self.config.get("ERROR_LOG_FLUSH_EVERY", DEFAULT_FLUSH_EVERY)
+        ) as error_log:
+            if erp_updates is not None:
+                erp_updates.open()
+            try:
+                for (outcome, eshop_sku, product, detail, product_hash, erp_update, shared_values,
+                     held_values) in outcomes:
+                    rows += 1
+                    if shared_values is not None:
+                        self._pending_synced_values[eshop_sku] = shared_values
+                    if held_values is not None:
+                        self._pending_held_values[eshop_sku] = held_values
+                    if erp_update is not None:
+                        self.stats["erp_updates"] += 1
+                        if erp_updates is not None:
+                            erp_updates.write({erp_identifier_field: eshop_sku, **erp_update})
+                    if outcome == MISSING_IN_ERP:
+                        logging.warning(f"Product with SKU {eshop_sku} found in Eshop but missing in ERP")
+                        self.stats["missing_in_erp"] += 1
+                    elif outcome == UNCHANGED_SINCE_LAST_RUN:
+                        self.stats["unchanged_since_last_run"] += 1
+                    elif outcome == UNCHANGED:
+                        self.stats["unchanged"] += 1
+                        if product_hash is not None:
+                            self._pending_hashes[eshop_sku] = product_hash
+                    elif outcome == FAILED_VALIDATION:
+                        error_log.record(product, detail)
+                        self.stats["failed_validation"] += 1
+                    else:
+                        if delta_sync:
+                            self.stats["changed"] += 1
+                        if product_hash is not None:
+                            self._pending_hashes[eshop_sku] = product_hash
+                        synced += 1
+                        yield product
+            except BaseException:
+                if erp_updates is not None:
+                    erp_updates.abort()
+                raise
+            finally:
+                outcomes.close()
+                for stage, seconds in timings.items():
+                    metrics.add_wall(stage, seconds)
+                metrics.rows += rows
+                metrics.synced += synced
+        
+        # Failed checks per rule and field, and failed casts per field, in this run
+        failed_rules = {}
+        for (rule, field), count in self.validator.failure_counts.items():
+            count -= failures_before.get((rule, field), 0)
+            if count:
+                failed_rules.setdefault(rule, {})[field] = count
+        self.stats["failed_rules"] = failed_rules
+        self.stats["cast_failures"] = {
+            field: count - casts_before.get(field, 0)
+            for field, count in field_mapper.cast_failures.items()
+            if count > casts_before.get(field, 0)
+        }
+        
+        if erp_updates is not None:
+            erp_updates.finish()
+            self._pending_erp_updates = erp_updates
+        
+        metrics.finish()
+        
+        if delta_sync:
+            logging.info(
+                f"Delta sync: {self.stats['changed']} changed, {self.stats['unchanged']} unchanged, "
+                f"{self.stats['missing_in_erp']} missing in ERP"
+            )
+        if field_mapper.reverse_sync:
+            logging.info(
+                f"Reverse sync: {self.stats['erp_updates']} ERP products to update"
+                + (f" written to {self.config['ERP_UPDATE_FILE']}" if erp_updates is not None else "")
+            )
+    
+    def _process_parallel(self, eshop_products: Iterable[Dict[str, Any]], erp_index: Dict[str, Dict[str, Any]],
+                          field_mapper: FieldMapper, delta_sync: bool, stored_hashes: Dict[str, str],
+                          synced_values: Dict[str, Dict[str, Any]], workers: int) -> Iterator[Tuple]:
+        """Process Eshop products in a process pool, a bounded number of chunks at a time
+        
+        Eshop products are read in chunks of SYNC_CHUNK_SIZE as the outcomes are
+        consumed, so a streamed Eshop file is never held in full. Each chunk is
+        pickled to a worker together with only the ERP products, stored hashes
+        and shared field values for its SKUs. At most two chunks per worker are
+        in flight, and their outcomes are yielded in submission order, which is
+        Eshop file order.
+        
+        Args:
+            eshop_products: Eshop product dictionaries (list or stream)
+            erp_index: SKU -> ERP product index
+            field_mapper: Configured field mapper
+            delta_sync: Whether unchanged products are skipped
+            stored_hashes: SKU -> ERP content hash from previous runs (None to disable)
+            synced_values: SKU -> shared field values of the last sync (None when no
+                field is shared)
+            workers: Number of worker processes
+            
+        Yields:
+            Outcome tuples as produced by process_eshop_products
+        """
+        identifier_field = self.config["ESHOP_IDENTIFIER_FIELD"]
+        chunk_size = self.config.get("SYNC_CHUNK_SIZE", DEFAULT_SYNC_CHUNK_SIZE)
+        # Products without a SKU produce no outcome, so they are not sent
+        products = (eshop_product for eshop_product in eshop_products if eshop_product.get(identifier_field))
+        
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            in_flight = deque()
+            try:
+                while True:
+                    while len(in_flight) < 2 * workers:
+                        chunk = list(islice(products, chunk_size))
+                        if not chunk:
+                            break
+                        skus = {eshop_product[identifier_field] for eshop_product in chunk}
+                        erp_chunk = {sku: erp_index[sku] for sku in skus if sku in erp_index}
+                        chunk_hashes = None
+                        if stored_hashes is not None:
+                            chunk_hashes = {sku: stored_hashes[sku] for sku in skus if sku in stored_hashes}
+                        chunk_values = None
+                        if synced_values is not None:
+                            chunk_values = {sku: synced_values[sku] for sku in skus if sku in synced_values}
+                        in_flight.append(executor.submit(
+                            _sync_chunk, chunk, erp_chunk, field_mapper, self.validator,
+                            identifier_field, delta_sync, self.state_store, chunk_hashes, chunk_values
+                        ))
+                    if not in_flight:
+                        break
+                    
+                    chunk_results, chunk_stages, chunk_failures = in_flight.popleft().result()
+                    self.metrics.merge(chunk_stages)
+                    for key, count in chunk_failures["rules"].items():
+                        self.validator.failure_counts[key] = self.validator.failure_counts.get(key, 0) + count
+                    for field, count in chunk_failures["casts"].items():
+                        field_mapper.cast_failures[field] = field_mapper.cast_failures.get(field, 0) + count
+                    yield from chunk_results
+            finally:
+                # Stopped early: do not wait for chunks nobody will read
+                for future in in_flight:
+                    future.cancel()
+    
+    def _load_field_types(self, source: str, load_stage: str, products: Iterable[Dict[str, Any]],
+                          rescan: Callable[[], Iterable[Dict[str, Any]]]) -> Tuple[Schema, Iterable[Dict[str, Any]]]:
+        """Return the field types of a product source, from the schema cache or inferred
+        
+        Types are inferred from the first SCHEMA_SAMPLE_SIZE products (all products
+        when 0; streamed files are then read in an extra pass). With
+        SCHEMA_CACHE_FILE set, a cached schema is reused without inference unless
+        the first product has fields the schema does not know.
+        
+        Args:
+            source: Cache key of the product source
+            load_stage: Metrics stage that reading sample products counts toward
+            products: List or stream of product dictionaries
+            rescan: Returns a new stream over all products, for full inference of streams
+            
+        Returns:
+            Tuple of (schema, iterable over all products)
+            
+        Raises:
+            ValueError: If there are no products to infer types from
+        """
+        sample_size = self.config.get("SCHEMA_SAMPLE_SIZE", DEFAULT_SAMPLE_SIZE) or None
+        
+        if self.schema_cache is not None:
+            cached = self.schema_cache.get(source)
+            if cached is not None:
+                with self.metrics.stage(load_stage):
+                    sample, products = self._peek_products(products, 1)
+                if sample and cached.covers(sample[0]):
+                    return cached, products
+                logging.info(f"Cached schema for {source} does not match the data, inferring types again")
+        
+        with self.metrics.stage(load_stage):
+            sample, products = self._peek_products(products, sample_size)
+        
+        with self.metrics.stage("type_inference"):
+            if sample_size is None and not isinstance(products, Sequence) and sample:
+                # Sampling everything from a stream needs its own pass over the file
+                sample = rescan()
+            schema = self.data_loader.get_field_types(sample)
+            if not isinstance(schema, Schema):
+                schema = Schema(schema)
+        
+        if self.schema_cache is not None:
+            self.schema_cache.put(source, schema)
+        return schema, products
+    
+    def _peek_products(self, products: Iterable[Dict[str, Any]],
+                       count: int = 1) -> Tuple[List[Dict[str, Any]], Iterable[Dict[str, Any]]]:
+        """Take the first products of a list, snapshot or stream for type inference
+        
+        Args:
+            products: List, snapshot or stream of product dictionaries
+            count: Number of products to take (None takes all of a sequence, and only
+                the first product of a stream)
+            
+        Returns:
+            Tuple of (sample list, iterable over all products)
+        """
+        if isinstance(products, Sequence):
+            return products if count is None else products[:count], products
+        
+        iterator = iter(products)
+        sample = list(islice(iterator, count or 1))
+        if not sample:
+            return [], iterator
+        return sample, chain(sample, iterator)
+    
+    def _build_erp_index(self, erp_products: List[Dict[str, Any]], identifier_field: str) -> Dict[str, Dict[str, Any]]:
+        """Build a SKU -> ERP product index, applying the duplicate SKU policy
+        
+        Args:
+            erp_products: List of ERP product dictionaries
+            identifier_field: Field name containing the SKU in ERP products
+            
+        Returns:
+            Dictionary mapping each SKU to a single ERP product
+            
+        Raises:
+            ValueError: If a duplicate SKU is found and the policy is "reject"
+        """
+        erp_index = {}
+        self.stats["duplicate_erp_skus"] = 0
+        self.stats["erp_products_without_sku"] = 0
+        keep_last = self.duplicate_sku_policy == "last"
+        erp_record = self.erp_record
+        
+        for erp_product in erp_products:
+            sku = erp_product.get(identifier_field)
+            if not sku:
+                self.stats["erp_products_without_sku"] += 1
                 continue
             
-            updated_eshop_products.append(updated_product)
+            if sku in erp_index:
+                self.stats["duplicate_erp_skus"] += 1
+                if self.duplicate_sku_policy == "reject":
+                    logging.error(f"Duplicate SKU {sku} found in ERP products")
+                    raise ValueError(f"Duplicate SKU {sku} found in ERP products")
+                if not keep_last:
+                    continue
+            
+            erp_index[sku] = erp_record.from_mapping(erp_product) if erp_record else erp_product
+        
+        if self.stats["duplicate_erp_skus"]:
+            logging.warning(
+                f"Found {self.stats['duplicate_erp_skus']} duplicate SKUs in ERP products "
+                f"(policy: {self.duplicate_sku_policy})"
+            )
         
-        return updated_eshop_products
+        return erp_index
     
     def _find_matching_erp_product(self, erp_products: List[Dict[str, Any]], sku: str, identifier_field: str) -> Dict[str, Any]:
         """Find ERP product matching the given SKU
@@ -103,18 +845,334 @@ class ProductSync:
             None
         )
     
-    def save_synced_products(self, products: List[Dict[str, Any]]):
+    def commit_state(self):
+        """Persist the sync state of the last run and publish its ERP_UPDATE_FILE
+        
+        Called by push_to_sink once the sink has closed successfully, so products
+        are only skipped by later runs after they were actually delivered. The ERP
+        update file replaces the previous one only after the state is stored, so
+        shared field adjustments are reported by exactly one published file: if
+        the run or the store fails, the file is discarded and the next run reports
+        the same changes again, measured from the same stored values.
+        
+        Note:
+            Logs and continues if the state store or the ERP update file cannot be
+            written; the next run then simply reprocesses those products.
+        """
+        erp_updates, self._pending_erp_updates = self._pending_erp_updates, None
+        
+        if self.state_store is not None and (self._pending_hashes or self._pending_synced_values):
+            try:
+                self.state_store.save_hashes(self._pending_hashes, self._pending_synced_values)
+                logging.info(f"Stored sync state for {len(self._pending_hashes)} products")
+            except sqlite3.Error as e:
+                logging.error(f"Failed to store sync state: {e}")
+                if erp_updates is not None:
+                    erp_updates.abort()
+                    logging.error(f"{self.config['ERP_UPDATE_FILE']} not updated, the next run reports these changes again")
+                    erp_updates = None
+        self._pending_hashes = {}
+        self._pending_synced_values = {}
+        self._pending_held_values = {}
+        
+        if erp_updates is not None:
+            try:
+                erp_updates.publish()
+                logging.info(f"ERP updates written to {erp_updates.file_path}")
+            except OutputWriteError as e:
+                logging.error(f"Failed to write ERP update file: {e}")
+    
+    def _discard_erp_updates(self):
+        """Drop an ERP update file that was never published, leaving the previous one"""
+        if self._pending_erp_updates is not None:
+            self._pending_erp_updates.abort()
+            self._pending_erp_updates = None
+    
+    def export_metrics(self):
+        """Add the last run to the Prometheus metrics and write METRICS_TEXTFILE
+        
+        Called by push_to_sink once a run has been written. Does nothing unless
+        METRICS_TEXTFILE or METRICS_PORT is configured.
+        
+        Note:
+            Logs and continues if the textfile cannot be written.
+        """
+        if self.exporter is None:
+            return
+        
+        self.exporter.record_run(self.stats, self.metrics, time.time())
+        if self.config.get("METRICS_TEXTFILE"):
+            try:
+                self.exporter.write_textfile(self.config["METRICS_TEXTFILE"])
+            except OSError as e:
+                logging.error(f"Failed to write metrics textfile: {e}")
+    
+    def write_run_report(self, file_path: str):
+        """Write the run's stage timings, throughput, peak memory and stats as JSON
+        
+        Args:
+            file_path: Report file (overwritten)
+            
+        Note:
+            Logs and continues if the report cannot be written.
+        """
+        try:
+            self.metrics.write_report(file_path, {
+                "started_at": self.data_loader.start_timestamp,
+                "stats": self.stats
+            })
+            logging.info(f"Run report written to {file_path}")
+        except OSError as e:
+            logging.error(f"Failed to write run report: {e}")
+    
+    def push_to_sink(self, products: Iterable[Dict[str, Any]], sink: ProductSink) -> int:
+        """Send synced products to a sink in adaptively sized batches
+        
+        The batch size starts at SINK_BATCH_SIZE and is tuned between
+        SINK_MIN_BATCH_SIZE and SINK_MAX_BATCH_SIZE from observed throughput. A
+        batch the sink throttles (429/503 or timeout) is resent in smaller batches,
+        waiting for any Retry-After the sink reported, and a batch the sink failed
+        (5xx or connection error) is resent after a jittered exponential backoff,
+        up to SINK_MAX_RETRIES times. Failures count toward the circuit breaker of
+        the sink's endpoint; while it is open batches fail without being sent.
+        With SINK_DEAD_LETTER_FILE set, batches that still fail are written there
+        for replay_dead_letters() and the run goes on. Sync state is committed and
+        ERP_UPDATE_FILE published once the sink has closed successfully, leaving
+        out dead-lettered products.
+        Time spent in the sink is reported as the "write" stage of self.metrics.
+        
+        Args:
+            products: Validated and synced product dictionaries (list or generator)
+            sink: Destination for the products
+            
+        Returns:
+            Number of products sent
+            
+        Raises:
+            SinkError: If the sink rejects a batch, keeps failing or throttling, or
+                its circuit is open, and there is no dead-letter file
+        """
+        sizer = AdaptiveBatchSizer(
+            self.config.get("SINK_BATCH_SIZE", 500),
+            self.config.get("SINK_MIN_BATCH_SIZE", 1),
+            self.config.get("SINK_MAX_BATCH_SIZE", 5000)
+        )
+        max_retries = self.config.get("SINK_MAX_RETRIES", 5)
+        count = 0
+        self.stats["dead_lettered"] = 0
+        
+        with self.metrics.stage("write"):
+            sink.open()
+        try:
+            batch = []
+            for product in products:
+                batch.append(product)
+                if len(batch) >= sizer.batch_size:
+                    count += self._send_batch(sink, batch, sizer, max_retries)
+                    batch = []
+            if batch:
+                count += self._send_batch(sink, batch, sizer, max_retries)
+        except BaseException:
+            sink.abort()
+            self._discard_erp_updates()
+            raise
+        try:
+            with self.metrics.stage("write"):
+                sink.close()
+        except BaseException:
+            self._discard_erp_updates()
+            raise
+        
+        self.stats["sink_batch_size"] = sizer.batch_size
+        self.commit_state()
+        self.metrics.finish()
+        self.export_metrics()
+        return count
+    
+    def _send_batch(self, sink: ProductSink, batch: List[Dict[str, Any]], sizer: AdaptiveBatchSizer,
+                    retries_left: int, dead_letter: bool = True) -> int:
+        """Send one batch, retrying failures and splitting it while the sink throttles
+        
+        Returns:
+            Number of products sent (dead-lettered products are not counted)
+            
+        Raises:
+            SinkError: If the batch cannot be sent and is not dead-lettered
+        """
+        breaker = self.circuit_breakers.get(sink.name)
+        if breaker is None:
+            breaker = self.circuit_breakers[sink.name] = CircuitBreaker(
+                self.config.get("SINK_CIRCUIT_FAILURE_THRESHOLD", 5),
+                self.config.get("SINK_CIRCUIT_RESET_TIMEOUT", 30.0)
+            )
+        
+        attempt = 0
+        while True:
+            if not breaker.allow():
+                error = SinkUnavailable(f"Circuit open for {sink.name}, not sending")
+                break
+            
+            start = time.perf_counter()
+            cpu_start = time.process_time()
+            try:
+                sink.write_batch(batch)
+            except SinkThrottled as e:
+                self.metrics.add("write", time.perf_counter() - start, time.process_time() - cpu_start)
+                breaker.record_failure()
+                if retries_left <= 0:
+                    error = SinkError(f"{sink.name} kept throttling: {e}")
+                    error.__cause__ = e
+                    break
+                sizer.record_throttle()
+                logging.warning(f"{sink.name} throttled a batch of {len(batch)} products, "
+                                f"retrying in batches of {sizer.batch_size}: {e}")
+                if e.retry_after:
+                    time.sleep(self.retry_policy.delay(attempt, e.retry_after))
+                size = min(sizer.batch_size, max(1, len(batch) // 2))
+                return sum(
+                    self._send_batch(sink, batch[i:i + size], sizer, retries_left - 1, dead_letter)
+                    for i in range(0, len(batch), size)
+                )
+            except SinkUnavailable as e:
+                self.metrics.add("write", time.perf_counter() - start, time.process_time() - cpu_start)
+                breaker.record_failure()
+                if retries_left <= 0:
+                    error = e
+                    break
+                delay = self.retry_policy.delay(attempt)
+                logging.warning(f"{sink.name} failed a batch of {len(batch)} products, "
+                                f"retrying in {delay:.2f}s: {e}")
+                time.sleep(delay)
+                retries_left -= 1
+                attempt += 1
+                continue
+            except SinkError as e:
+                # The endpoint answered; the batch itself was rejected
+                self.metrics.add("write", time.perf_counter() - start, time.process_time() - cpu_start)
+                error = e
+                break
+            
+            breaker.record_success()
+            seconds = time.perf_counter() - start
+            self.metrics.add("write", seconds, time.process_time() - cpu_start)
+            if self.exporter is not None:
+                self.exporter.observe_batch(seconds)
+            sizer.record_success(len(batch), seconds)
+            return len(batch)
+        
+        if not dead_letter or self.dead_letters is None:
+            raise error
+        self._dead_letter(sink, batch, error)
+        return 0
+    
+    def _dead_letter(self, sink: ProductSink, batch: List[Dict[str, Any]], error: SinkError):
+        """Write a failed batch to the dead-letter file and keep its products out of the sync state
+        
+        The Eshop keeps its values for these products, so their shared fields are
+        stored as the Eshop holds them. Their adjustments are still published, and
+        the next run measures the Eshop's changes from there.
+        
+        Raises:
+            SinkError: If the dead-letter file cannot be written
+        """
+        try:
+            self.dead_letters.write(sink.name, batch, error)
+        except OSError as e:
+            raise SinkError(f"{sink.name} failed ({error}) and the batch could not be dead-lettered: {e}") from e
+        logging.error(f"{sink.name} did not accept {len(batch)} products, written to "
+                      f"{self.dead_letters.file_path}: {error}")
+        self.stats["dead_lettered"] = self.stats.get("dead_lettered", 0) + len(batch)
+        identifier_field = self.config["ESHOP_IDENTIFIER_FIELD"]
+        for product in batch:
+            sku = product.get(identifier_field, product.get("sku"))
+            self._pending_hashes.pop(sku, None)
+            held_values = self._pending_held_values.pop(sku, None)
+            if held_values is not None:
+                self._pending_synced_values[sku] = held_values
+    
+    def replay_dead_letters(self, sink: ProductSink) -> int:
+        """Send the batches in SINK_DEAD_LETTER_FILE to a sink again
+        
+        Batches are retried like push_to_sink retries them. Batches that still
+        fail stay in the file; the others are removed from it. The shared field
+        values of replayed products are stored as the Eshop's new baseline.
+        
+        Args:
+            sink: Destination for the products
+            
+        Returns:
+            Number of products sent
+            
+        Raises:
+            ValueError: If SINK_DEAD_LETTER_FILE is not set
+            json.JSONDecodeError: If the dead-letter file is corrupt
+        """
+        if self.dead_letters is None:
+            raise ValueError("SINK_DEAD_LETTER_FILE is not set")
+        
+        sizer = AdaptiveBatchSizer(
+            self.config.get("SINK_BATCH_SIZE", 500),
+            self.config.get("SINK_MIN_BATCH_SIZE", 1),
+            self.config.get("SINK_MAX_BATCH_SIZE", 5000)
+        )
+        max_retries = self.config.get("SINK_MAX_RETRIES", 5)
+        
+        identifier_field = self.config["ESHOP_IDENTIFIER_FIELD"]
+        shared_fields = [field for field, owner in (self.config.get("FIELD_OWNERSHIP") or {}).items()
+                         if owner == "shared"]
+        replayed_values = {}
+        
+        def send(batch):
+            self._send_batch(sink, batch, sizer, max_retries, dead_letter=False)
+            for product in batch:
+                replayed_values[product.get(identifier_field, product.get("sku"))] = {
+                    field: product.get(field) for field in shared_fields
+                }
+        
+        sink.open()
+        try:
+            sent, remaining = self.dead_letters.replay(send)
+        except BaseException:
+            sink.abort()
+            raise
+        sink.close()
+        
+        if shared_fields and replayed_values and self.state_store is not None:
+            try:
+                self.state_store.save_hashes({}, replayed_values)
+            except sqlite3.Error as e:
+                logging.error(f"Failed to store shared field values of replayed products: {e}")
+        
+        logging.info(f"Replayed {sent} dead-lettered products to {sink.name}, "
+                     f"{remaining} batches left in {self.dead_letters.file_path}")
+        return sent
+    
+    def save_synced_products(self, products: Iterable[Dict[str, Any]]) -> int:
         """Save successfully synced products to output file
         
+        Products are written as they arrive through a FileSink, so a generator from
+        iter_synced_products is never materialized. The output is written to a
+        temporary file and renamed over OUTPUT_FILE only once complete. OUTPUT_FORMAT
+        selects "json" or "ndjson" and OUTPUT_COMPACT disables indentation.
+        
         Args:
-            products: List of validated and synced product dictionaries
+            products: Validated and synced product dictionaries (list or generator)
+            
+        Returns:
+            Number of products written (0 if the file could not be written)
             
         Note:
-            Logs success but continues execution if file write fails
+            Logs success but continues execution if file write fails. Errors raised
+            by the products generator itself are propagated.
         """
         try:
-            with open(self.config["OUTPUT_FILE"], "w", encoding="utf-8") as outfile:
-                json.dump(products, outfile, indent=4, ensure_ascii=False)
-            logging.info(f"Successfully synced {len(products)} products to {self.config['OUTPUT_FILE']}")
-        except Exception as e:
+            count = self.push_to_sink(products, FileSink(
+                self.config["OUTPUT_FILE"],
+                self.config.get("OUTPUT_FORMAT", "json"),
+                self.config.get("OUTPUT_COMPACT", False)
+            ))
+            logging.info(f"Successfully synced {count} products to {self.config['OUTPUT_FILE']}")
+            return count
+        except OutputWriteError as e:
             logging.error(f"Failed to write synced products file: {e}")
+            return 0
@@ -0,0 +1,270 @@
+"""
+Prometheus text format metrics for sync runs, served over HTTP or written for
+the node_exporter textfile collector
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Any, List, Tuple
+
+# Batch latency buckets in seconds
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labelnames: Tuple[str, ...], labelvalues: Tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(labelnames, labelvalues)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) and not value.is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class for labelled metrics"""
+
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def get(self, **labels) -> float:
+        """Return the current value for a label set (0 if never set)"""
+        return self._values.get(self._key(labels), 0)
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labelvalues, value in sorted(self._values.items()):
+                lines.append(f"{self.name}{_format_labels(self.labelnames, labelvalues)} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing value"""
+
+    kind = "counter"
+
+    def inc(self, amount: float = 1, **labels):
+        """Increase the counter
+
+        Raises:
+            ValueError: If amount is negative or the labels do not match
+        """
+        if amount < 0:
+            raise ValueError("Counters can only increase")
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = self._values[key] = {"counts": [0] * len(self.buckets), "sum": 0.0, "count": 0}
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state["counts"][i] += 1
+                    break
+            state["sum"] += value
+            state["count"] += 1
+
+    def get(self, **labels) -> Dict[str, Any]:
+        """Return {"count", "sum"} for a label set"""
+        state = self._values.get(self._key(labels))
+        return {"count": state["count"], "sum": state["sum"]} if state else {"count": 0, "sum": 0.0}
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            for labelvalues, state in sorted(self._values.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, state["counts"]):
+                    cumulative += count
+                    le = f'le="{_format_value(bound)}"'
+                    lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+                labels = _format_labels(self.labelnames, labelvalues)
+                lines.append(f"{self.name}_sum{labels} {_format_value(state['sum'])}")
+                lines.append(f"{self.name}_count{labels} {state['count']}")
+        return lines
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together in the Prometheus text format"""
+
+    def __init__(self):
+        self._metrics = []
+        self._server = None
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        """Return all metrics in the Prometheus text exposition format"""
+        lines = []
+        for metric in self._metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+    def write_textfile(self, file_path: str):
+        """Atomically write all metrics for the node_exporter textfile collector
+
+        The file is written to a temporary file in the same directory and renamed,
+        so the collector never reads a partial file.
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        directory = os.path.dirname(os.path.abspath(file_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".metrics-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                f.write(self.render())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+        """Serve GET /metrics on a background thread
+
+        Args:
+            port: Port to listen on (0 picks a free port)
+            host: Interface to bind
+
+        Returns:
+            The running server (its server_address holds the bound port)
+        """
+        registry = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.split("?", 1)[0] not in ("/metrics", "/"):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", CONTENT_TYPE)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # scrapes would flood the sync log
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        logging.info(f"Serving metrics on http://{host}:{self._server.server_address[1]}/metrics")
+        return self._server
+
+    def close(self):
+        """Stop the HTTP server, if running"""
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+
+class SyncExporter(MetricsRegistry):
+    """Sync counters, gauges and batch latency histogram"""
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        super().__init__()
+        self.runs = self.register(Counter(
+            "erp_sync_runs_total", "Completed sync runs"))
+        self.products_matched = self.register(Counter(
+            "erp_sync_products_matched_total", "Eshop products with a matching ERP product"))
+        self.products_missing = self.register(Counter(
+            "erp_sync_products_missing_in_erp_total", "Eshop products skipped because their SKU is missing in the ERP"))
+        self.products_synced = self.register(Counter(
+            "erp_sync_products_synced_total", "Products written to the output"))
+        self.validation_failures = self.register(Counter(
+            "erp_sync_validation_failures_total", "Failed validation checks", ("rule", "field")))
+        self.cast_failures = self.register(Counter(
+            "erp_sync_cast_failures_total", "Values FieldMapper could not cast to the Eshop type", ("field",)))
+        self.batch_latency = self.register(Histogram(
+            "erp_sync_batch_latency_seconds", "Time to write one batch of synced products", buckets=buckets))
+        self.last_run_timestamp = self.register(Gauge(
+            "erp_sync_last_run_timestamp_seconds", "Unix time the last sync run finished"))
+        self.last_run_duration = self.register(Gauge(
+            "erp_sync_last_run_duration_seconds", "Wall clock duration of the last sync run"))
+        self.last_run_rows_per_second = self.register(Gauge(
+            "erp_sync_last_run_rows_per_second", "Eshop products processed per second in the last run"))
+        self.stage_seconds = self.register(Gauge(
+            "erp_sync_stage_seconds", "Wall clock seconds per stage in the last run", ("stage",)))
+
+    def observe_batch(self, seconds: float):
+        """Record the latency of one written batch"""
+        self.batch_latency.observe(seconds)
+
+    def record_run(self, stats: Dict[str, Any], metrics: Any, finished_at: float):
+        """Add the results of a finished run
+
+        Args:
+            stats: ProductSync.stats of the run
+            metrics: SyncMetrics of the run
+            finished_at: Unix time the run finished
+        """
+        self.runs.inc()
+        self.products_matched.inc(max(metrics.rows - stats.get("missing_in_erp", 0), 0))
+        self.products_missing.inc(stats.get("missing_in_erp", 0))
+        self.products_synced.inc(metrics.synced)
+        for rule, fields in stats.get("failed_rules", {}).items():
+            for field, count in fields.items():
+                self.validation_failures.inc(count, rule=rule, field=field)
+        for field, count in stats.get("cast_failures", {}).items():
+            self.cast_failures.inc(count, field=field)
+
+        self.last_run_timestamp.set(finished_at)
+        self.last_run_duration.set(metrics.wall_seconds)
+        self.last_run_rows_per_second.set(metrics.rows_per_sec)
+        for stage, (wall, _) in metrics.stages.items():
+            self.stage_seconds.set(wall, stage=stage)
@@ -0,0 +1,129 @@
+"""
+Compact product records with one slot per field
+"""
+
+import copyreg
+from abc import ABCMeta
+from collections.abc import MutableMapping
+from functools import lru_cache
+from typing import Dict, Any, Iterable, Iterator, Mapping, Tuple
+
+from .money import json_default as _money_json_default
+
+_UNSET = object()
+
+
+class _RecordMeta(ABCMeta):
+    """Metaclass of record classes, which pickle by their fields and name"""
+
+
+class Record(MutableMapping, metaclass=_RecordMeta):
+    """Base class of fixed-field product records
+
+    Subclasses made by record_type() store each field in a slot instead of a
+    per-product dict, which takes a fraction of the memory of a dict from
+    json.load. Records behave like dicts restricted to their fields: get(),
+    item access, iteration in field order and equality with dicts all work, so
+    FieldMapper, ProductValidator and the output writer accept them unchanged.
+    Fields that were never set are missing, not None.
+    """
+
+    __slots__ = ()
+    fields: Tuple[str, ...] = ()
+    _slots: Dict[str, str] = {}
+
+    @classmethod
+    def from_mapping(cls, product: Mapping[str, Any]) -> "Record":
+        """Copy the record's fields from a product dict, dropping all others"""
+        record = cls()
+        for field, slot in cls._slots.items():
+            value = product.get(field, _UNSET)
+            if value is not _UNSET:
+                setattr(record, slot, value)
+        return record
+
+    def get(self, field: str, default: Any = None) -> Any:
+        slot = self._slots.get(field)
+        return default if slot is None else getattr(self, slot, default)
+
+    def __getitem__(self, field: str) -> Any:
+        value = self.get(field, _UNSET)
+        if value is _UNSET:
+            raise KeyError(field)
+        return value
+
+    def __setitem__(self, field: str, value: Any):
+        slot = self._slots.get(field)
+        if slot is None:
+            raise KeyError(f"{type(self).__name__} has no field {field!r}")
+        setattr(self, slot, value)
+
+    def __delitem__(self, field: str):
+        try:
+            delattr(self, self._slots[field])
+        except (KeyError, AttributeError):
+            raise KeyError(field) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for field, slot in self._slots.items():
+            if hasattr(self, slot):
+                yield field
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: getattr(self, slot) for field, slot in self._slots.items() if hasattr(self, slot)}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return _rebuild, (self.fields, type(self).__name__, self.to_dict())
+
+
+def record_type(fields: Iterable[str], name: str = "ProductRecord") -> type:
+    """Return the record class with one slot per field
+
+    Classes are cached, so the same fields and name always give the same class.
+
+    Args:
+        fields: Field names in output order (duplicates are ignored)
+        name: Class name shown in repr()
+
+    Returns:
+        Record subclass
+    """
+    return _record_class(tuple(dict.fromkeys(fields)), name)
+
+
+@lru_cache(maxsize=None)
+def _record_class(fields: Tuple[str, ...], name: str) -> type:
+    # Field names need not be identifiers, so slots are numbered
+    slots = {field: f"_f{position}" for position, field in enumerate(fields)}
+    return _RecordMeta(name, (Record,), {"__slots__": tuple(slots.values()), "fields": fields, "_slots": slots})
+
+
+def _reduce_record_class(cls: type):
+    # Record classes are built at runtime, so workers rebuild them from their fields
+    if cls is Record:
+        return "Record"
+    return record_type, (cls.fields, cls.__name__)
+
+
+copyreg.pickle(_RecordMeta, _reduce_record_class)
+
+
+def _rebuild(fields: Tuple[str, ...], name: str, values: Dict[str, Any]) -> Record:
+    return record_type(fields, name).from_mapping(values)
+
+
+def json_default(value: Any) -> Any:
+    """``default`` hook for json.dumps that serializes records and Money amounts
+
+    Raises:
+        TypeError: For any other unserializable value
+    """
+    if isinstance(value, Record):
+        return value.to_dict()
+    return _money_json_default(value)
@@ -0,0 +1,195 @@
+"""
+Retries, circuit breaking and dead-lettering for sink writes
+"""
+
+import logging
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, Any, Callable, List, Tuple
+
+from . import json_codec
+from .records import json_default
+
+# Circuit breaker states
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter
+
+    The n-th retry (from 0) waits a random time between 0 and
+    min(max_delay, base_delay * 2 ** n), so callers retrying the same endpoint
+    spread out instead of retrying in lockstep.
+    """
+
+    def __init__(self, base_delay: float = 0.5, max_delay: float = 30.0, rng: random.Random = None):
+        """Initialize the policy
+
+        Args:
+            base_delay: Upper bound of the first delay in seconds
+            max_delay: Upper bound of any delay in seconds
+            rng: Random number generator (a new one when omitted)
+        """
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt: int, retry_after: float = None) -> float:
+        """Seconds to wait before a retry
+
+        Args:
+            attempt: Number of retries already made
+            retry_after: Delay the endpoint asked for, honored up to max_delay
+
+        Returns:
+            Delay in seconds
+        """
+        if retry_after is not None:
+            return min(max(retry_after, 0.0), self.max_delay)
+        ceiling = min(self.max_delay, self.base_delay * 2 ** min(attempt, 32))
+        return self.rng.uniform(0, ceiling)
+
+
+class CircuitBreaker:
+    """Stops calls to an endpoint after repeated failures
+
+    After failure_threshold consecutive failures the circuit opens and allow()
+    returns False, so callers fail fast instead of waiting on an endpoint that
+    is down or slow. Once reset_timeout seconds have passed one trial call is
+    allowed (half-open): its success closes the circuit, its failure opens it
+    again.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """Initialize the breaker
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a trial call
+            clock: Monotonic clock in seconds
+        """
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout = reset_timeout
+        self.clock = clock
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = None
+
+    def allow(self) -> bool:
+        """Return whether a call may be made now"""
+        if self.state == OPEN and self.clock() - self._opened_at >= self.reset_timeout:
+            self.state = HALF_OPEN
+            return True
+        return self.state != OPEN
+
+    def record_success(self):
+        """Close the circuit after a successful call"""
+        self.state = CLOSED
+        self.failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        """Count a failed call, opening the circuit at the threshold or after a failed trial"""
+        self.failures += 1
+        if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+            if self.state != OPEN:
+                logging.warning(f"Circuit opened after {self.failures} consecutive failures")
+            self.state = OPEN
+            self._opened_at = self.clock()
+
+
+class DeadLetterLog:
+    """JSONL file of batches a sink did not accept, for replaying later
+
+    Each line holds the time, sink, error and products of one failed batch.
+
+    Usage:
+        dead_letters = DeadLetterLog("dead_letters.jsonl")
+        dead_letters.write("https://shop/products/bulk", batch, error)
+        replayed, remaining = dead_letters.replay(sink.write_batch)
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+
+    def write(self, sink_name: str, batch: List[Dict[str, Any]], error: Exception):
+        """Append a failed batch and flush it to disk
+
+        Raises:
+            OSError: If the file cannot be written
+        """
+        entry = {
+            "timestamp": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "sink": sink_name,
+            "error": str(error),
+            "products": list(batch)
+        }
+        with open(self.file_path, "a", encoding="utf-8") as f:
+            f.write(json_codec.dumps(entry, default=json_default) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+    def read(self) -> List[Dict[str, Any]]:
+        """Return all entries (empty if the file does not exist)
+
+        Raises:
+            json.JSONDecodeError: If a line is not valid JSON
+        """
+        try:
+            with open(self.file_path, "rb") as f:
+                return [json_codec.loads(line) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def replay(self, send: Callable[[List[Dict[str, Any]]], Any]) -> Tuple[int, int]:
+        """Send every dead-lettered batch again, keeping the ones that still fail
+
+        Entries are sent in file order. The file is then atomically rewritten with
+        the entries whose send raised an Exception, or removed when none did. A
+        batch that failed part way is kept whole, so its first products may be
+        sent twice.
+
+        Args:
+            send: Sends one batch of products, raising on failure
+
+        Returns:
+            Tuple of (number of products sent, number of entries left)
+
+        Raises:
+            OSError: If the file cannot be rewritten
+        """
+        sent = 0
+        remaining = []
+        for entry in self.read():
+            try:
+                send(entry["products"])
+                sent += len(entry["products"])
+            except Exception as e:
+                logging.warning(f"Replay of {len(entry['products'])} dead-lettered products failed: {e}")
+                entry["error"] = str(e)
+                remaining.append(entry)
+
+        if not remaining:
+            try:
+                os.unlink(self.file_path)
+            except FileNotFoundError:
+                pass
+            return sent, 0
+
+        directory = os.path.dirname(os.path.abspath(self.file_path))
+        fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".dead-letters-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                for entry in remaining:
+                    f.write(json_codec.dumps(entry, default=json_default) + "\n")
+            os.replace(temp_path, self.file_path)
+        except BaseException:
+            os.unlink(temp_path)
+            raise
+        return sent, len(remaining)
@@ -0,0 +1,149 @@
+"""
+Product schema inference and an on-disk schema cache
+"""
+
+import logging
+import os
+import tempfile
+import threading
+from collections import Counter
+from typing import Dict, Any, Iterable, Optional
+
+from . import json_codec
+
+# Number of products sampled for type inference by default
+DEFAULT_SAMPLE_SIZE = 1000
+
+# Numeric types in widening order; a field mixing them takes the widest
+_NUMERIC_WIDTH = {"bool": 0, "int": 1, "float": 2}
+
+_NONE_TYPE = type(None).__name__
+
+
+class Schema(dict):
+    """Field name -> type name mapping inferred from products
+
+    A dict subclass, so it can be used wherever field types are expected.
+
+    Attributes:
+        nullable: Fields that were None or missing in at least one sampled product
+        sample_size: Number of products the schema was inferred from
+    """
+
+    def __init__(self, types: Dict[str, str] = None, nullable: Iterable[str] = (), sample_size: int = 0):
+        super().__init__(types or {})
+        self.nullable = set(nullable)
+        self.sample_size = sample_size
+
+    @classmethod
+    def infer(cls, products: Iterable[Dict[str, Any]]) -> "Schema":
+        """Infer field types from products, reconciling mixed types
+
+        Nulls do not decide a field's type. Fields mixing bool, int and float take
+        the widest numeric type (int + float -> float); other mixes take the most
+        common type. Fields that are always None get type "NoneType".
+
+        Args:
+            products: Products to inspect (list or stream)
+
+        Returns:
+            Inferred schema
+        """
+        seen = {}
+        present = Counter()
+        nullable = set()
+        count = 0
+
+        for product in products:
+            count += 1
+            for field, value in product.items():
+                present[field] += 1
+                if value is None:
+                    nullable.add(field)
+                    continue
+                seen.setdefault(field, Counter())[type(value).__name__] += 1
+
+        types = {}
+        for field in present:
+            if present[field] < count:
+                nullable.add(field)
+            types[field] = cls._reconcile(seen.get(field))
+
+        return cls(types, nullable, count)
+
+    @staticmethod
+    def _reconcile(type_counts: Optional[Counter]) -> str:
+        if not type_counts:
+            return _NONE_TYPE
+        if len(type_counts) == 1:
+            return next(iter(type_counts))
+        if all(name in _NUMERIC_WIDTH for name in type_counts):
+            return max(type_counts, key=_NUMERIC_WIDTH.get)
+        return type_counts.most_common(1)[0][0]
+
+    def covers(self, product: Dict[str, Any]) -> bool:
+        """Check that a product has no fields unknown to the schema"""
+        return all(field in self for field in product)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {"types": dict(self), "nullable": sorted(self.nullable), "sample_size": self.sample_size}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Schema":
+        return cls(data["types"], data.get("nullable", ()), data.get("sample_size", 0))
+
+
+class SchemaCache:
+    """JSON file of schemas keyed by product source
+
+    Cached schemas are reused on later runs instead of inferring types again.
+    Delete the file, or an entry, to force inference. One instance can be shared
+    by syncs running in several threads.
+    """
+
+    def __init__(self, file_path: str):
+        self.file_path = file_path
+        self._schemas = None
+        self._lock = threading.Lock()
+
+    def get(self, source: str) -> Optional[Schema]:
+        """Return the cached schema for a source, or None"""
+        with self._lock:
+            entry = self._load().get(source)
+        return Schema.from_dict(entry) if entry else None
+
+    def put(self, source: str, schema: Schema):
+        """Store a schema and write the cache file
+
+        Note:
+            Logs and continues if the cache file cannot be written.
+        """
+        with self._lock:
+            self._put(source, schema)
+
+    def _put(self, source: str, schema: Schema):
+        self._load()[source] = schema.to_dict()
+        try:
+            directory = os.path.dirname(os.path.abspath(self.file_path))
+            fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".schema-", suffix=".tmp")
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    json_codec.dump({"sources": self._schemas}, f, indent=4)
+                os.replace(temp_path, self.file_path)
+            except BaseException:
+                os.unlink(temp_path)
+                raise
+        except OSError as e:
+            logging.error(f"Failed to write schema cache: {e}")
+
+    def _load(self) -> Dict[str, Any]:
+        if self._schemas is None:
+            try:
+                with open(self.file_path, "rb") as f:
+                    self._schemas = json_codec.load(f).get("sources", {})
+            except FileNotFoundError:
+                self._schemas = {}
+            except (OSError, ValueError, AttributeError) as e:
+                logging.warning(f"Ignoring unreadable schema cache {self.file_path}: {e}")
+                self._schemas = {}
+        return self._schemas
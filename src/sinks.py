@@ -0,0 +1,216 @@
+"""
+Pluggable destinations for synced products and adaptive batch sizing
+"""
+
+import asyncio
+from typing import Dict, Any, List
+
+from .http_adapters import AsyncHttpClient, HttpEshopSink, HttpError, DEFAULT_TIMEOUT
+from .output_writer import SyncedProductWriter
+
+# HTTP statuses that mean "slow down" rather than "this batch is bad"
+THROTTLE_STATUSES = (429, 503)
+
+
+class SinkError(Exception):
+    """Raised when a sink cannot accept a batch"""
+
+
+class SinkThrottled(SinkError):
+    """Raised when a sink asks the caller to slow down (429/503 or timeout)
+
+    Attributes:
+        retry_after: Seconds the sink asked to wait, if it said so
+    """
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class SinkUnavailable(SinkError):
+    """Raised when a sink failed or could not be reached (5xx or connection error)
+
+    Unlike other SinkErrors the batch itself is not at fault, so sending the same
+    batch again later may succeed.
+    """
+
+
+class ProductSink:
+    """Base class for destinations of synced products
+
+    ProductSync calls open() once, write_batch() for every batch, then close()
+    on success or abort() on failure. Sinks can be used as context managers.
+    """
+
+    name = "sink"
+
+    def open(self):
+        """Prepare the sink for writing"""
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        """Write one batch of products
+
+        Raises:
+            SinkThrottled: If the batch should be retried later or in smaller batches
+            SinkUnavailable: If the sink failed and the batch should be retried later
+            SinkError: If the batch was rejected
+        """
+        raise NotImplementedError
+
+    def close(self):
+        """Finish writing after all batches succeeded"""
+
+    def abort(self):
+        """Discard or stop writing after a failure"""
+
+    def __enter__(self):
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+        return False
+
+
+class FileSink(ProductSink):
+    """Writes products to OUTPUT_FILE exactly as save_synced_products does"""
+
+    name = "file"
+
+    def __init__(self, file_path: str, output_format: str = "json", compact: bool = False):
+        self.writer = SyncedProductWriter(file_path, output_format, compact)
+        self.name = file_path
+
+    def open(self):
+        self.writer.open()
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        for product in batch:
+            self.writer.write(product)
+
+    def close(self):
+        self.writer.close()
+
+    def abort(self):
+        self.writer.abort()
+
+
+class HttpSink(ProductSink):
+    """Blocking sink sending bulk updates to an Eshop API
+
+    Owns a private event loop so pooled keep-alive connections are reused across
+    batches.
+    """
+
+    def __init__(self, base_url: str, path: str = "/products/bulk", timeout: float = DEFAULT_TIMEOUT,
+                 headers: Dict[str, str] = None):
+        self.base_url = base_url
+        self.path = path
+        self.timeout = timeout
+        self.headers = headers
+        self.name = base_url.rstrip("/") + path
+        self._loop = None
+        self._client = None
+        self._sink = None
+
+    def open(self):
+        self._loop = asyncio.new_event_loop()
+        self._client = AsyncHttpClient(self.base_url, max_connections=1, timeout=self.timeout, headers=self.headers)
+        self._sink = HttpEshopSink(self._client, self.path)
+
+    def write_batch(self, batch: List[Dict[str, Any]]):
+        """Send one bulk update
+
+        Raises:
+            SinkThrottled: On 429/503 or a timeout
+            SinkUnavailable: On another 5xx, a connection error or a malformed response
+            SinkError: If the endpoint rejected the batch (other 4xx)
+        """
+        try:
+            self._loop.run_until_complete(self._sink.write_batch(batch))
+        except HttpError as e:
+            if e.status in THROTTLE_STATUSES:
+                raise SinkThrottled(str(e), e.retry_after) from e
+            if e.status >= 500:
+                raise SinkUnavailable(str(e)) from e
+            raise SinkError(str(e)) from e
+        except asyncio.TimeoutError as e:
+            raise SinkThrottled(f"Timed out after {self.timeout}s") from e
+        except OSError as e:
+            raise SinkUnavailable(str(e)) from e
+        except (ValueError, EOFError, asyncio.LimitOverrunError) as e:
+            # Undecodable body, bad status line or headers, or a truncated response
+            raise SinkUnavailable(f"Malformed response from {self.name}: {e}") from e
+
+    def close(self):
+        if self._loop is not None:
+            self._loop.run_until_complete(self._client.close())
+            self._loop.close()
+            self._loop = None
+
+    def abort(self):
+        self.close()
+
+
+class AdaptiveBatchSizer:
+    """Adjusts the batch size from observed latency and errors
+
+    The size grows while each larger batch raises throughput (products per
+    second), shrinks when throughput drops, and is cut multiplicatively after a
+    throttling response or timeout, after which growth pauses for a few batches.
+    """
+
+    def __init__(self, initial_size: int = 500, min_size: int = 1, max_size: int = 5000,
+                 growth: float = 1.5, backoff: float = 0.5, tolerance: float = 0.05,
+                 cooldown_batches: int = 3):
+        """Initialize the sizer
+
+        Args:
+            initial_size: Starting batch size
+            min_size: Smallest batch size
+            max_size: Largest batch size
+            growth: Factor applied when growing or shrinking on throughput changes
+            backoff: Factor applied after a throttling response or timeout
+            tolerance: Relative throughput change treated as noise
+            cooldown_batches: Successful batches to wait before growing after a throttle
+        """
+        self.min_size = max(1, min_size)
+        self.max_size = max(self.min_size, max_size)
+        self.batch_size = min(self.max_size, max(self.min_size, initial_size))
+        self.growth = growth
+        self.backoff = backoff
+        self.tolerance = tolerance
+        self.cooldown_batches = cooldown_batches
+        self._last_throughput = None
+        self._cooldown = 0
+
+    def record_success(self, batch_size: int, seconds: float):
+        """Update the size after a batch succeeded
+
+        Args:
+            batch_size: Number of products in the batch
+            seconds: Time the batch took
+        """
+        throughput = batch_size / max(seconds, 1e-9)
+
+        if self._cooldown:
+            # Probe again from scratch once the cooldown is over
+            self._cooldown -= 1
+            return
+
+        if self._last_throughput is None or throughput > self._last_throughput * (1 + self.tolerance):
+            self.batch_size = min(self.max_size, max(self.batch_size + 1, int(self.batch_size * self.growth)))
+        elif throughput < self._last_throughput * (1 - self.tolerance):
+            self.batch_size = max(self.min_size, int(self.batch_size / self.growth))
+
+        self._last_throughput = throughput
+
+    def record_throttle(self):
+        """Shrink the size after a throttling response or timeout"""
+        self.batch_size = max(self.min_size, int(self.batch_size * self.backoff))
+        self._cooldown = self.cooldown_batches
+        self._last_throughput = None
@@ -0,0 +1,545 @@
+"""
+Memory-mapped binary snapshot of the Eshop catalog
+"""
+
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import zlib
+from array import array
+from collections.abc import Mapping, Sequence
+from itertools import islice, repeat
+from typing import Dict, Any, Callable, Iterable, Iterator, List, Optional, Tuple, Union
+
+from . import json_codec
+
+SNAPSHOT_MAGIC = b"ESHOPSNP"
+SNAPSHOT_VERSION = 1
+
+# Products decoded together when iterating a snapshot
+DEFAULT_CHUNK_SIZE = 4096
+
+# Cell status bytes, one per product and column
+_MISSING = 0
+_NULL = 1
+_VALUE = 2
+
+# Fixed-width column kinds and their array typecodes; "str" and "json" columns
+# keep their text in a per-column UTF-8 heap instead
+_FIXED_KINDS = {"int": "q", "float": "d", "bool": "B"}
+
+# Magic, version, header offset, header length
+_PREAMBLE = struct.Struct("<8sIQQ")
+_INT64_MIN, _INT64_MAX = -2 ** 63, 2 ** 63 - 1
+_HASH_CHUNK_SIZE = 1 << 20
+_ABSENT = object()
+
+
+class SnapshotError(Exception):
+    """Raised when a snapshot cannot be written or is not a valid snapshot"""
+
+
+def source_signature(file_path: str) -> Dict[str, Any]:
+    """Return the size, mtime and BLAKE2b digest of a source file
+
+    Raises:
+        OSError: If the file cannot be read
+    """
+    stat = os.stat(file_path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+            digest.update(chunk)
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "blake2b": digest.hexdigest()}
+
+
+def _column_kind(kinds: set) -> str:
+    """Storage kind of a column from the type names of its non-null values"""
+    if not kinds:
+        return "null"
+    if len(kinds) == 1:
+        kind = next(iter(kinds))
+        if kind in _FIXED_KINDS or kind == "str":
+            return kind
+    # Mixed or nested values are stored as JSON so their types survive
+    return "json"
+
+
+def _sku_slot(sku: str, mask: int) -> int:
+    # crc32 is stable across processes, unlike hash()
+    return zlib.crc32(sku.encode("utf-8")) & mask
+
+
+class _TextColumnWriter:
+    """Collects the text of one column: a UTF-8 heap plus byte and character offsets"""
+
+    def __init__(self, count: int):
+        self.heap = bytearray()
+        self.offsets = array("Q", [0]) * (count + 1)
+        self.chars = array("Q", [0]) * (count + 1)
+        self._chars = 0
+
+    def set(self, row: int, text: str):
+        self.heap += text.encode("utf-8")
+        self._chars += len(text)
+        self.offsets[row + 1] = len(self.heap)
+        self.chars[row + 1] = self._chars
+
+    def skip(self, row: int):
+        # Cells without text are empty ranges, so offsets stay monotonic
+        self.offsets[row + 1] = len(self.heap)
+        self.chars[row + 1] = self._chars
+
+    def text(self, row: int) -> bytes:
+        return bytes(self.heap[self.offsets[row]:self.offsets[row + 1]])
+
+
+def write_snapshot(snapshot_path: str, products: Callable[[], Iterable[Dict[str, Any]]],
+                   identifier_field: str, source: Dict[str, Any]) -> int:
+    """Write a snapshot of Eshop products
+
+    Products are read twice, once to find the columns and their types and once
+    to fill them, so passing a stream factory keeps memory bounded by the size of
+    the snapshot rather than of the parsed products. The snapshot is written to a
+    temporary file and renamed into place.
+
+    Layout: a preamble (magic, version, header offset and length), then for each
+    column a status byte per product and either a fixed-width value array (int64,
+    float64 or uint8) or, for strings and JSON, uint64 byte and character offsets
+    (one more than the products) into the column's own UTF-8 heap. Then comes an
+    open-addressing SKU hash table of uint32 row numbers plus one (0 marks an
+    empty slot) and finally the JSON header. Sections are 8-byte aligned.
+
+    Args:
+        snapshot_path: Path of the snapshot file
+        products: Returns a new iterable over all Eshop products on each call
+        identifier_field: Field holding the SKU
+        source: Signature of the source file (see source_signature)
+
+    Returns:
+        Number of products written
+
+    Raises:
+        SnapshotError: If the snapshot cannot be written
+        ValueError: If the products change between the two passes
+    """
+    # Pass 1: columns in order of first appearance and the types of their values
+    field_kinds = {}
+    count = 0
+    for product in products():
+        count += 1
+        for field, value in product.items():
+            kinds = field_kinds.setdefault(field, set())
+            if value is not None:
+                kind = type(value).__name__
+                if kind == "int" and not _INT64_MIN <= value <= _INT64_MAX:
+                    kind = "bigint"
+                kinds.add(kind)
+    columns = [(field, _column_kind(kinds)) for field, kinds in field_kinds.items()]
+
+    # Pass 2: fill the columns and the SKU index
+    statuses = [bytearray(count) for _ in columns]
+    values = []
+    for _, kind in columns:
+        if kind in _FIXED_KINDS:
+            values.append(array(_FIXED_KINDS[kind], [0]) * count)
+        elif kind == "null":
+            values.append(None)
+        else:
+            values.append(_TextColumnWriter(count))
+
+    sku_column = next((values[position] for position, (field, kind) in enumerate(columns)
+                       if field == identifier_field and kind == "str"), None)
+    index_slots = 1
+    while index_slots < 2 * count:
+        index_slots *= 2
+    index = array("I", [0]) * (index_slots if sku_column is not None else 0)
+    mask = index_slots - 1
+
+    row = -1
+    for row, product in enumerate(products()):
+        if row >= count:
+            raise ValueError("Eshop products changed while writing the snapshot")
+        for position, (field, kind) in enumerate(columns):
+            value = product.get(field, _ABSENT)
+            column = values[position]
+            if value is not _ABSENT:
+                statuses[position][row] = _NULL if value is None else _VALUE
+            if kind in _FIXED_KINDS:
+                if value is not _ABSENT and value is not None:
+                    column[row] = value
+            elif kind != "null":
+                if value is _ABSENT or value is None:
+                    column.skip(row)
+                else:
+                    column.set(row, value if kind == "str" else json_codec.dumps(value, compact=True))
+
+        sku = product.get(identifier_field)
+        if sku_column is not None and sku:
+            encoded = sku.encode("utf-8")
+            slot = _sku_slot(sku, mask)
+            # The first product with a SKU wins, as in the ERP index
+            while index[slot]:
+                if sku_column.text(index[slot] - 1) == encoded:
+                    break
+                slot = (slot + 1) & mask
+            else:
+                index[slot] = row + 1
+    if row + 1 != count:
+        raise ValueError("Eshop products changed while writing the snapshot")
+
+    try:
+        _write_file(snapshot_path, columns, statuses, values, index, {
+            "count": count,
+            "identifier_field": identifier_field,
+            "source": source
+        })
+    except OSError as e:
+        raise SnapshotError(f"Cannot write Eshop snapshot {snapshot_path}: {e}") from e
+    return count
+
+
+def _write_file(snapshot_path: str, columns: List[Tuple[str, str]], statuses: List[bytearray],
+                values: List[Any], index: array, header: Dict[str, Any]):
+    """Write the snapshot sections and header to a temporary file and rename it into place"""
+    directory = os.path.dirname(os.path.abspath(snapshot_path))
+    fd, temp_path = tempfile.mkstemp(dir=directory, prefix=".snapshot-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            def append(data) -> int:
+                f.write(bytes(-f.tell() % 8))
+                offset = f.tell()
+                f.write(data)
+                return offset
+
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, 0, 0))
+            header["columns"] = []
+            for position, (field, kind) in enumerate(columns):
+                entry = {"field": field, "kind": kind, "status": append(statuses[position])}
+                column = values[position]
+                if kind in _FIXED_KINDS:
+                    entry["values"] = append(column)
+                elif kind != "null":
+                    entry["offsets"] = append(column.offsets)
+                    entry["chars"] = append(column.chars)
+                    entry["heap"] = append(column.heap)
+                header["columns"].append(entry)
+            header["index"] = append(index)
+            header["index_slots"] = len(index)
+
+            encoded = json_codec.dumps(header, compact=True).encode("utf-8")
+            header_offset = append(encoded)
+            f.seek(0)
+            f.write(_PREAMBLE.pack(SNAPSHOT_MAGIC, SNAPSHOT_VERSION, header_offset, len(encoded)))
+        os.replace(temp_path, snapshot_path)
+    except BaseException:
+        os.unlink(temp_path)
+        raise
+
+
+class _Column:
+    """Decoders for one column of a mapped snapshot"""
+
+    __slots__ = ("status", "read", "read_range")
+
+    def __init__(self, status: memoryview, read: Callable[[int], Any],
+                 read_range: Callable[[int, int], List[Any]]):
+        self.status = status
+        # Value of one row, and values of a range of rows (unspecified where not set)
+        self.read = read
+        self.read_range = read_range
+
+
+class SnapshotRow(Mapping):
+    """Lazy view of one product in a snapshot
+
+    Values are decoded from the memory map when accessed. Pickles as a plain dict.
+    """
+
+    __slots__ = ("_snapshot", "_row")
+
+    def __init__(self, snapshot: "EshopSnapshot", row: int):
+        self._snapshot = snapshot
+        self._row = row
+
+    def get(self, field: str, default: Any = None) -> Any:
+        return self._snapshot.value(self._row, field, default)
+
+    def __getitem__(self, field: str) -> Any:
+        value = self._snapshot.value(self._row, field, _ABSENT)
+        if value is _ABSENT:
+            raise KeyError(field)
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        row = self._row
+        for field, column in self._snapshot.columns.items():
+            if column.status[row] != _MISSING:
+                yield field
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {field: self[field] for field in self}
+
+    def __repr__(self) -> str:
+        return f"SnapshotRow({self.to_dict()!r})"
+
+    def __reduce__(self):
+        return dict, (self.to_dict(),)
+
+
+class EshopSnapshot(Sequence):
+    """Read-only, memory-mapped Eshop catalog snapshot written by write_snapshot
+
+    Nothing is decoded when a snapshot is opened. Iteration decodes products a
+    chunk of rows at a time into dicts, column by column and optionally only for
+    selected fields; indexing and find() return SnapshotRow views that decode
+    single values on access. Use EshopSnapshot.open() to get a snapshot only if
+    it is still current for its source file.
+
+    Usage:
+        snapshot = EshopSnapshot.open("eshop.snapshot", "products_eshop.json")
+        if snapshot is not None:
+            product = snapshot.find("SKU-1")
+    """
+
+    def __init__(self, snapshot_path: str, fields: Iterable[str] = None):
+        """Map a snapshot file
+
+        Args:
+            snapshot_path: Path of the snapshot file
+            fields: Fields included when iterating (None includes all)
+
+        Raises:
+            OSError: If the file cannot be opened
+            SnapshotError: If the file is not a snapshot of this version
+        """
+        self.snapshot_path = snapshot_path
+        self.fields = None if fields is None else tuple(dict.fromkeys(fields))
+        with open(snapshot_path, "rb") as f:
+            try:
+                self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError as e:
+                raise SnapshotError(f"Empty snapshot file {snapshot_path}") from e
+        self._views = []
+        try:
+            self._load_header()
+        except (KeyError, TypeError, ValueError) as e:
+            self.close()
+            raise SnapshotError(f"Corrupt snapshot {snapshot_path}: {e}") from e
+        except BaseException:
+            self.close()
+            raise
+
+    def _load_header(self):
+        mm = self._mmap
+        if len(mm) < _PREAMBLE.size:
+            raise SnapshotError(f"Truncated snapshot file {self.snapshot_path}")
+        magic, version, header_offset, header_length = _PREAMBLE.unpack_from(mm, 0)
+        if magic != SNAPSHOT_MAGIC or version != SNAPSHOT_VERSION or not header_offset:
+            raise SnapshotError(f"Not a version {SNAPSHOT_VERSION} snapshot: {self.snapshot_path}")
+        header = json_codec.loads(mm[header_offset:header_offset + header_length])
+
+        self.count = header["count"]
+        self.identifier_field = header["identifier_field"]
+        self.source = header["source"]
+        self._index = self._view(header["index"], header["index_slots"], "I")
+        self._index_mask = header["index_slots"] - 1
+        self.columns = {entry["field"]: self._column(entry) for entry in header["columns"]}
+
+    def _view(self, offset: int, count: int, typecode: str) -> memoryview:
+        """Zero-copy typed view of a section of the map"""
+        size = count * array(typecode).itemsize
+        section = memoryview(self._mmap)[offset:offset + size]
+        if len(section) != size:
+            raise SnapshotError(f"Truncated snapshot file {self.snapshot_path}")
+        view = section.cast(typecode)
+        # Every exported view must be released before the map can be closed
+        self._views += [view, section]
+        return view
+
+    def _column(self, entry: Dict[str, Any]) -> _Column:
+        count = self.count
+        status = self._view(entry["status"], count, "B")
+        kind = entry["kind"]
+
+        if kind == "null":
+            return _Column(status, lambda row: None, lambda start, end: [None] * (end - start))
+
+        if kind in _FIXED_KINDS:
+            values = self._view(entry["values"], count, _FIXED_KINDS[kind])
+            if kind == "bool":
+                return _Column(status, lambda row: values[row] == 1,
+                               lambda start, end: [value == 1 for value in values[start:end].tolist()])
+            return _Column(status, values.__getitem__, lambda start, end: values[start:end].tolist())
+
+        mm = self._mmap
+        heap = entry["heap"]
+        offsets = self._view(entry["offsets"], count + 1, "Q")
+        chars = self._view(entry["chars"], count + 1, "Q")
+        if heap + (offsets[count] if count else 0) > len(mm):
+            raise SnapshotError(f"Truncated snapshot file {self.snapshot_path}")
+
+        def read_text(row: int) -> str:
+            return str(mm[heap + offsets[row]:heap + offsets[row + 1]], "utf-8")
+
+        def read_texts(start: int, end: int) -> List[str]:
+            # Decode the whole range at once and slice it by character offsets
+            text = str(mm[heap + offsets[start]:heap + offsets[end]], "utf-8")
+            bounds = chars[start:end + 1].tolist()
+            base = bounds[0]
+            return [text[begin - base:stop - base] for begin, stop in zip(bounds, islice(bounds, 1, None))]
+
+        if kind == "str":
+            return _Column(status, read_text, read_texts)
+        return _Column(status, lambda row: json_codec.loads(read_text(row)),
+                       lambda start, end: [json_codec.loads(text) if text else None for text in read_texts(start, end)])
+
+    @classmethod
+    def open(cls, snapshot_path: str, source_path: str, fields: Iterable[str] = None) -> Optional["EshopSnapshot"]:
+        """Open a snapshot if it still matches its source file
+
+        A snapshot is stale when the source file's size differs from the one
+        recorded when it was written, or when its mtime differs and so does its
+        BLAKE2b digest. The file is only hashed when its mtime changed, so opening
+        a current snapshot reads nothing but its header.
+
+        Args:
+            snapshot_path: Path of the snapshot file
+            source_path: Path of the Eshop JSON file the snapshot was written from
+            fields: Fields included when iterating (None includes all)
+
+        Returns:
+            The snapshot, or None if it is missing, unreadable or stale
+        """
+        try:
+            snapshot = cls(snapshot_path, fields)
+        except FileNotFoundError:
+            return None
+        except (OSError, SnapshotError) as e:
+            logging.warning(f"Ignoring unreadable Eshop snapshot: {e}")
+            return None
+
+        try:
+            stat = os.stat(source_path)
+            recorded = snapshot.source
+            current = stat.st_size == recorded.get("size") and (
+                stat.st_mtime_ns == recorded.get("mtime_ns")
+                or source_signature(source_path)["blake2b"] == recorded.get("blake2b")
+            )
+        except OSError:
+            current = False
+        if not current:
+            logging.info(f"Eshop snapshot {snapshot_path} is out of date with {source_path}")
+            snapshot.close()
+            return None
+        return snapshot
+
+    def value(self, row: int, field: str, default: Any = None) -> Any:
+        """Decode one field of one product
+
+        Args:
+            row: Product position in the snapshot
+            field: Field name
+            default: Returned when the product has no such field
+
+        Returns:
+            The field value (None for null values)
+        """
+        column = self.columns.get(field)
+        if column is None:
+            return default
+        status = column.status[row]
+        if status == _VALUE:
+            return column.read(row)
+        return None if status == _NULL else default
+
+    def find(self, sku: str) -> Optional[SnapshotRow]:
+        """Look up the first product with a SKU through the hash index
+
+        Returns:
+            The product, or None if no product has the SKU
+        """
+        if not self._index or not isinstance(sku, str):
+            return None
+        index = self._index
+        mask = self._index_mask
+        slot = _sku_slot(sku, mask)
+        while index[slot]:
+            row = index[slot] - 1
+            if self.value(row, self.identifier_field) == sku:
+                return SnapshotRow(self, row)
+            slot = (slot + 1) & mask
+        return None
+
+    def iter_products(self, start: int = 0, end: int = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Dict[str, Any]]:
+        """Decode products into dicts, a chunk of rows at a time
+
+        Args:
+            start: First row
+            end: Row to stop before (None for all rows)
+            chunk_size: Rows decoded together
+
+        Yields:
+            Product dictionaries with the selected fields, in file order
+        """
+        end = self.count if end is None else min(end, self.count)
+        names = self.columns if self.fields is None else [field for field in self.fields if field in self.columns]
+        columns = [(field, self.columns[field]) for field in names]
+        keys = tuple(field for field, _ in columns)
+
+        for chunk_start in range(start, end, chunk_size):
+            chunk_end = min(chunk_start + chunk_size, end)
+            value_lists = []
+            absent = []
+            for field, column in columns:
+                values = column.read_range(chunk_start, chunk_end)
+                status = column.status[chunk_start:chunk_end].tobytes()
+                if status.count(_VALUE) != len(status):
+                    for offset, cell in enumerate(status):
+                        if cell == _NULL:
+                            values[offset] = None
+                        elif cell == _MISSING:
+                            absent.append((offset, field))
+                value_lists.append(values)
+
+            if not columns:
+                products = [{} for _ in range(chunk_end - chunk_start)]
+            else:
+                products = list(map(dict, map(zip, repeat(keys), zip(*value_lists))))
+            for offset, field in absent:
+                del products[offset][field]
+            yield from products
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, position: Union[int, slice]) -> Union[SnapshotRow, List[Dict[str, Any]]]:
+        if isinstance(position, slice):
+            start, stop, step = position.indices(self.count)
+            if step != 1:
+                return [self[row].to_dict() for row in range(start, stop, step)]
+            return list(self.iter_products(start, stop))
+        if position < 0:
+            position += self.count
+        if not 0 <= position < self.count:
+            raise IndexError("snapshot index out of range")
+        return SnapshotRow(self, position)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.iter_products()
+
+    def close(self):
+        """Release the typed views and unmap the file"""
+        for view in self._views:
+            view.release()
+        self._views = []
+        self.columns = {}
+        self._index = None
+        self._mmap.close()
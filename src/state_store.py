@@ -0,0 +1,142 @@
+"""
+Persistent sync state for skipping unchanged ERP products between runs and
+reconciling shared fields
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+from typing import Dict, Any, Callable, List
+
+from . import json_codec
+from .records import json_default
+
+
+class SyncStateStore:
+    """SQLite-backed store of ERP product content hashes keyed by SKU
+
+    A hash covers the ERP values of the mapped fields only, so changes to unmapped
+    ERP fields do not trigger a resync. The store also records a fingerprint of the
+    sync configuration and discards all hashes when it changes, since products
+    would then map or validate differently.
+
+    It also keeps the Eshop values of shared fields (see FIELD_OWNERSHIP) after
+    the last sync, keyed by SKU. They are the baseline the Eshop's next changes
+    are measured from and survive configuration changes.
+    """
+
+    def __init__(self, db_path: str, erp_fields: List[str], config_fingerprint: str = ""):
+        """Initialize the state store
+
+        Args:
+            db_path: Path to the SQLite database file (created if missing)
+            erp_fields: ERP field names included in each product hash
+            config_fingerprint: Value identifying the mapping and validation setup
+        """
+        self.db_path = db_path
+        self.erp_fields = list(erp_fields)
+        self.config_fingerprint = config_fingerprint
+
+    @staticmethod
+    def fingerprint(*parts: Any) -> str:
+        """Build a stable fingerprint from JSON-serializable configuration parts"""
+        # The standard library rather than json_codec, so the fingerprint does not
+        # change (and discard all hashes) when JSON_BACKEND does
+        payload = json.dumps(parts, sort_keys=True, default=str)
+        return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+    def hash_product(self, erp_product: Dict[str, Any]) -> str:
+        """Return the content hash of an ERP product's mapped fields
+
+        Args:
+            erp_product: ERP product dictionary
+
+        Returns:
+            Hex digest of the mapped field values
+        """
+        values = repr(tuple(erp_product.get(field) for field in self.erp_fields))
+        return hashlib.blake2b(values.encode("utf-8"), digest_size=16).hexdigest()
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.db_path)
+        connection.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        connection.execute("CREATE TABLE IF NOT EXISTS product_hashes (sku TEXT PRIMARY KEY, hash TEXT NOT NULL)")
+        connection.execute("CREATE TABLE IF NOT EXISTS synced_values (sku TEXT PRIMARY KEY, fields TEXT NOT NULL)")
+        return connection
+
+    def load_hashes(self) -> Dict[str, str]:
+        """Load all stored hashes
+
+        Returns:
+            Dictionary mapping SKU to content hash (empty if the store is new or
+            the configuration fingerprint changed)
+        """
+        connection = self._connect()
+        try:
+            row = connection.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+            if row is None or row[0] != self.config_fingerprint:
+                if row is not None:
+                    logging.info("Sync configuration changed, discarding stored product hashes")
+                return {}
+            return dict(connection.execute("SELECT sku, hash FROM product_hashes"))
+        finally:
+            connection.close()
+
+    def load_synced_values(self, cast: Callable[[Any, str], Any] = None) -> Dict[str, Dict[str, Any]]:
+        """Load the shared field values of the last sync
+
+        Values are stored as JSON, so Money amounts come back as numbers (or
+        strings beyond 15 digits); pass cast to restore their field's type.
+
+        Args:
+            cast: Called as cast(value, eshop_field) for each value, e.g.
+                FieldMapper.cast_to_eshop_type
+
+        Returns:
+            Dictionary mapping SKU to {Eshop field: value} (empty if the store is new)
+        """
+        connection = self._connect()
+        try:
+            rows = connection.execute("SELECT sku, fields FROM synced_values")
+            if cast is None:
+                return {sku: json_codec.loads(fields) for sku, fields in rows}
+            return {
+                sku: {field: cast(value, field) for field, value in json_codec.loads(fields).items()}
+                for sku, fields in rows
+            }
+        finally:
+            connection.close()
+
+    def save_hashes(self, hashes: Dict[str, str], synced_values: Dict[str, Dict[str, Any]] = None):
+        """Store hashes and shared field values for synced products in a single transaction
+
+        Args:
+            hashes: Dictionary mapping SKU to content hash
+            synced_values: Dictionary mapping SKU to {Eshop field: value} of its
+                shared fields after this sync
+        """
+        connection = self._connect()
+        try:
+            with connection:
+                row = connection.execute("SELECT value FROM meta WHERE key = 'fingerprint'").fetchone()
+                if row is None or row[0] != self.config_fingerprint:
+                    connection.execute("DELETE FROM product_hashes")
+                    connection.execute(
+                        "INSERT OR REPLACE INTO meta (key, value) VALUES ('fingerprint', ?)",
+                        (self.config_fingerprint,)
+                    )
+                connection.executemany(
+                    "INSERT OR REPLACE INTO product_hashes (sku, hash) VALUES (?, ?)",
+                    hashes.items()
+                )
+                if synced_values:
+                    connection.executemany(
+                        "INSERT OR REPLACE INTO synced_values (sku, fields) VALUES (?, ?)",
+                        (
+                            (sku, json_codec.dumps(fields, compact=True, default=json_default))
+                            for sku, fields in synced_values.items()
+                        )
+                    )
+        finally:
+            connection.close()
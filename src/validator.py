@@ -2,53 +2,292 @@
 Product data validation utilities
 """
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional, Sequence, Tuple
+from .error_log import ValidationErrorLog, format_product_errors, DEFAULT_FLUSH_EVERY
+
+try:
+    import numpy as np
+except ImportError:  # numpy is only needed for batch validation
+    np = None
+
+# Check kinds in a compiled validation plan
+REQUIRED = 0
+NON_NULL = 1
+POSITIVE = 2
+
+# Validation rule each check kind comes from
+RULE_NAMES = {
+    REQUIRED: "required_fields",
+    NON_NULL: "non_null_fields",
+    POSITIVE: "positive_fields"
+}
+
+# Batch validation stores one bit per check in a uint64 per row
+MAX_BATCH_CHECKS = 64
+
+
+class BatchValidationResult:
+    """Outcome of ProductValidator.validate_batch
+    
+    Attributes:
+        bitmap: uint64 array with one entry per row; bit i is set when check i of
+            the validator's check_plan failed for that row
+        errors: Dictionary mapping failing row indexes to their error messages,
+            in the same order validate_product would report them
+    """
+    
+    def __init__(self, bitmap: "np.ndarray", errors: Dict[int, List[str]]):
+        self.bitmap = bitmap
+        self.errors = errors
+    
+    @property
+    def valid_mask(self) -> "np.ndarray":
+        """Boolean array that is True for rows without errors"""
+        return self.bitmap == 0
 
 class ProductValidator:
     """Validates product data according to business rules"""
     
     def __init__(self, validation_rules: Dict[str, List[str]]):
+        """Initialize ProductValidator and compile the rules into a check plan
+        
+        Args:
+            validation_rules: Dictionary with "required_fields", "non_null_fields"
+                and "positive_fields" lists
+        """
         self.validation_rules = validation_rules
+        self.check_plan = self._compile_rules(validation_rules)
+        
+        # (rule name, field) -> number of failed checks seen by validate_product
+        self.failure_counts = {}
+    
+    @staticmethod
+    def _compile_rules(validation_rules: Dict[str, List[str]]) -> List[Tuple[int, str]]:
+        """Flatten validation rules into (check kind, field) pairs in reporting order
+        
+        Args:
+            validation_rules: Validation rules dictionary
+            
+        Returns:
+            List of (check kind, field name) tuples
+        """
+        check_plan = []
+        for field in validation_rules.get("required_fields", []):
+            check_plan.append((REQUIRED, field))
+        for field in validation_rules.get("non_null_fields", []):
+            check_plan.append((NON_NULL, field))
+        for field in validation_rules.get("positive_fields", []):
+            check_plan.append((POSITIVE, field))
+        return check_plan
     
-    def validate_product(self, product: Dict[str, Any]) -> List[str]:
+    @staticmethod
+    def _check_error(kind: int, field: str, value: Any) -> Optional[str]:
+        """Return the error message for a single check, or None if it passes
+        
+        Args:
+            kind: Check kind (REQUIRED, NON_NULL or POSITIVE)
+            field: Field name being checked
+            value: Field value from the product
+            
+        Returns:
+            Validation error message or None
+        """
+        if kind == REQUIRED:
+            return None if value else f"Missing {field}"
+        
+        if value is None:
+            return f"Missing {field}"
+        if kind == NON_NULL:
+            return None
+        
+        try:
+            numeric_value = float(value)
+        except (ValueError, TypeError):
+            return f"Invalid {field} format: {value}"
+        if numeric_value <= 0:
+            return f"Invalid {field}: must be greater than 0"
+        return None
+    
+    def validate_product(self, product: Dict[str, Any], fail_fast: bool = False) -> List[str]:
         """Validate a single product and return list of errors
         
         Args:
             product: Product dictionary to validate
+            fail_fast: Stop at the first error (at most one error is returned)
             
         Returns:
             List of validation error messages (empty if valid)
         """
-        errors = []
+        errors = None
         
-        # Check required fields
-        for field in self.validation_rules.get("required_fields", []):
-            if not product.get(field):
-                errors.append(f"Missing {field}")
+        for kind, field in self.check_plan:
+            value = product.get(field)
+            
+            # Inline checks for passing values; failures take the slow path
+            if kind == REQUIRED:
+                if value:
+                    continue
+            elif kind == NON_NULL:
+                if value is not None:
+                    continue
+            elif (type(value) is float or type(value) is int) and value > 0:
+                continue
+            
+            error = self._check_error(kind, field, value)
+            if error is None:
+                continue
+            key = (RULE_NAMES[kind], field)
+            self.failure_counts[key] = self.failure_counts.get(key, 0) + 1
+            if fail_fast:
+                return [error]
+            if errors is None:
+                errors = []
+            errors.append(error)
         
-        # Check non-null fields
-        for field in self.validation_rules.get("non_null_fields", []):
-            if product.get(field) is None:
-                errors.append(f"Missing {field}")
+        return [] if errors is None else errors
+    
+    def is_valid(self, product: Dict[str, Any]) -> bool:
+        """Check whether a product passes all validation rules
         
-        # Check positive fields
-        for field in self.validation_rules.get("positive_fields", []):
-            value = product.get(field)
-            if value is None:
-                errors.append(f"Missing {field}")
+        Args:
+            product: Product dictionary to validate
+            
+        Returns:
+            True if the product is valid
+        """
+        return not self.validate_product(product, fail_fast=True)
+    
+    def build_columns(self, products: Sequence[Dict[str, Any]]) -> Dict[str, "np.ndarray"]:
+        """Build columnar arrays of the validated fields from mapped products
+        
+        Args:
+            products: Mapped product dictionaries
+            
+        Returns:
+            Dictionary mapping each validated field to an object array of its values
+            (None where the field is missing)
+            
+        Raises:
+            ImportError: If numpy is not installed
+        """
+        self._require_numpy()
+        count = len(products)
+        fields = dict.fromkeys(field for _, field in self.check_plan)
+        return {
+            field: np.fromiter((product.get(field) for product in products), dtype=object, count=count)
+            for field in fields
+        }
+    
+    def validate_batch(self, columns: Dict[str, "np.ndarray"], row_count: int = None) -> BatchValidationResult:
+        """Validate many products at once from columnar arrays
+        
+        Each rule is evaluated as a vectorized mask over its column and error
+        messages are only built for rows that fail. Results match validate_product
+        row by row. Columns may be object arrays (see build_columns) or numeric
+        arrays; fields without a column are treated as missing.
+        
+        Args:
+            columns: Dictionary mapping field names to equal-length arrays
+            row_count: Number of rows (required only when no columns are given)
+            
+        Returns:
+            BatchValidationResult with the per-row error bitmap and messages
+            
+        Raises:
+            ImportError: If numpy is not installed
+            ValueError: If there are more checks than fit in the bitmap
+        """
+        self._require_numpy()
+        if len(self.check_plan) > MAX_BATCH_CHECKS:
+            raise ValueError(f"Batch validation supports at most {MAX_BATCH_CHECKS} checks")
+        
+        if row_count is None:
+            row_count = len(next(iter(columns.values()))) if columns else 0
+        
+        bitmap = np.zeros(row_count, dtype=np.uint64)
+        for bit, (kind, field) in enumerate(self.check_plan):
+            column = columns.get(field)
+            if column is None:
+                failed = np.ones(row_count, dtype=bool)
             else:
-                try:
-                    numeric_value = float(value)
-                    if numeric_value <= 0:
-                        errors.append(f"Invalid {field}: must be greater than 0")
-                except (ValueError, TypeError):
-                    errors.append(f"Invalid {field} format: {value}")
+                failed = self._failed_mask(kind, field, np.asarray(column))
+            bitmap |= failed.astype(np.uint64) << np.uint64(bit)
+        
+        errors = {}
+        for row in np.flatnonzero(bitmap).tolist():
+            row_bits = int(bitmap[row])
+            row_errors = []
+            for bit, (kind, field) in enumerate(self.check_plan):
+                if row_bits >> bit & 1:
+                    column = columns.get(field)
+                    value = None if column is None else column[row]
+                    row_errors.append(self._check_error(kind, field, value))
+            errors[row] = row_errors
         
-        return errors
+        return BatchValidationResult(bitmap, errors)
+    
+    def _failed_mask(self, kind: int, field: str, column: "np.ndarray") -> "np.ndarray":
+        """Evaluate one check over a column
+        
+        Args:
+            kind: Check kind (REQUIRED, NON_NULL or POSITIVE)
+            field: Field name being checked
+            column: Values of the field for every row
+            
+        Returns:
+            Boolean array that is True for rows failing the check
+        """
+        dtype_kind = column.dtype.kind
+        
+        if dtype_kind in "biuf":
+            # Numeric columns cannot hold None
+            if kind == REQUIRED:
+                return ~column.astype(bool)
+            if kind == NON_NULL:
+                return np.zeros(len(column), dtype=bool)
+            return column <= 0
+        
+        if dtype_kind in "US":
+            if kind == REQUIRED:
+                return column == column.dtype.type()
+            if kind == NON_NULL:
+                return np.zeros(len(column), dtype=bool)
+            return self._positive_fallback(field, column)
+        
+        # Object columns
+        if kind == REQUIRED:
+            return ~column.astype(bool)
+        nulls = np.equal(column, None)
+        if kind == NON_NULL:
+            return nulls
+        
+        try:
+            numeric = np.zeros(len(column), dtype=np.float64)
+            numeric[~nulls] = column[~nulls].astype(np.float64)
+        except Exception:
+            # Some values are not numbers; build the mask value by value
+            return self._positive_fallback(field, column)
+        return nulls | (numeric <= 0)
+    
+    def _positive_fallback(self, field: str, column: "np.ndarray") -> "np.ndarray":
+        """Evaluate a positive check value by value for columns numpy cannot convert"""
+        return np.fromiter(
+            (self._check_error(POSITIVE, field, value) is not None for value in column.tolist()),
+            dtype=bool,
+            count=len(column)
+        )
+    
+    @staticmethod
+    def _require_numpy():
+        if np is None:
+            raise ImportError("Batch validation requires numpy (pip install numpy)")
     
     def log_product_errors(self, product: Dict[str, Any], errors: List[str], start_timestamp: str, log_file: str):
         """Log validation errors for a product
         
+        Opens the log file for this single product; use open_error_log when
+        logging errors for a whole run.
+        
         Args:
             product: Product dictionary that failed validation
             errors: List of validation error messages
@@ -56,7 +295,19 @@ class ProductValidator:
             log_file: Path to the log file
         """
         with open(log_file, "a", encoding="utf-8") as log:
-            log.write(f"[ERP to Eshop at {start_timestamp}] Product with Eshop ID {product.get('id')} could not be updated due to these errors:\n")
-            for error in errors:
-                log.write(f"    - {error}\n")
-            log.write("\n")  # Add a blank line for readability
+            log.write(format_product_errors(product, errors, start_timestamp))
+    
+    def open_error_log(self, log_file: str, start_timestamp: str, report_file: str = None,
+                       flush_every: int = DEFAULT_FLUSH_EVERY) -> ValidationErrorLog:
+        """Open a buffered error log that stays open for a whole sync run
+        
+        Args:
+            log_file: Path to the human-readable log file
+            start_timestamp: Timestamp for the sync operation
+            report_file: Optional path of a structured JSONL error report
+            flush_every: Number of failing products buffered before writing
+            
+        Returns:
+            ValidationErrorLog to record errors into (use as a context manager)
+        """
+        return ValidationErrorLog(log_file, start_timestamp, report_file, flush_every)
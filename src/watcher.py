@@ -0,0 +1,157 @@
+"""
+File change detection using inotify where available, with a polling fallback
+"""
+
+import ctypes
+import ctypes.util
+import logging
+import os
+import select
+import sys
+import threading
+import time
+from typing import Optional, Tuple
+
+# inotify events that can signal a new version of the watched file
+_IN_MODIFY = 0x00000002
+_IN_ATTRIB = 0x00000004
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_WATCH_MASK = _IN_MODIFY | _IN_ATTRIB | _IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+
+
+def file_signature(file_path: str) -> Optional[Tuple[int, int, int]]:
+    """Return (mtime_ns, size, inode) of a file, or None if it does not exist"""
+    try:
+        stat = os.stat(file_path)
+    except FileNotFoundError:
+        return None
+    return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+
+class _Inotify:
+    """Wakes up on inotify events in the watched file's directory (Linux only)"""
+
+    def __init__(self, directory: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        # Watch the directory so files replaced by rename are seen too
+        if libc.inotify_add_watch(self.fd, os.fsencode(directory), _WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: float) -> bool:
+        """Wait up to timeout seconds for events, returning True if any arrived"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        try:
+            while os.read(self.fd, 65536):
+                pass
+        except BlockingIOError:
+            pass
+        return True
+
+    def close(self):
+        os.close(self.fd)
+
+
+class FileWatcher:
+    """Detects new versions of a file
+
+    The file's (mtime, size, inode) signature is compared with the last version
+    seen. On Linux, inotify wakes the watcher as soon as the file's directory
+    changes; elsewhere, or if inotify is unavailable, the file is polled every
+    ``interval`` seconds. A change is only reported once the signature has been
+    stable for ``debounce`` seconds, so files still being written are not read.
+
+    Usage:
+        watcher = FileWatcher("data/products_erp.json")
+        while watcher.wait_for_change():
+            sync()
+    """
+
+    def __init__(self, file_path: str, interval: float = 1.0, debounce: float = 0.5, use_inotify: bool = True):
+        """Initialize the watcher with the file's current version as seen
+
+        Args:
+            file_path: File to watch
+            interval: Seconds between polls (also the inotify wake-up interval)
+            debounce: Seconds the file must stay unchanged before a change is reported
+            use_inotify: Use inotify when available
+        """
+        self.file_path = file_path
+        self.interval = interval
+        self.debounce = debounce
+        self.signature = file_signature(file_path)
+        self._inotify = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self._inotify = _Inotify(os.path.dirname(os.path.abspath(file_path)))
+            except (OSError, AttributeError) as e:
+                logging.info(f"inotify unavailable, polling {file_path} instead: {e}")
+
+    @property
+    def uses_inotify(self) -> bool:
+        return self._inotify is not None
+
+    def wait_for_change(self, timeout: float = None, stop_event: threading.Event = None) -> bool:
+        """Block until the file changes
+
+        Args:
+            timeout: Maximum seconds to wait (None waits forever)
+            stop_event: Event that ends the wait early when set
+
+        Returns:
+            True if the file changed, False on timeout or when stop_event is set
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        while not (stop_event is not None and stop_event.is_set()):
+            wait = self.interval
+            if deadline is not None:
+                wait = min(wait, max(deadline - time.monotonic(), 0.0))
+
+            if self._inotify is not None:
+                self._inotify.wait(wait)
+            elif stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+            signature = file_signature(self.file_path)
+            if signature is not None and signature != self.signature:
+                signature = self._settle(signature, stop_event)
+                if signature is not None:
+                    self.signature = signature
+                    return True
+
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+
+        return False
+
+    def _settle(self, signature: Tuple[int, int, int], stop_event: threading.Event = None) -> Optional[Tuple[int, int, int]]:
+        """Wait until the file stops changing and return its final signature"""
+        while True:
+            if stop_event is not None:
+                if stop_event.wait(self.debounce):
+                    return None
+            else:
+                time.sleep(self.debounce)
+            latest = file_signature(self.file_path)
+            if latest == signature:
+                return signature
+            if latest is None:
+                return None
+            signature = latest
+
+    def close(self):
+        """Release the inotify descriptor, if any"""
+        if self._inotify is not None:
+            self._inotify.close()
+            self._inotify = None
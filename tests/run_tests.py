@@ -2,6 +2,12 @@
 """
 Test runner for ERP to Eshop integration framework
 Provides a simple way to run all tests with detailed output
+
+Usage:
+    python3 run_tests.py                          # Functional tests
+    python3 run_tests.py --perf                   # Also performance tests against perf_baseline.json
+    python3 run_tests.py --perf test_perf         # Performance tests only
+    python3 run_tests.py --perf --update-baseline test_perf   # Record a new baseline
 """
 
 import sys
@@ -85,9 +91,19 @@ def run_specific_test(test_name):
 
 def main():
     """Main entry point for test runner"""
-    if len(sys.argv) > 1:
+    args = sys.argv[1:]
+    
+    # Opt-in performance tier, checked against perf_baseline.json
+    if "--update-baseline" in args:
+        args.remove("--update-baseline")
+        os.environ["PERF_UPDATE_BASELINE"] = "1"
+    if "--perf" in args:
+        args.remove("--perf")
+        os.environ["RUN_PERF_TESTS"] = "1"
+    
+    if args:
         # Run specific test
-        test_name = sys.argv[1]
+        test_name = args[0]
         return run_specific_test(test_name)
     else:
         # Run all tests
@@ -0,0 +1,160 @@
+"""
+In-process HTTP stub of the ERP and Eshop APIs for tests and benchmarks
+"""
+
+import asyncio
+import json
+import math
+import threading
+from urllib.parse import urlsplit, parse_qs
+
+
+class StubServer:
+    """Minimal asyncio HTTP/1.1 server with keep-alive support
+
+    Routes:
+        GET  /products?page=N&page_size=M  -> {"products": [...], "page": N, "total_pages": T}
+        POST /products/bulk                -> {"updated": count}, storing the products
+
+    Usage:
+        async with StubServer(products) as server:
+            client = AsyncHttpClient(server.url)
+    """
+
+    def __init__(self, products=None, latency: float = 0.0):
+        """Initialize the stub
+
+        Args:
+            products: ERP products served by GET /products
+            latency: Seconds to wait before answering each request
+        """
+        self.products = list(products or [])
+        self.latency = latency
+        self.received = []
+        self.requests = 0
+        self.connections = 0
+        self.max_concurrent = 0
+        self._concurrent = 0
+        self._server = None
+        self._handlers = {}
+        self.port = None
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    async def start(self):
+        self._server = await asyncio.start_server(self._handle_connection, "127.0.0.1", 0)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self._server.close()
+        # Close open keep-alive connections so their handlers finish cleanly
+        handlers = list(self._handlers.items())
+        for _, writer in handlers:
+            writer.close()
+        await asyncio.gather(*(task for task, _ in handlers), return_exceptions=True)
+        await self._server.wait_closed()
+
+    def start_in_thread(self):
+        """Run the server on an event loop in a background thread (for blocking callers)"""
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self.start(), self._loop).result()
+
+    def stop_in_thread(self):
+        """Stop a server started with start_in_thread"""
+        asyncio.run_coroutine_threadsafe(self.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+    async def __aenter__(self):
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.stop()
+        return False
+
+    async def handle(self, method: str, path: str, query: dict, body):
+        """Return (status, payload, headers) for a request
+
+        A str payload is sent as is with a text/html content type (override it in
+        headers); anything else is sent as JSON.
+        """
+        if method == "GET" and path == "/products":
+            page = int(query.get("page", ["1"])[0])
+            page_size = int(query.get("page_size", ["100"])[0])
+            start = (page - 1) * page_size
+            return 200, {
+                "products": self.products[start:start + page_size],
+                "page": page,
+                "total_pages": max(1, math.ceil(len(self.products) / page_size))
+            }, {}
+
+        if method == "POST" and path == "/products/bulk":
+            products = body.get("products", [])
+            self.received.extend(products)
+            return 200, {"updated": len(products)}, {}
+
+        return 404, {"error": "not found"}, {}
+
+    async def _handle_connection(self, reader, writer):
+        self.connections += 1
+        task = asyncio.current_task()
+        self._handlers[task] = writer
+        try:
+            while True:
+                try:
+                    request_line = await reader.readuntil(b"\r\n")
+                except asyncio.IncompleteReadError:
+                    break
+
+                method, target, _ = request_line.decode("latin-1").split(" ", 2)
+                headers = {}
+                while True:
+                    line = await reader.readuntil(b"\r\n")
+                    if line == b"\r\n":
+                        break
+                    name, _, value = line.decode("latin-1").partition(":")
+                    headers[name.strip().lower()] = value.strip()
+
+                raw_body = await reader.readexactly(int(headers.get("content-length", 0)))
+                body = json.loads(raw_body) if raw_body else None
+                parts = urlsplit(target)
+
+                self.requests += 1
+                self._concurrent += 1
+                self.max_concurrent = max(self.max_concurrent, self._concurrent)
+                try:
+                    if self.latency:
+                        await asyncio.sleep(self.latency)
+                    status, payload, extra_headers = await self.handle(
+                        method, parts.path, parse_qs(parts.query), body
+                    )
+                finally:
+                    self._concurrent -= 1
+
+                if isinstance(payload, str):
+                    data = payload.encode("utf-8")
+                    content_type = "text/html"
+                else:
+                    data = json.dumps(payload).encode("utf-8")
+                    content_type = "application/json"
+                response_headers = {"Content-Type": content_type, "Content-Length": str(len(data))}
+                response_headers.update(extra_headers)
+                head = f"HTTP/1.1 {status} Stub\r\n" + "".join(
+                    f"{name}: {value}\r\n" for name, value in response_headers.items()
+                )
+                writer.write(head.encode("latin-1") + b"\r\n" + data)
+                await writer.drain()
+
+                if response_headers.get("Connection", "").lower() == "close":
+                    break
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass  # client went away mid-request
+        finally:
+            del self._handlers[task]
+            writer.close()
@@ -0,0 +1,126 @@
+"""
+Unit tests for multi-channel sync
+"""
+
+import unittest
+import json
+import os
+import tempfile
+from unittest.mock import patch
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.channels import MultiChannelSync, channel_config
+from src.data_loader import DataLoader
+
+
+class TestMultiChannelSync(unittest.TestCase):
+    """Test cases for MultiChannelSync functionality"""
+
+    def setUp(self):
+        """Write an ERP file and two Eshop catalogs"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dir = temp_dir.name
+
+        self.erp_file = self.write("erp.json", [
+            {"ItemName": "Laptop", "ItemPrice": "999.99", "ItemSku": "SKU-1", "ItemStock": "5"},
+            {"ItemName": "Mouse", "ItemPrice": "0", "ItemSku": "SKU-2", "ItemStock": "50"}
+        ])
+        self.shop_a = self.write("shop_a.json", [
+            {"id": 1, "name": "", "price": 1.0, "sku": "SKU-1", "stock": 0},
+            {"id": 2, "name": "", "price": 1.0, "sku": "SKU-2", "stock": 0}
+        ])
+        self.shop_b = self.write("shop_b.json", [
+            {"id": 7, "title": "", "cost": 1.0, "sku": "SKU-2"}
+        ])
+
+        self.config = {
+            "ERP_DATA_FILE": self.erp_file,
+            "ESHOP_DATA_FILE": self.shop_a,
+            "OUTPUT_FILE": os.path.join(self.dir, "output.json"),
+            "LOG_FILE": os.path.join(self.dir, "sync.log"),
+            "ERP_IDENTIFIER_FIELD": "ItemSku",
+            "ESHOP_IDENTIFIER_FIELD": "sku",
+            "FIELD_MAPPINGS": {"ItemName": "name", "ItemPrice": "price", "ItemStock": "stock"},
+            "VALIDATION_RULES": {
+                "required_fields": ["id", "sku"],
+                "positive_fields": ["price"],
+                "non_null_fields": ["stock"]
+            },
+            "CHANNELS": [
+                {"name": "shop-a"},
+                {
+                    "name": "shop-b",
+                    "ESHOP_DATA_FILE": self.shop_b,
+                    "FIELD_MAPPINGS": {"ItemName": "title", "ItemPrice": "cost"},
+                    "VALIDATION_RULES": {"required_fields": ["id", "sku"]}
+                }
+            ]
+        }
+
+    def write(self, name, products):
+        path = os.path.join(self.dir, name)
+        with open(path, "w") as f:
+            json.dump({"products": products}, f)
+        return path
+
+    def read_output(self, channel):
+        with open(os.path.join(self.dir, f"output.{channel}.json")) as f:
+            return json.load(f)
+
+    def test_channel_config(self):
+        """Test channel settings override the top level and files get the channel name"""
+        config = channel_config(dict(self.config, ERROR_REPORT_FILE="errors.jsonl"), self.config["CHANNELS"][1])
+
+        self.assertEqual(config["ESHOP_DATA_FILE"], self.shop_b)
+        self.assertEqual(config["FIELD_MAPPINGS"], {"ItemName": "title", "ItemPrice": "cost"})
+        self.assertEqual(config["OUTPUT_FILE"], os.path.join(self.dir, "output.shop-b.json"))
+        self.assertEqual(config["ERROR_REPORT_FILE"], "errors.shop-b.jsonl")
+        self.assertNotIn("CHANNELS", config)
+
+        with self.assertRaises(ValueError):
+            channel_config(self.config, {"name": "shop-c", "ERP_DATA_FILE": "other.json"})
+        with self.assertRaises(ValueError):
+            channel_config(self.config, {"name": "../shop"})
+
+    def test_run_loads_erp_once(self):
+        """Test the ERP file is loaded once and each channel is synced with its own mappings and rules"""
+        sync = MultiChannelSync(self.config)
+
+        with patch.object(DataLoader, "load_erp_products", autospec=True,
+                          side_effect=DataLoader.load_erp_products) as load_erp_products:
+            counts = sync.run()
+
+        self.assertEqual(load_erp_products.call_count, 1)
+        self.assertEqual(counts, {"shop-a": 1, "shop-b": 1})
+        self.assertEqual(self.read_output("shop-a"),
+                         [{"id": 1, "sku": "SKU-1", "name": "Laptop", "price": 999.99, "stock": 5}])
+        self.assertEqual(self.read_output("shop-b"), [{"id": 7, "sku": "SKU-2", "title": "Mouse", "cost": 0.0}])
+        self.assertEqual(sync.syncs["shop-a"].stats["failed_validation"], 1)
+        with open(os.path.join(self.dir, "sync.shop-a.log")) as f:
+            self.assertIn("Product with Eshop ID 2", f.read())
+        self.assertFalse(os.path.exists(os.path.join(self.dir, "sync.shop-b.log")))
+
+    def test_shared_output_file_rejected(self):
+        """Test two channels cannot write the same file"""
+        self.config["CHANNELS"][1]["OUTPUT_FILE"] = os.path.join(self.dir, "output.shop-a.json")
+
+        with self.assertRaises(ValueError):
+            MultiChannelSync(self.config)
+
+    def test_failing_channel_does_not_stop_others(self):
+        """Test a channel with a missing Eshop file fails after the other channels are written"""
+        self.config["CHANNELS"][0]["ESHOP_DATA_FILE"] = os.path.join(self.dir, "missing.json")
+        sync = MultiChannelSync(self.config)
+
+        with self.assertRaises(FileNotFoundError):
+            sync.run()
+
+        self.assertEqual(list(sync.failures), ["shop-a"])
+        self.assertEqual(len(self.read_output("shop-b")), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,210 @@
+"""
+Unit tests for the watch mode sync daemon
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import threading
+import time
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.daemon import SyncDaemon
+from src.product_sync import ProductSync
+from src.sinks import SinkError
+
+
+class TestSyncDaemon(unittest.TestCase):
+    """Test cases for SyncDaemon"""
+    
+    def setUp(self):
+        """Write ERP and Eshop files for three products"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        path = lambda name: os.path.join(self.tmpdir.name, name)
+        
+        self.config = {
+            "ERP_DATA_FILE": path("erp.json"),
+            "ESHOP_DATA_FILE": path("eshop.json"),
+            "OUTPUT_FILE": path("out.json"),
+            "LOG_FILE": path("sync.log"),
+            "ERP_IDENTIFIER_FIELD": "ItemSku",
+            "ESHOP_IDENTIFIER_FIELD": "sku",
+            "FIELD_MAPPINGS": {"ItemPrice": "price", "ItemStock": "stock"},
+            "VALIDATION_RULES": {
+                "required_fields": ["id", "sku"],
+                "positive_fields": ["price"],
+                "non_null_fields": ["stock"]
+            },
+            "WATCH_INTERVAL": 0.05,
+            "WATCH_DEBOUNCE": 0.02
+        }
+        self.erp_products = [
+            {"ItemSku": f"SKU-{i}", "ItemPrice": f"{i + 1}0.00", "ItemStock": str(i)} for i in range(3)
+        ]
+        self.eshop_products = [
+            {"id": i + 1, "sku": f"SKU-{i}", "price": 1.0, "stock": 0} for i in range(3)
+        ]
+        self.write_erp()
+        self.write_json(self.config["ESHOP_DATA_FILE"], self.eshop_products)
+        
+        self.daemon = SyncDaemon(ProductSync(self.config))
+        self.addCleanup(self.daemon.close)
+    
+    def write_json(self, file_path, products):
+        with open(file_path, 'w') as f:
+            json.dump({"products": products}, f)
+    
+    def write_erp(self):
+        self.write_json(self.config["ERP_DATA_FILE"], self.erp_products)
+    
+    def read_output(self):
+        with open(self.config["OUTPUT_FILE"], 'r') as f:
+            return json.load(f)
+    
+    def test_first_run_is_full(self):
+        """Test the first run syncs every product"""
+        count = self.daemon.run_once()
+        
+        self.assertEqual(count, 3)
+        self.assertEqual(self.daemon.sync.stats["resynced"], 3)
+        self.assertEqual([p["price"] for p in self.read_output()], [10.0, 20.0, 30.0])
+    
+    def test_incremental_run_resyncs_changed_products_only(self):
+        """Test only changed ERP products are re-synced while the output stays complete"""
+        self.daemon.run_once()
+        
+        self.erp_products[1]["ItemPrice"] = "25.00"
+        self.write_erp()
+        count = self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["resynced"], 1)
+        self.assertEqual(count, 3)
+        self.assertEqual([p["price"] for p in self.read_output()], [10.0, 25.0, 30.0])
+    
+    def test_cast_failures_are_counted_per_run(self):
+        """Test cast failures of earlier runs are not reported again"""
+        self.erp_products[0]["ItemStock"] = "many"
+        self.write_erp()
+        with self.assertLogs(level="WARNING"):
+            self.daemon.run_once()
+        self.assertEqual(self.daemon.sync.stats["cast_failures"], {"stock": 1})
+        
+        self.erp_products[1]["ItemPrice"] = "25.00"
+        self.write_erp()
+        self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["cast_failures"], {})
+    
+    def test_custom_identifier_field(self):
+        """Test products keep their output slot when ESHOP_IDENTIFIER_FIELD is not sku"""
+        for product in self.eshop_products:
+            product["code"] = product.pop("sku")
+        self.write_json(self.config["ESHOP_DATA_FILE"], self.eshop_products)
+        config = dict(self.config, ESHOP_IDENTIFIER_FIELD="code",
+                      VALIDATION_RULES=dict(self.config["VALIDATION_RULES"], required_fields=["id", "code"]))
+        daemon = SyncDaemon(ProductSync(config))
+        self.addCleanup(daemon.close)
+        daemon.run_once()
+        
+        self.erp_products[1]["ItemPrice"] = "25.00"
+        self.write_erp()
+        count = daemon.run_once()
+        
+        self.assertEqual(daemon.sync.stats["resynced"], 1)
+        self.assertEqual(count, 3)
+        self.assertEqual([p["code"] for p in self.read_output()], ["SKU-0", "SKU-1", "SKU-2"])
+        self.assertEqual([p["price"] for p in self.read_output()], [10.0, 25.0, 30.0])
+    
+    def test_removed_erp_product_is_dropped(self):
+        """Test an ERP product removed from the file is no longer synced"""
+        self.daemon.run_once()
+        
+        del self.erp_products[2]
+        self.write_erp()
+        with self.assertLogs(level="WARNING"):
+            self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["missing_in_erp"], 1)
+        self.assertEqual([p["sku"] for p in self.read_output()], ["SKU-0", "SKU-1"])
+    
+    def test_invalid_change_is_dropped(self):
+        """Test a product that becomes invalid is removed from the output"""
+        self.daemon.run_once()
+        
+        self.erp_products[0]["ItemPrice"] = "-5"
+        self.write_erp()
+        self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["failed_validation"], 1)
+        self.assertEqual([p["sku"] for p in self.read_output()], ["SKU-1", "SKU-2"])
+    
+    def test_eshop_change_triggers_full_sync(self):
+        """Test the Eshop file is reloaded when it changes"""
+        self.daemon.run_once()
+        
+        self.eshop_products.append({"id": 4, "sku": "SKU-0", "price": 1.0, "stock": 0})
+        self.write_json(self.config["ESHOP_DATA_FILE"], self.eshop_products)
+        # Make sure the signature differs on filesystems with coarse timestamps
+        os.utime(self.config["ESHOP_DATA_FILE"], ns=(0, 10 ** 9))
+        self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["resynced"], 4)
+        self.assertEqual(len(self.read_output()), 4)
+    
+    def test_invalid_erp_file_keeps_previous_state(self):
+        """Test an unreadable ERP file is reported and the previous state kept"""
+        self.daemon.run_once()
+        
+        with open(self.config["ERP_DATA_FILE"], 'w') as f:
+            f.write("{not json")
+        with self.assertRaises(json.JSONDecodeError), self.assertLogs(level="ERROR"):
+            self.daemon.run_once()
+        
+        self.write_erp()
+        self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["resynced"], 0)
+        self.assertEqual(len(self.read_output()), 3)
+    
+    def test_failed_write_forces_full_sync(self):
+        """Test the run after a failed write re-syncs everything"""
+        self.daemon.run_once()
+        
+        self.erp_products[0]["ItemPrice"] = "11.00"
+        self.write_erp()
+        with patch.object(self.daemon, "_write", side_effect=SinkError("HTTP 500")):
+            with self.assertRaises(SinkError):
+                self.daemon.run_once()
+        self.daemon.run_once()
+        
+        self.assertEqual(self.daemon.sync.stats["resynced"], 3)
+        self.assertEqual(self.read_output()[0]["price"], 11.0)
+    
+    def test_run_resyncs_on_file_change(self):
+        """Test run() picks up a changed ERP file and stops when asked"""
+        thread = threading.Thread(target=self.daemon.run)
+        thread.start()
+        self.addCleanup(thread.join)
+        
+        deadline = time.monotonic() + 5
+        while self.daemon.runs < 1 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        
+        self.erp_products[2]["ItemStock"] = "99"
+        self.write_erp()
+        while self.daemon.runs < 2 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.daemon.stop()
+        thread.join(timeout=5)
+        
+        self.assertEqual(self.daemon.runs, 2)
+        self.assertEqual(self.read_output()[2]["stock"], 99)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -105,6 +105,51 @@ class TestDataLoader(unittest.TestCase):
         finally:
             os.unlink(temp_file)
     
+    def test_iter_erp_products_success(self):
+        """Test streaming of ERP products"""
+        data = {"meta": {"page": 1}, "products": self.valid_erp_data["products"] * 3}
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            json.dump(data, f)
+            temp_file = f.name
+        
+        try:
+            products = list(self.loader.iter_erp_products(temp_file, chunk_size=16))
+            self.assertEqual(products, data["products"])
+        finally:
+            os.unlink(temp_file)
+    
+    def test_iter_erp_products_file_not_found(self):
+        """Test streaming of a missing ERP file"""
+        with self.assertRaises(FileNotFoundError):
+            list(self.loader.iter_erp_products("nonexistent_file.json"))
+    
+    def test_iter_erp_products_invalid_json(self):
+        """Test streaming of invalid JSON in ERP file"""
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+            f.write('{"invalid": json}')
+            temp_file = f.name
+        
+        try:
+            with self.assertRaises(json.JSONDecodeError):
+                list(self.loader.iter_erp_products(temp_file))
+        finally:
+            os.unlink(temp_file)
+    
+    def test_iter_eshop_products_empty_products(self):
+        """Test streaming of empty or missing products arrays"""
+        for data in ({"products": []}, {"items": [1]}, {"products": None}):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+                json.dump(data, f)
+                temp_file = f.name
+            
+            try:
+                with self.assertRaises(ValueError) as context:
+                    list(self.loader.iter_eshop_products(temp_file))
+                self.assertIn("No products found in Eshop response", str(context.exception))
+            finally:
+                os.unlink(temp_file)
+    
     def test_get_field_types_success(self):
         """Test successful field type extraction"""
         products = [
@@ -122,6 +167,18 @@ class TestDataLoader(unittest.TestCase):
         
         self.assertEqual(field_types, expected_types)
     
+    def test_get_field_types_reconciles_sample(self):
+        """Test types are inferred over all given products, not just the first"""
+        products = [
+            {"sku": "A", "price": 10, "stock": None},
+            {"sku": "B", "price": 10.5, "stock": 3}
+        ]
+        
+        field_types = self.loader.get_field_types(products)
+        
+        self.assertEqual(field_types, {"sku": "str", "price": "float", "stock": "int"})
+        self.assertEqual(field_types.nullable, {"stock"})
+    
     def test_get_field_types_empty_products(self):
         """Test handling of empty products list"""
         with self.assertRaises(ValueError) as context:
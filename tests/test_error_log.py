@@ -0,0 +1,94 @@
+"""
+Unit tests for ValidationErrorLog class
+"""
+
+import unittest
+import json
+import tempfile
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.error_log import ValidationErrorLog
+from src.validator import ProductValidator
+
+
+class TestValidationErrorLog(unittest.TestCase):
+    """Test cases for ValidationErrorLog functionality"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.log_file = os.path.join(self.temp_dir.name, "sync.log")
+        self.report_file = os.path.join(self.temp_dir.name, "errors.jsonl")
+        self.timestamp = "15-01-2026 01:00:00"
+        self.product = {"id": 123, "sku": "TEST-001"}
+        self.errors = ["Missing name", "Invalid price: must be greater than 0"]
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def read(self, path):
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+    
+    def test_matches_log_product_errors_format(self):
+        """Test buffered entries match the per-product log format"""
+        legacy_log = os.path.join(self.temp_dir.name, "legacy.log")
+        ProductValidator({}).log_product_errors(self.product, self.errors, self.timestamp, legacy_log)
+        
+        with ValidationErrorLog(self.log_file, self.timestamp) as error_log:
+            error_log.record(self.product, self.errors)
+        
+        self.assertEqual(self.read(self.log_file), self.read(legacy_log))
+    
+    def test_buffers_until_flush_threshold(self):
+        """Test entries are written in batches"""
+        error_log = ValidationErrorLog(self.log_file, self.timestamp, flush_every=3)
+        
+        error_log.record(self.product, self.errors)
+        error_log.record(self.product, self.errors)
+        self.assertFalse(os.path.exists(self.log_file))
+        
+        error_log.record(self.product, self.errors)
+        self.assertEqual(self.read(self.log_file).count("Product with Eshop ID 123"), 3)
+        
+        error_log.record(self.product, self.errors)
+        error_log.close()
+        self.assertEqual(self.read(self.log_file).count("Product with Eshop ID 123"), 4)
+        self.assertEqual(error_log.count, 4)
+    
+    def test_appends_to_existing_log(self):
+        """Test the log file is appended to, not replaced"""
+        with open(self.log_file, "w", encoding="utf-8") as f:
+            f.write("existing\n")
+        
+        with ValidationErrorLog(self.log_file, self.timestamp) as error_log:
+            error_log.record(self.product, self.errors)
+        
+        self.assertTrue(self.read(self.log_file).startswith("existing\n[ERP to Eshop at"))
+    
+    def test_jsonl_report(self):
+        """Test structured JSONL report records"""
+        with ValidationErrorLog(self.log_file, self.timestamp, self.report_file) as error_log:
+            error_log.record(self.product, self.errors)
+            error_log.record({"id": 456, "sku": "TEST-002"}, ("Missing stock",))
+        
+        records = [json.loads(line) for line in self.read(self.report_file).splitlines()]
+        
+        self.assertEqual(records, [
+            {"timestamp": self.timestamp, "id": 123, "sku": "TEST-001", "errors": self.errors},
+            {"timestamp": self.timestamp, "id": 456, "sku": "TEST-002", "errors": ["Missing stock"]}
+        ])
+    
+    def test_no_errors_creates_no_files(self):
+        """Test nothing is written for runs without errors"""
+        with ValidationErrorLog(self.log_file, self.timestamp, self.report_file):
+            pass
+        
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
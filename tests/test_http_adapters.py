@@ -0,0 +1,157 @@
+"""
+Unit tests for the async HTTP source and sink adapters
+"""
+
+import asyncio
+import json
+import unittest
+import os
+import sys
+from datetime import datetime, timezone
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.http_adapters import AsyncHttpClient, HttpErpSource, HttpEshopSink, HttpError, fetch_erp_products, \
+    parse_retry_after
+from tests.stub_server import StubServer
+
+
+def make_products(count):
+    return [{"ItemSku": f"SKU-{i:04d}", "ItemPrice": f"{i + 1}.00"} for i in range(count)]
+
+
+class TestHttpAdapters(unittest.IsolatedAsyncioTestCase):
+    """Test cases for AsyncHttpClient, HttpErpSource and HttpEshopSink"""
+    
+    async def asyncSetUp(self):
+        """Start a stub server for each test"""
+        self.products = make_products(1050)
+        self.server = StubServer(self.products, latency=0.01)
+        await self.server.start()
+        self.client = AsyncHttpClient(self.server.url, max_connections=4)
+    
+    async def asyncTearDown(self):
+        await self.client.close()
+        await self.server.stop()
+    
+    async def test_fetch_products_concurrent_pages(self):
+        """Test all pages are fetched in order with bounded concurrency"""
+        source = HttpErpSource(self.client, page_size=100, max_in_flight=3)
+        
+        products = await source.fetch_products()
+        
+        self.assertEqual(products, self.products)
+        self.assertEqual(self.server.requests, 11)
+        self.assertLessEqual(self.server.max_concurrent, 3)
+        self.assertGreater(self.server.max_concurrent, 1)
+        self.assertLessEqual(self.client.connections_opened, 3)
+    
+    async def test_keep_alive_reuses_connection(self):
+        """Test sequential requests share one pooled connection"""
+        for page in range(1, 6):
+            await self.client.request("GET", "/products", {"page": page, "page_size": 10})
+        
+        self.assertEqual(self.client.connections_opened, 1)
+        self.assertEqual(self.server.connections, 1)
+    
+    async def test_write_products_in_bulk_batches(self):
+        """Test products are sent in concurrent bulk batches"""
+        sink = HttpEshopSink(self.client, batch_size=400, max_in_flight=2)
+        
+        count = await sink.write_products(iter(self.products))
+        
+        self.assertEqual(count, 1050)
+        self.assertEqual(self.server.requests, 3)
+        self.assertEqual(sorted(p["ItemSku"] for p in self.server.received), [p["ItemSku"] for p in self.products])
+    
+    async def test_error_status_raises_http_error(self):
+        """Test error responses raise HttpError with the status"""
+        with self.assertRaises(HttpError) as context:
+            await self.client.request("GET", "/missing")
+        self.assertEqual(context.exception.status, 404)
+    
+    async def test_non_json_error_body_raises_http_error(self):
+        """Test an HTML 5xx body from a proxy raises HttpError with the text"""
+        async def handle(method, path, query, body):
+            return 502, "<html><body>Bad Gateway</body></html>", {}
+        self.server.handle = handle
+        
+        with self.assertRaises(HttpError) as context:
+            await self.client.request("POST", "/products/bulk", json_body={"products": []})
+        self.assertEqual(context.exception.status, 502)
+        self.assertEqual(context.exception.body, "<html><body>Bad Gateway</body></html>")
+        self.assertIsNone(context.exception.retry_after)
+    
+    async def test_http_date_retry_after(self):
+        """Test a Retry-After HTTP-date is turned into seconds"""
+        async def handle(method, path, query, body):
+            return 503, "Service Unavailable", {"Retry-After": "Thu, 01 Jan 2099 00:00:00 GMT"}
+        self.server.handle = handle
+        
+        with self.assertRaises(HttpError) as context:
+            await self.client.request("GET", "/products")
+        self.assertEqual(context.exception.status, 503)
+        self.assertGreater(context.exception.retry_after, 0)
+    
+    def test_parse_retry_after(self):
+        """Test delta-seconds, HTTP-dates and unparsable values"""
+        now = datetime(2026, 10, 21, 7, 0, 0, tzinfo=timezone.utc)
+        
+        self.assertEqual(parse_retry_after("120"), 120.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2026 07:28:00 GMT", now), 1680.0)
+        self.assertEqual(parse_retry_after("Wed, 21 Oct 2026 06:00:00 GMT", now), 0.0)
+        self.assertIsNone(parse_retry_after("soon"))
+        self.assertIsNone(parse_retry_after("nan"))
+        self.assertIsNone(parse_retry_after(None))
+    
+    async def test_empty_catalog_raises_value_error(self):
+        """Test an empty ERP response raises the loader's error"""
+        self.server.products = []
+        
+        with self.assertRaises(ValueError) as context:
+            await HttpErpSource(self.client).fetch_products()
+        self.assertIn("No products found in ERP response", str(context.exception))
+    
+    async def test_body_without_length_is_read_until_close(self):
+        """Test a body without Content-Length or chunking ends at connection close"""
+        page = {"products": self.products[:3], "page": 1, "total_pages": 1}
+        
+        async def respond(reader, writer):
+            await reader.readuntil(b"\r\n\r\n")
+            writer.write(b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n\r\n")
+            writer.write(json.dumps(page).encode("utf-8"))
+            await writer.drain()
+            writer.close()
+        
+        server = await asyncio.start_server(respond, "127.0.0.1", 0)
+        client = AsyncHttpClient(f"http://127.0.0.1:{server.sockets[0].getsockname()[1]}")
+        try:
+            products = await HttpErpSource(client).fetch_products()
+            await client.request("GET", "/products")
+            
+            self.assertEqual(products, self.products[:3])
+            # The first connection ended with its body, so a new one was opened
+            self.assertEqual(client.connections_opened, 2)
+        finally:
+            await client.close()
+            server.close()
+            await server.wait_closed()
+
+
+class TestFetchErpProducts(unittest.TestCase):
+    """Test cases for the blocking fetch wrapper"""
+    
+    def test_fetch_erp_products(self):
+        """Test blocking fetch against a stub running in a background thread"""
+        server = StubServer(make_products(25))
+        server.start_in_thread()
+        try:
+            products = fetch_erp_products(server.url, page_size=10, max_in_flight=2)
+        finally:
+            server.stop_in_thread()
+        
+        self.assertEqual(products, make_products(25))
+
+
+if __name__ == '__main__':
+    unittest.main()
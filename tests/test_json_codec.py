@@ -0,0 +1,108 @@
+"""
+Unit tests for the JSON codec backends
+"""
+
+import unittest
+import io
+import json
+import math
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src import json_codec
+from src.json_codec import JsonCodec, get_codec, set_backend
+from src.money import Money
+from src.records import json_default, record_type
+
+
+def installed_codecs():
+    """Codecs of every installed backend"""
+    codecs = []
+    for backend in json_codec.BACKENDS:
+        try:
+            codecs.append(get_codec(backend))
+        except ValueError:
+            pass
+    return codecs
+
+
+class TestJsonCodec(unittest.TestCase):
+    """Test cases for JSON codecs matching the standard library"""
+
+    def setUp(self):
+        """Set up values covering the formats the project writes"""
+        self.products = [
+            {"id": 1, "name": "Ώρα Café   \"quoted\" / \\ \x00", "price": 150.0, "sku": "A-1",
+             "stock": 25, "active": True, "note": None},
+            {"sku": "B-2", "price": -0.5, "tags": [], "meta": {}, "changes": {"price": {"old": 1.25, "new": 2}}},
+            []
+        ]
+
+    def tearDown(self):
+        """Restore the default backend"""
+        set_backend("auto")
+
+    def test_output_matches_standard_library(self):
+        """Test every backend writes the same text as json.dumps"""
+        for codec in installed_codecs():
+            for value in self.products:
+                with self.subTest(backend=codec.name, value=value):
+                    self.assertEqual(codec.dumps(value), json.dumps(value, ensure_ascii=False))
+                    self.assertEqual(codec.dumps(value, compact=True),
+                                     json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+                    self.assertEqual(codec.dumps(value, indent=4), json.dumps(value, ensure_ascii=False, indent=4))
+                    self.assertEqual(codec.dumps(value, indent=3), json.dumps(value, ensure_ascii=False, indent=3))
+                    self.assertEqual(codec.dumps({"b": 1, "a": 2}, compact=True, sort_keys=True), '{"a":2,"b":1}')
+
+    def test_default_hook(self):
+        """Test the default hook serializes records and Money amounts"""
+        record = record_type(("sku", "price")).from_mapping({"sku": "A-1", "price": Money.parse("32.10")})
+        for codec in installed_codecs():
+            with self.subTest(backend=codec.name):
+                self.assertEqual(codec.dumps([record], compact=True, default=json_default), '[{"sku":"A-1","price":32.1}]')
+                with self.assertRaises(TypeError):
+                    codec.dumps({"value": object()}, compact=True)
+
+    def test_unsupported_values_fall_back(self):
+        """Test values a backend rejects are written by the standard library"""
+        values = [{"big": 2 ** 70}, {"surrogate": "\ud800"}, {1: "non-string key"}]
+        for codec in installed_codecs():
+            for value in values:
+                with self.subTest(backend=codec.name, value=value):
+                    self.assertEqual(codec.dumps(value, compact=True),
+                                     json.dumps(value, ensure_ascii=False, separators=(",", ":")))
+
+    def test_loads(self):
+        """Test every backend decodes text, bytes and files alike"""
+        document = json.dumps({"products": self.products}, ensure_ascii=False)
+        for codec in installed_codecs():
+            with self.subTest(backend=codec.name):
+                self.assertEqual(codec.loads(document), {"products": self.products})
+                self.assertEqual(codec.loads(document.encode("utf-8")), {"products": self.products})
+                self.assertEqual(codec.load(io.BytesIO(document.encode("utf-8"))), {"products": self.products})
+                self.assertTrue(math.isnan(codec.loads("[NaN]")[0]))
+
+    def test_loads_invalid_json(self):
+        """Test invalid documents raise json.JSONDecodeError with every backend"""
+        for codec in installed_codecs():
+            with self.subTest(backend=codec.name):
+                with self.assertRaises(json.JSONDecodeError):
+                    codec.loads(b'{"products": [1,')
+
+    def test_set_backend(self):
+        """Test selecting backends for the module-level functions"""
+        self.assertIsInstance(set_backend("json"), JsonCodec)
+        self.assertEqual(json_codec.backend(), "json")
+        self.assertEqual(json_codec.dumps({"a": [1, 2]}, compact=True), '{"a":[1,2]}')
+
+        with self.assertRaises(ValueError):
+            set_backend("simplejson")
+        self.assertEqual(json_codec.backend(), "json")
+
+        self.assertEqual(set_backend("auto").name, installed_codecs()[0].name)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,66 @@
+"""
+Unit tests for incremental JSON array parsing
+"""
+
+import unittest
+import json
+import io
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.json_stream import iter_json_array
+
+
+class TestIterJsonArray(unittest.TestCase):
+    """Test cases for iter_json_array"""
+    
+    def parse(self, text, chunk_size=4):
+        return list(iter_json_array(io.StringIO(text), "products", chunk_size))
+    
+    def test_matches_json_load(self):
+        """Test items match json.load for every chunk size"""
+        document = {
+            "count": 3,
+            "products": [
+                {"sku": "A", "price": 12345.678, "tags": ["x", "y"]},
+                {"sku": "B", "name": "Café \"quoted\"", "stock": 1000000},
+                {"sku": "C", "active": True, "parent": None}
+            ],
+            "next": None
+        }
+        text = json.dumps(document, indent=2, ensure_ascii=False)
+        
+        for chunk_size in (1, 3, 7, 64, 4096):
+            self.assertEqual(self.parse(text, chunk_size), document["products"])
+    
+    def test_numbers_split_across_chunks(self):
+        """Test top-level numbers are not truncated at chunk boundaries"""
+        self.assertEqual(self.parse('{"products": [123456789, 2.5e10]}', chunk_size=2), [123456789, 2.5e10])
+    
+    def test_empty_array(self):
+        """Test an empty array yields nothing"""
+        self.assertEqual(self.parse('{"products": []}'), [])
+    
+    def test_missing_key(self):
+        """Test a missing key raises KeyError"""
+        with self.assertRaises(KeyError):
+            self.parse('{"items": [1, 2]}')
+        with self.assertRaises(KeyError):
+            self.parse('{}')
+    
+    def test_not_an_array(self):
+        """Test a non-array value raises TypeError"""
+        with self.assertRaises(TypeError):
+            self.parse('{"products": {"sku": "A"}}')
+    
+    def test_invalid_json(self):
+        """Test malformed documents raise JSONDecodeError"""
+        for text in ('[1, 2]', '{"products": [1, 2', '{"products": [1 2]}', '{"products": [1]} x', ''):
+            with self.assertRaises(json.JSONDecodeError):
+                self.parse(text)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+"""
+Unit tests for sync run metrics
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.metrics import SyncMetrics, peak_rss_bytes
+
+
+def spin(seconds):
+    """Burn CPU for the given wall time"""
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class TestSyncMetrics(unittest.TestCase):
+    """Test cases for SyncMetrics"""
+    
+    def test_stage_records_wall_and_cpu(self):
+        """Test a stage block records both clocks"""
+        metrics = SyncMetrics()
+        
+        with metrics.stage("load_erp"):
+            spin(0.02)
+        
+        wall, cpu = metrics.stages["load_erp"]
+        self.assertGreaterEqual(wall, 0.02)
+        self.assertGreater(cpu, 0.01)
+    
+    def test_nested_stage_is_carved_out(self):
+        """Test time recorded inside a block is not counted twice"""
+        metrics = SyncMetrics()
+        
+        with metrics.stage("match"):
+            spin(0.01)
+            with metrics.stage("write"):
+                spin(0.03)
+        
+        self.assertGreaterEqual(metrics.stages["write"][0], 0.03)
+        self.assertLess(metrics.stages["match"][0], 0.03)
+    
+    def test_wall_only_stages_get_cpu_share(self):
+        """Test per-item wall time receives its share of the block's CPU time"""
+        metrics = SyncMetrics()
+        
+        with metrics.stage("match"):
+            start = time.perf_counter()
+            spin(0.03)
+            metrics.add_wall("map", time.perf_counter() - start)
+            spin(0.01)
+        
+        map_wall, map_cpu = metrics.stages["map"]
+        match_wall, match_cpu = metrics.stages["match"]
+        self.assertGreater(map_cpu, match_cpu)
+        self.assertAlmostEqual(map_cpu / map_wall, match_cpu / match_wall, places=6)
+    
+    def test_timed_iterator(self):
+        """Test time spent producing items is recorded when the iterator ends"""
+        metrics = SyncMetrics()
+        
+        def slow_items():
+            for i in range(3):
+                spin(0.005)
+                yield i
+        
+        with metrics.stage("index_build"):
+            self.assertEqual(list(metrics.timed(slow_items(), "load_erp")), [0, 1, 2])
+        
+        self.assertGreaterEqual(metrics.stages["load_erp"][0], 0.015)
+    
+    def test_merge_does_not_carve(self):
+        """Test stage times from other processes are added as reported"""
+        metrics = SyncMetrics()
+        
+        with metrics.stage("match"):
+            metrics.merge({"map": {"wall_seconds": 5.0, "cpu_seconds": 4.0}})
+        
+        self.assertEqual(metrics.stages["map"], [5.0, 4.0])
+        self.assertLess(metrics.stages["match"][0], 5.0)
+    
+    def test_report(self):
+        """Test the JSON report lists stages in pipeline order with throughput"""
+        metrics = SyncMetrics()
+        metrics.add("write", 0.5, 0.4)
+        metrics.add("load_erp", 0.1, 0.1)
+        metrics.rows = 100
+        metrics.finish()
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            report_file = os.path.join(tmpdir, "report.json")
+            metrics.write_report(report_file, {"stats": {"missing_in_erp": 1}})
+            with open(report_file, 'r') as f:
+                report = json.load(f)
+        
+        self.assertEqual(list(report["stages"]), ["load_erp", "write"])
+        self.assertEqual(report["stats"], {"missing_in_erp": 1})
+        self.assertEqual(report["rows"], 100)
+        self.assertGreater(report["rows_per_sec"], 0)
+        self.assertIn("rows/sec", metrics.summary())
+    
+    def test_peak_rss(self):
+        """Test peak RSS is reported in bytes where available"""
+        rss = peak_rss_bytes()
+        if rss is not None:
+            self.assertGreater(rss, 1024 * 1024)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,125 @@
+"""
+Unit tests for the Money type
+"""
+
+import unittest
+import json
+import os
+import pickle
+import sys
+from decimal import Decimal
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.money import Money, parse_minor_units, json_default
+
+
+class TestParseMinorUnits(unittest.TestCase):
+    """Test cases for parse_minor_units"""
+    
+    def test_plain_strings(self):
+        """Test ERP price strings parse to exact minor units"""
+        cases = {"600": 60000, "32.00": 3200, "0.29": 29, "-1.5": -150, ".5": 50,
+                 "5.": 500, "+7": 700, " 12.30 ": 1230, "-.05": -5}
+        for text, minor in cases.items():
+            with self.subTest(text=text):
+                self.assertEqual(parse_minor_units(text), minor)
+    
+    def test_slow_path_rounds_half_up(self):
+        """Test exponents and extra decimal places go through Decimal"""
+        self.assertEqual(parse_minor_units("1e3"), 100000)
+        self.assertEqual(parse_minor_units("12.345"), 1235)
+        self.assertEqual(parse_minor_units("12.344"), 1234)
+        self.assertEqual(parse_minor_units("-0.005"), -1)
+    
+    def test_other_types(self):
+        """Test ints, floats, Decimals and Money amounts"""
+        self.assertEqual(parse_minor_units(10), 1000)
+        self.assertEqual(parse_minor_units(0.29), 29)
+        self.assertEqual(parse_minor_units(Decimal("1.005")), 101)
+        self.assertEqual(parse_minor_units(Money(150, 1), 2), 1500)
+        self.assertEqual(parse_minor_units("1.234", 3), 1234)
+        self.assertEqual(parse_minor_units("12.5", 0), 13)
+    
+    def test_invalid_values(self):
+        """Test non-numbers raise ValueError and unsupported types TypeError"""
+        for value in ("abc", "", "1.2.34", "nan", "inf", "-", ".", "1. 5", float("nan")):
+            with self.subTest(value=value):
+                with self.assertRaises(ValueError):
+                    parse_minor_units(value)
+        with self.assertRaises(TypeError):
+            parse_minor_units(True)
+        with self.assertRaises(TypeError):
+            parse_minor_units([1])
+
+
+class TestMoney(unittest.TestCase):
+    """Test cases for Money"""
+    
+    def test_str_is_exact(self):
+        """Test amounts print with all decimal places"""
+        self.assertEqual(str(Money.parse("32")), "32.00")
+        self.assertEqual(str(Money.parse("-0.05")), "-0.05")
+        self.assertEqual(str(Money(5, 0)), "5")
+        self.assertEqual(repr(Money.parse("1.5")), "Money('1.50')")
+    
+    def test_compares_with_numbers(self):
+        """Test equality and ordering against ints, floats, Decimals and Money"""
+        price = Money.parse("0.29")
+        
+        self.assertEqual(price, 0.29)
+        self.assertEqual(price, Decimal("0.290"))
+        self.assertEqual(price, Money(290, 3))
+        self.assertEqual(Money.parse("100.00"), 100)
+        self.assertNotEqual(price, 0.3)
+        self.assertNotEqual(Money.parse("1"), True)
+        self.assertNotEqual(price, "0.29")
+        self.assertLess(price, 1)
+        self.assertGreater(price, Money.parse("0.28"))
+        self.assertEqual(hash(price), hash(0.29))
+        self.assertEqual(hash(Money.parse("150")), hash(150))
+    
+    def test_arithmetic(self):
+        """Test adding and subtracting numbers keeps exact Money amounts"""
+        price = Money.parse("10.00")
+        
+        self.assertEqual(price - 7.25, Money.parse("2.75"))
+        self.assertEqual(12.1 - price, Money.parse("2.10"))
+        self.assertEqual(price + Money(5, 1), Money.parse("10.50"))
+        self.assertEqual(3 + price, Money.parse("13.00"))
+        self.assertEqual(-price, Money.parse("-10.00"))
+        self.assertIsInstance(0.1 + price, Money)
+        for other in ("1", True, None, float("nan")):
+            with self.subTest(other=other):
+                with self.assertRaises(TypeError):
+                    price + other
+    
+    def test_numeric_conversions(self):
+        """Test float() and truthiness, which validation relies on"""
+        self.assertEqual(float(Money.parse("150.25")), 150.25)
+        self.assertFalse(Money.parse("0.00"))
+        self.assertTrue(Money.parse("0.01"))
+        self.assertEqual(Money.parse("1.10").to_decimal(), Decimal("1.10"))
+    
+    def test_pickle(self):
+        """Test amounts survive pickling for parallel workers"""
+        price = Money.parse("12.34")
+        
+        restored = pickle.loads(pickle.dumps(price))
+        
+        self.assertEqual(restored.minor, 1234)
+        self.assertEqual(restored.decimals, 2)
+    
+    def test_json_serialization(self):
+        """Test amounts serialize to numbers that read back exactly"""
+        document = json.dumps({"price": Money.parse("32.00"), "cost": Money.parse("0.29")}, default=json_default)
+        
+        self.assertEqual(document, '{"price": 32.0, "cost": 0.29}')
+        self.assertEqual(json.loads(document, parse_float=Decimal)["cost"], Decimal("0.29"))
+        self.assertEqual(Money(10 ** 17).to_json(), "1000000000000000.00")
+        with self.assertRaises(TypeError):
+            json_default(object())
+
+
+if __name__ == '__main__':
+    unittest.main()
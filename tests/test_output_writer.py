@@ -0,0 +1,116 @@
+"""
+Unit tests for SyncedProductWriter class
+"""
+
+import unittest
+import json
+import tempfile
+import os
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src import json_codec
+from src.output_writer import SyncedProductWriter, OutputWriteError
+
+
+class TestSyncedProductWriter(unittest.TestCase):
+    """Test cases for SyncedProductWriter functionality"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.output_file = os.path.join(self.temp_dir.name, "output.json")
+        self.products = [
+            {"id": 1, "sku": "TEST-001", "name": "Café", "price": 10.5, "tags": ["a", "b"]},
+            {"id": 2, "sku": "TEST-002", "name": "Mouse", "price": 20.0, "stock": None}
+        ]
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def write(self, products, **kwargs):
+        with SyncedProductWriter(self.output_file, **kwargs) as writer:
+            for product in products:
+                writer.write(product)
+        with open(self.output_file, "r", encoding="utf-8") as f:
+            return f.read()
+    
+    def test_json_matches_json_dump(self):
+        """Test default output is byte-identical to json.dump with indent=4"""
+        for products in (self.products, self.products[:1], []):
+            expected = json.dumps(products, indent=4, ensure_ascii=False)
+            self.assertEqual(self.write(products), expected)
+    
+    def test_json_batches_match_json_dump(self):
+        """Test indented output spanning several encoding batches matches json.dump with every backend"""
+        products = [dict(self.products[i % 2], id=i) for i in range(7)]
+        expected = json.dumps(products, indent=4, ensure_ascii=False)
+        previous = json_codec.backend()
+        self.addCleanup(json_codec.set_backend, previous)
+        
+        for backend in ("json", previous):
+            json_codec.set_backend(backend)
+            for batch_size in (1, 3, 7):
+                with patch("src.output_writer.INDENT_BATCH_SIZE", batch_size):
+                    self.assertEqual(self.write(products), expected)
+    
+    def test_json_compact(self):
+        """Test compact JSON array output"""
+        content = self.write(self.products, compact=True)
+        
+        self.assertEqual(content, json.dumps(self.products, ensure_ascii=False, separators=(",", ":")))
+        self.assertEqual(self.write([], compact=True), "[]")
+    
+    def test_ndjson(self):
+        """Test NDJSON output has one record per line"""
+        for compact in (False, True):
+            lines = self.write(self.products, output_format="ndjson", compact=compact).splitlines()
+            self.assertEqual([json.loads(line) for line in lines], self.products)
+    
+    def test_failure_keeps_previous_output(self):
+        """Test an error mid-write leaves the existing file untouched and no temp files"""
+        with open(self.output_file, "w") as f:
+            f.write("previous")
+        
+        with self.assertRaises(RuntimeError):
+            with SyncedProductWriter(self.output_file) as writer:
+                writer.write(self.products[0])
+                raise RuntimeError("crash")
+        
+        with open(self.output_file) as f:
+            self.assertEqual(f.read(), "previous")
+        self.assertEqual(os.listdir(self.temp_dir.name), ["output.json"])
+    
+    def test_unserializable_record(self):
+        """Test unserializable records raise OutputWriteError"""
+        with self.assertRaises(OutputWriteError):
+            self.write([{"id": object()}])
+        self.assertFalse(os.path.exists(self.output_file))
+    
+    def test_invalid_directory(self):
+        """Test an unwritable location raises OutputWriteError"""
+        writer = SyncedProductWriter("/invalid/path/output.json")
+        
+        with self.assertRaises(OutputWriteError):
+            writer.open()
+    
+    def test_file_mode_leaves_umask_alone(self):
+        """Test output files get the umask's mode without the umask being changed"""
+        umask = os.umask(0o022)
+        self.addCleanup(os.umask, umask)
+        
+        with patch('os.umask') as set_umask:
+            self.write(self.products)
+            set_umask.assert_not_called()
+        self.assertEqual(os.stat(self.output_file).st_mode & 0o777, 0o666 & ~umask)
+    
+    def test_invalid_format(self):
+        """Test unsupported formats are rejected"""
+        with self.assertRaises(ValueError):
+            SyncedProductWriter(self.output_file, output_format="xml")
+
+
+if __name__ == '__main__':
+    unittest.main()
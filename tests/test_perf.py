@@ -0,0 +1,231 @@
+"""
+Performance regression tests against a committed baseline
+
+Opt-in: run with ``python3 run_tests.py --perf`` or RUN_PERF_TESTS=1. Record a
+new baseline after an intended change with ``python3 run_tests.py --perf
+--update-baseline test_perf`` and commit tests/perf_baseline.json.
+"""
+
+import unittest
+import gc
+import json
+import logging
+import os
+import tempfile
+import time
+import tracemalloc
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from benchmarks.catalog_generator import (
+    write_catalog, FIELD_MAPPINGS, VALIDATION_RULES, ERP_IDENTIFIER_FIELD, ESHOP_IDENTIFIER_FIELD
+)
+from src.data_loader import DataLoader
+from src.field_mapper import FieldMapper
+from src.product_sync import ProductSync
+from src.validator import ProductValidator
+
+RUN_PERF_TESTS = os.environ.get("RUN_PERF_TESTS") == "1"
+UPDATE_BASELINE = os.environ.get("PERF_UPDATE_BASELINE") == "1"
+BASELINE_FILE = os.path.join(os.path.dirname(__file__), "perf_baseline.json")
+
+# Used when recording a baseline for the first time
+DEFAULT_BASELINE = {
+    "rows": 20000,
+    "repeat": 5,
+    "tolerances": {
+        # Allowed drop of relative throughput and growth of peak memory
+        "throughput": 0.30,
+        "memory": 0.15,
+        # Allowed growth of time per row when the catalog grows scaling_factor times
+        "scaling": 2.0
+    },
+    "scaling_factor": 4,
+    "benchmarks": {}
+}
+
+CALIBRATION_OPS = 50000
+
+
+def calibration_seconds():
+    """Wall time of a fixed dict, string and float workload"""
+    start = time.perf_counter()
+    for i in range(CALIBRATION_OPS):
+        product = {"sku": f"SKU-{i}", "price": str(i)}
+        float(product["price"])
+    return time.perf_counter() - start
+
+
+def measure(repeat, rows, function):
+    """Measure throughput relative to the calibration workload
+
+    The calibration workload runs right before every repetition, so both see
+    the same CPU speed (frequency scaling, noisy neighbours) and their ratio
+    holds across machines. The best repetition counts.
+
+    Returns:
+        Tuple of (relative throughput, rows per second of the best repetition)
+    """
+    best = (0.0, 0.0)
+    for _ in range(repeat):
+        gc.collect()
+        calibration = calibration_seconds()
+        start = time.perf_counter()
+        function()
+        rows_per_sec = rows / (time.perf_counter() - start)
+        best = max(best, (rows_per_sec / (CALIBRATION_OPS / calibration), rows_per_sec))
+    return best
+
+
+def sync_config(erp_file, eshop_file, output_dir):
+    """ProductSync configuration for a generated catalog"""
+    return {
+        "ERP_DATA_FILE": erp_file,
+        "ESHOP_DATA_FILE": eshop_file,
+        "OUTPUT_FILE": os.path.join(output_dir, "output.json"),
+        "LOG_FILE": os.devnull,
+        "ERP_IDENTIFIER_FIELD": ERP_IDENTIFIER_FIELD,
+        "ESHOP_IDENTIFIER_FIELD": ESHOP_IDENTIFIER_FIELD,
+        "FIELD_MAPPINGS": FIELD_MAPPINGS,
+        "VALIDATION_RULES": VALIDATION_RULES
+    }
+
+
+@unittest.skipUnless(RUN_PERF_TESTS or UPDATE_BASELINE,
+                     "performance tests run with RUN_PERF_TESTS=1 or run_tests.py --perf")
+class TestPerformance(unittest.TestCase):
+    """Throughput and memory of the sync pipeline against tests/perf_baseline.json"""
+
+    @classmethod
+    def setUpClass(cls):
+        """Load the baseline and generate the catalog"""
+        try:
+            with open(BASELINE_FILE, "r", encoding="utf-8") as f:
+                cls.baseline = json.load(f)
+        except FileNotFoundError:
+            if not UPDATE_BASELINE:
+                raise
+            cls.baseline = json.loads(json.dumps(DEFAULT_BASELINE))
+
+        # Validation failures are logged for every invalid generated product
+        logging.disable(logging.CRITICAL)
+        cls.tmpdir = tempfile.TemporaryDirectory()
+        cls.rows = cls.baseline["rows"]
+        cls.repeat = cls.baseline["repeat"]
+        cls.erp_file, cls.eshop_file = write_catalog(os.path.join(cls.tmpdir.name, "catalog"), cls.rows)
+        cls.measured = {}
+
+    @classmethod
+    def tearDownClass(cls):
+        """Write the new baseline when recording one"""
+        logging.disable(logging.NOTSET)
+        cls.tmpdir.cleanup()
+        if UPDATE_BASELINE:
+            for benchmark, metrics in cls.measured.items():
+                cls.baseline["benchmarks"].setdefault(benchmark, {}).update(metrics)
+            with open(BASELINE_FILE, "w", encoding="utf-8") as f:
+                json.dump(cls.baseline, f, indent=4)
+                f.write("\n")
+
+    def check(self, benchmark, metric, value, note=""):
+        """Compare a measurement with the baseline, or record it when updating
+
+        ``relative_throughput`` must not drop by more than the throughput
+        tolerance and ``peak_bytes_per_row`` must not grow by more than the
+        memory tolerance.
+        """
+        if UPDATE_BASELINE:
+            self.measured.setdefault(benchmark, {})[metric] = round(value, 4)
+            return
+
+        expected = self.baseline["benchmarks"].get(benchmark, {}).get(metric)
+        if expected is None:
+            self.fail(f"No baseline for {benchmark}.{metric} in {BASELINE_FILE}; record one with "
+                      f"run_tests.py --perf --update-baseline test_perf")
+
+        tolerances = self.baseline["tolerances"]
+        change = value / expected - 1
+        if metric == "relative_throughput":
+            allowed = -tolerances["throughput"]
+            regressed = change < allowed
+        else:
+            allowed = tolerances["memory"]
+            regressed = change > allowed
+        if regressed:
+            self.fail(
+                f"\nPerformance regression against {os.path.basename(BASELINE_FILE)} ({self.rows:,} rows):\n"
+                f"  {'benchmark':<16} {'metric':<20} {'baseline':>12} {'measured':>12} {'change':>8} {'allowed':>8}\n"
+                f"  {benchmark:<16} {metric:<20} {expected:>12,.4f} {value:>12,.4f} {change:>+8.1%} {allowed:>+8.0%}\n"
+                + (f"  {note}\n" if note else "")
+            )
+
+    def check_throughput(self, benchmark, rows, function):
+        relative, rows_per_sec = measure(self.repeat, rows, function)
+        self.check(benchmark, "relative_throughput", relative, f"({rows_per_sec:,.0f} rows/sec on this machine)")
+
+    def test_data_loader(self):
+        """Test DataLoader throughput on both files"""
+        loader = DataLoader(os.devnull)
+        self.check_throughput("data_loader", self.rows, lambda: (loader.load_erp_products(self.erp_file),
+                                                                 loader.load_eshop_products(self.eshop_file)))
+
+    def test_field_mapper_and_validator(self):
+        """Test FieldMapper and ProductValidator throughput on matched products"""
+        loader = DataLoader(os.devnull)
+        erp_products = loader.load_erp_products(self.erp_file)
+        eshop_products = loader.load_eshop_products(self.eshop_file)
+        erp_index = {}
+        for erp_product in erp_products:
+            erp_index.setdefault(erp_product[ERP_IDENTIFIER_FIELD], erp_product)
+        pairs = [(erp_index[product[ESHOP_IDENTIFIER_FIELD]], product) for product in eshop_products
+                 if product[ESHOP_IDENTIFIER_FIELD] in erp_index]
+        mapper = FieldMapper(FIELD_MAPPINGS, loader.get_field_types(erp_products),
+                             loader.get_field_types(eshop_products))
+
+        mapped = [mapper.map_product_fields(erp_product, product) for erp_product, product in pairs]
+        self.check_throughput("field_mapper", len(pairs),
+                              lambda: [mapper.map_product_fields(erp_product, product) for erp_product, product in pairs])
+
+        validator = ProductValidator(VALIDATION_RULES)
+        self.check_throughput("validator", len(mapped), lambda: [validator.validate_product(product) for product in mapped])
+
+    def test_sync_products(self):
+        """Test end-to-end ProductSync.sync_products throughput and peak memory"""
+        config = sync_config(self.erp_file, self.eshop_file, self.tmpdir.name)
+        self.check_throughput("sync_products", self.rows, lambda: ProductSync(config).sync_products())
+
+        gc.collect()
+        tracemalloc.start()
+        try:
+            ProductSync(config).sync_products()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+        self.check("sync_products", "peak_bytes_per_row", peak / self.rows)
+
+    def test_sync_products_scales_linearly(self):
+        """Test time per product stays flat as the catalog grows
+
+        Independent of the baseline's numbers: catches quadratic scans such as
+        a linear ERP lookup per Eshop product.
+        """
+        factor = self.baseline["scaling_factor"]
+        large_dir = os.path.join(self.tmpdir.name, "large")
+        large_files = write_catalog(large_dir, self.rows * factor)
+
+        small, _ = measure(self.repeat, self.rows,
+                           lambda: ProductSync(sync_config(self.erp_file, self.eshop_file, self.tmpdir.name)).sync_products())
+        large, _ = measure(self.repeat, self.rows * factor,
+                           lambda: ProductSync(sync_config(*large_files, large_dir)).sync_products())
+        growth = small / large
+        allowed = self.baseline["tolerances"]["scaling"]
+        self.assertLessEqual(
+            growth, allowed,
+            f"\nsync_products time per row grew {growth:.2f}x from {self.rows:,} to {self.rows * factor:,} rows "
+            f"(allowed {allowed:.1f}x); look for a per-product scan over all products"
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -11,7 +11,31 @@ import sys
 
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
+from src import json_codec
+from src.money import Money
 from src.product_sync import ProductSync
+from src.sinks import ProductSink, SinkError, SinkThrottled
+from tests.stub_server import StubServer
+
+
+class RecordingSink(ProductSink):
+    """Sink recording batch sizes and throttling batches larger than a limit"""
+
+    def __init__(self, throttle_above=None, reject=False):
+        self.throttle_above = throttle_above
+        self.reject = reject
+        self.batches = []
+        self.closed = False
+
+    def write_batch(self, batch):
+        if self.reject:
+            raise SinkError("422")
+        if self.throttle_above is not None and len(batch) > self.throttle_above:
+            raise SinkThrottled("429")
+        self.batches.append(list(batch))
+
+    def close(self):
+        self.closed = True
 
 
 class TestProductSync(unittest.TestCase):
@@ -142,6 +166,654 @@ class TestProductSync(unittest.TestCase):
             # Validator should be called
             mock_validator.validate_product.assert_called()
     
+    def test_sync_products_stream_input(self):
+        """Test sync with incrementally streamed input files"""
+        temp_files = []
+        for data in ({"products": self.erp_products}, {"products": self.eshop_products}):
+            with tempfile.NamedTemporaryFile(mode='w', suffix='.json', delete=False) as f:
+                json.dump(data, f)
+                temp_files.append(f.name)
+        
+        try:
+            self.config["ERP_DATA_FILE"], self.config["ESHOP_DATA_FILE"] = temp_files
+            self.config["STREAM_INPUT"] = True
+            sync = ProductSync(self.config)
+            
+            products = sync.iter_synced_products()
+            
+            self.assertNotIsInstance(products, list)
+            result = list(products)
+            self.assertEqual(len(result), 1)
+            self.assertEqual(result[0]["name"], "Updated Product")
+            self.assertEqual(result[0]["price"], 150.0)
+            self.assertEqual(result[0]["stock"], 25)
+        finally:
+            for temp_file in temp_files:
+                os.unlink(temp_file)
+    
+    @patch('src.product_sync.DataLoader')
+    def test_sync_products_delta(self, mock_data_loader_class):
+        """Test delta sync emits only changed products with their change sets"""
+        erp_products = self.erp_products + [
+            {"ItemName": "Same Product", "ItemPrice": "20.0", "ItemSku": "TEST-002", "ItemStock": "5"}
+        ]
+        eshop_products = self.eshop_products + [
+            {"id": 457, "name": "Same Product", "price": 20.0, "sku": "TEST-002", "stock": 5},
+            {"id": 458, "name": "Orphan", "price": 1.0, "sku": "MISSING-001", "stock": 1}
+        ]
+        
+        mock_loader = MagicMock()
+        mock_loader.load_erp_products.return_value = erp_products
+        mock_loader.load_eshop_products.return_value = eshop_products
+        mock_loader.get_field_types.return_value = {"sku": "str", "name": "str", "price": "float", "stock": "int"}
+        mock_loader.start_timestamp = "2026-01-15 01:00:00"
+        mock_data_loader_class.return_value = mock_loader
+        
+        self.config["DELTA_SYNC"] = True
+        sync = ProductSync(self.config)
+        
+        result = sync.sync_products()
+        
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["sku"], "TEST-001")
+        self.assertEqual(result[0]["changes"], {
+            "name": {"old": "Old Product", "new": "Updated Product"},
+            "price": {"old": 100.0, "new": 150.0},
+            "stock": {"old": 10, "new": 25}
+        })
+        self.assertEqual(sync.stats["changed"], 1)
+        self.assertEqual(sync.stats["unchanged"], 1)
+        self.assertEqual(sync.stats["missing_in_erp"], 1)
+    
+    def test_state_store_skips_unchanged_products(self):
+        """Test products synced by a previous run are skipped until their ERP data changes"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        erp_file = os.path.join(temp_dir.name, "erp.json")
+        eshop_file = os.path.join(temp_dir.name, "eshop.json")
+        with open(eshop_file, "w") as f:
+            json.dump({"products": self.eshop_products}, f)
+        
+        self.config.update({
+            "ERP_DATA_FILE": erp_file,
+            "ESHOP_DATA_FILE": eshop_file,
+            "OUTPUT_FILE": os.path.join(temp_dir.name, "output.json"),
+            "STATE_STORE_FILE": os.path.join(temp_dir.name, "state.db")
+        })
+        
+        def run(erp_products):
+            with open(erp_file, "w") as f:
+                json.dump({"products": erp_products}, f)
+            sync = ProductSync(self.config)
+            count = sync.save_synced_products(sync.iter_synced_products())
+            return count, sync.stats["unchanged_since_last_run"]
+        
+        self.assertEqual(run(self.erp_products), (1, 0))
+        self.assertEqual(run(self.erp_products), (0, 1))
+        
+        changed_products = [dict(self.erp_products[0], ItemPrice="175.00")]
+        self.assertEqual(run(changed_products), (1, 0))
+        
+        # Settings that change the mapped output discard the stored hashes
+        self.assertEqual(run(changed_products), (0, 1))
+        self.config["MONEY_FIELDS"] = ["price"]
+        self.assertEqual(run(changed_products), (1, 0))
+        self.config["MONEY_DECIMALS"] = 3
+        self.assertEqual(run(changed_products), (1, 0))
+        self.config["ERP_IDENTIFIER_FIELD"] = "ItemId"
+        self.assertEqual(run([dict(changed_products[0], ItemId="TEST-001")]), (1, 0))
+    
+    def test_bidirectional_sync_writes_erp_updates(self):
+        """Test Eshop-owned stock is kept and written back to the ERP in the same run"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        erp_file = os.path.join(temp_dir.name, "erp.json")
+        eshop_file = os.path.join(temp_dir.name, "eshop.json")
+        erp_products = self.erp_products + [
+            {"ItemName": "Sold Out", "ItemPrice": "-1", "ItemSku": "TEST-002", "ItemStock": "3"},
+            {"ItemName": "In Sync", "ItemPrice": "5.00", "ItemSku": "TEST-003", "ItemStock": "4"}
+        ]
+        eshop_products = self.eshop_products + [
+            {"id": 457, "name": "Sold Out", "price": 1.0, "sku": "TEST-002", "stock": 0},
+            {"id": 458, "name": "In Sync", "price": 5.0, "sku": "TEST-003", "stock": 4}
+        ]
+        with open(erp_file, "w") as f:
+            json.dump({"products": erp_products}, f)
+        with open(eshop_file, "w") as f:
+            json.dump({"products": eshop_products}, f)
+        
+        self.config.update({
+            "ERP_DATA_FILE": erp_file,
+            "ESHOP_DATA_FILE": eshop_file,
+            "OUTPUT_FILE": os.path.join(temp_dir.name, "output.json"),
+            "LOG_FILE": os.path.join(temp_dir.name, "sync.log"),
+            "ERP_UPDATE_FILE": os.path.join(temp_dir.name, "erp_updates.json"),
+            "FIELD_OWNERSHIP": {"price": "erp", "stock": "eshop"}
+        })
+        
+        for workers in (1, 2):
+            self.config["SYNC_WORKERS"] = workers
+            sync = ProductSync(self.config)
+            sink = RecordingSink()
+            
+            sync.push_to_sink(sync.iter_synced_products(), sink)
+            
+            self.assertEqual([(p["sku"], p["price"], p["stock"]) for p in sink.batches[0]],
+                             [("TEST-001", 150.0, 10), ("TEST-003", 5.0, 4)])
+            self.assertEqual(sync.stats["erp_updates"], 2)
+            with open(self.config["ERP_UPDATE_FILE"]) as f:
+                self.assertEqual(json.load(f), [
+                    {"ItemSku": "TEST-001", "ItemStock": "10"},
+                    {"ItemSku": "TEST-002", "ItemStock": "0"}
+                ])
+    
+    def test_shared_stock_keeps_erp_restocks(self):
+        """Test shared stock pushes ERP restocks and reports Eshop sales as deltas across runs"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        erp_file = os.path.join(temp_dir.name, "erp.json")
+        eshop_file = os.path.join(temp_dir.name, "eshop.json")
+        
+        def write(file_path, products):
+            with open(file_path, "w") as f:
+                json.dump({"products": products}, f)
+        
+        def run():
+            sync = ProductSync(self.config)
+            sync.save_synced_products(sync.iter_synced_products())
+            with open(self.config["OUTPUT_FILE"]) as f:
+                stock = [p["stock"] for p in json.load(f)]
+            with open(self.config["ERP_UPDATE_FILE"]) as f:
+                return stock, json.load(f)
+        
+        self.config.update({
+            "ERP_DATA_FILE": erp_file,
+            "ESHOP_DATA_FILE": eshop_file,
+            "OUTPUT_FILE": os.path.join(temp_dir.name, "output.json"),
+            "LOG_FILE": os.path.join(temp_dir.name, "sync.log"),
+            "ERP_UPDATE_FILE": os.path.join(temp_dir.name, "erp_updates.json"),
+            "STATE_STORE_FILE": os.path.join(temp_dir.name, "state.db"),
+            "FIELD_OWNERSHIP": {"stock": "shared"}
+        })
+        erp_product = dict(self.erp_products[0], ItemStock="10")
+        eshop_product = dict(self.eshop_products[0], stock=0)
+        
+        for workers in (1, 2):
+            self.config["SYNC_WORKERS"] = workers
+            if os.path.exists(self.config["STATE_STORE_FILE"]):
+                os.unlink(self.config["STATE_STORE_FILE"])
+            write(erp_file, [erp_product])
+            write(eshop_file, [eshop_product])
+            
+            # The first run takes the ERP stock as the baseline
+            self.assertEqual(run(), ([10], []))
+            
+            # The Eshop sold 3 and the ERP restocked 5: the Eshop gets the restock,
+            # the ERP gets the sales
+            write(eshop_file, [dict(eshop_product, stock=7)])
+            write(erp_file, [dict(erp_product, ItemStock="15")])
+            self.assertEqual(run(), ([12], [{"ItemSku": "TEST-001", "adjustments": {"ItemStock": -3}}]))
+            
+            # Once the ERP applied the adjustment both sides agree
+            write(eshop_file, [dict(eshop_product, stock=12)])
+            write(erp_file, [dict(erp_product, ItemStock="12")])
+            self.assertEqual(run(), ([12], []))
+    
+    def shared_stock_run(self, erp_stock, eshop_stock, sink=None):
+        """Sync one product with shared stock to a sink and return (sink, ERP update file)"""
+        with open(self.config["ERP_DATA_FILE"], "w") as f:
+            json.dump({"products": [dict(self.erp_products[0], ItemStock=str(erp_stock))]}, f)
+        with open(self.config["ESHOP_DATA_FILE"], "w") as f:
+            json.dump({"products": [dict(self.eshop_products[0], stock=eshop_stock)]}, f)
+        sink = sink or RecordingSink()
+        sync = ProductSync(self.config)
+        sync.push_to_sink(sync.iter_synced_products(), sink)
+        updates = None
+        if os.path.exists(self.config["ERP_UPDATE_FILE"]):
+            with open(self.config["ERP_UPDATE_FILE"]) as f:
+                updates = json.load(f)
+        return sink, updates
+    
+    def use_shared_stock_files(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.config.update({
+            "ERP_DATA_FILE": os.path.join(temp_dir.name, "erp.json"),
+            "ESHOP_DATA_FILE": os.path.join(temp_dir.name, "eshop.json"),
+            "LOG_FILE": os.path.join(temp_dir.name, "sync.log"),
+            "ERP_UPDATE_FILE": os.path.join(temp_dir.name, "erp_updates.json"),
+            "STATE_STORE_FILE": os.path.join(temp_dir.name, "state.db"),
+            "SINK_DEAD_LETTER_FILE": os.path.join(temp_dir.name, "dead_letters.jsonl"),
+            "SINK_MAX_RETRIES": 0,
+            "FIELD_OWNERSHIP": {"stock": "shared"}
+        })
+        return temp_dir.name
+    
+    def test_dead_lettered_shared_stock_keeps_eshop_baseline(self):
+        """Test a dead-lettered product is reconciled from the stock the Eshop kept"""
+        self.use_shared_stock_files()
+        self.shared_stock_run(20, 20)
+        
+        # The ERP restocked 10 and the Eshop sold 3, but the Eshop rejected the
+        # product: the sale is reported and the Eshop keeps 17
+        sink, updates = self.shared_stock_run(30, 17, RecordingSink(reject=True))
+        self.assertEqual(sink.batches, [])
+        self.assertEqual(updates, [{"ItemSku": "TEST-001", "adjustments": {"ItemStock": -3}}])
+        
+        # Once the ERP applied the sale, the Eshop gets its stock without a new adjustment
+        sink, updates = self.shared_stock_run(27, 17)
+        self.assertEqual([p["stock"] for p in sink.batches[0]], [27])
+        self.assertEqual(updates, [])
+    
+    def test_failed_sink_does_not_publish_erp_updates(self):
+        """Test adjustments are published once, with the run that delivered the products"""
+        temp_dir = self.use_shared_stock_files()
+        del self.config["SINK_DEAD_LETTER_FILE"]
+        self.shared_stock_run(20, 20)
+        
+        with self.assertRaises(SinkError):
+            self.shared_stock_run(30, 17, RecordingSink(reject=True))
+        with open(self.config["ERP_UPDATE_FILE"]) as f:
+            self.assertEqual(json.load(f), [])
+        self.assertEqual(sorted(os.listdir(temp_dir)), ["erp.json", "erp_updates.json", "eshop.json", "state.db"])
+        
+        # The next run reports the same sale from the same baseline
+        sink, updates = self.shared_stock_run(30, 17)
+        self.assertEqual([p["stock"] for p in sink.batches[0]], [27])
+        self.assertEqual(updates, [{"ItemSku": "TEST-001", "adjustments": {"ItemStock": -3}}])
+        
+        sink, updates = self.shared_stock_run(27, 27)
+        self.assertEqual([p["stock"] for p in sink.batches[0]], [27])
+        self.assertEqual(updates, [])
+    
+    def test_json_backend_is_not_changed_by_instances(self):
+        """Test creating a ProductSync leaves the process-wide JSON backend alone"""
+        backend = json_codec.backend()
+        
+        ProductSync(dict(self.config, JSON_BACKEND="json"))
+        
+        self.assertEqual(json_codec.backend(), backend)
+    
+    def test_shared_money_field_is_reconciled_across_runs(self):
+        """Test a shared Money field is read back from the state store as Money"""
+        self.use_shared_stock_files()
+        self.config.update({"FIELD_OWNERSHIP": {"price": "shared"}, "MONEY_FIELDS": ["price"]})
+        
+        def run(erp_price, eshop_price):
+            with open(self.config["ERP_DATA_FILE"], "w") as f:
+                json.dump({"products": [dict(self.erp_products[0], ItemPrice=erp_price)]}, f)
+            with open(self.config["ESHOP_DATA_FILE"], "w") as f:
+                json.dump({"products": [dict(self.eshop_products[0], price=eshop_price)]}, f)
+            sink = RecordingSink()
+            sync = ProductSync(self.config)
+            sync.push_to_sink(sync.iter_synced_products(), sink)
+            with open(self.config["ERP_UPDATE_FILE"]) as f:
+                return sink, json.load(f)
+        
+        run("20.00", 20.0)
+        
+        # The ERP raised the price by 5 and the Eshop discounted it by 0.10
+        sink, updates = run("25.00", 19.9)
+        self.assertEqual([p["price"] for p in sink.batches[0]], [Money.parse("24.90")])
+        self.assertEqual(updates, [{"ItemSku": "TEST-001", "adjustments": {"ItemPrice": -0.1}}])
+    
+    def test_shared_fields_need_state_store(self):
+        """Test shared fields are rejected without a state store for their last synced values"""
+        with self.assertRaises(ValueError):
+            ProductSync(dict(self.config, FIELD_OWNERSHIP={"stock": "shared"}))
+    
+    @patch('src.product_sync.DataLoader')
+    def test_sync_products_error_log_and_report(self, mock_data_loader_class):
+        """Test validation failures go to the log file and the JSONL error report"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        erp_products = [dict(self.erp_products[0], ItemPrice="-5")]
+        
+        mock_loader = MagicMock()
+        mock_loader.load_erp_products.return_value = erp_products
+        mock_loader.load_eshop_products.return_value = self.eshop_products
+        mock_loader.get_field_types.return_value = {"price": "float", "stock": "int"}
+        mock_loader.start_timestamp = "2026-01-15 01:00:00"
+        mock_data_loader_class.return_value = mock_loader
+        
+        self.config["LOG_FILE"] = os.path.join(temp_dir.name, "sync.log")
+        self.config["ERROR_REPORT_FILE"] = os.path.join(temp_dir.name, "errors.jsonl")
+        sync = ProductSync(self.config)
+        
+        result = sync.sync_products()
+        
+        self.assertEqual(result, [])
+        self.assertEqual(sync.stats["failed_validation"], 1)
+        with open(self.config["LOG_FILE"]) as f:
+            self.assertIn("Product with Eshop ID 456", f.read())
+        with open(self.config["ERROR_REPORT_FILE"]) as f:
+            report = [json.loads(line) for line in f]
+        self.assertEqual(report[0]["errors"], ["Invalid price: must be greater than 0"])
+    
+    def test_sync_products_parallel_matches_sequential(self):
+        """Test parallel sync gives the same products, log and stats as sequential sync"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        erp_products = [
+            {"ItemName": f"Product {i}", "ItemPrice": str(i % 7 - 1), "ItemSku": f"SKU-{i}", "ItemStock": str(i)}
+            for i in range(60) if i % 11
+        ]
+        eshop_products = [
+            {"id": 1000 + i, "name": "", "price": 1.0, "sku": f"SKU-{i}", "stock": 0}
+            for i in reversed(range(60))
+        ]
+        self.config["ERP_DATA_FILE"] = os.path.join(temp_dir.name, "erp.json")
+        self.config["ESHOP_DATA_FILE"] = os.path.join(temp_dir.name, "eshop.json")
+        for path, products in ((self.config["ERP_DATA_FILE"], erp_products),
+                               (self.config["ESHOP_DATA_FILE"], eshop_products)):
+            with open(path, "w") as f:
+                json.dump({"products": products}, f)
+        
+        def run(workers):
+            self.config["SYNC_WORKERS"] = workers
+            self.config["SYNC_CHUNK_SIZE"] = 7
+            self.config["LOG_FILE"] = os.path.join(temp_dir.name, f"sync_{workers}.log")
+            sync = ProductSync(self.config)
+            sync.data_loader.start_timestamp = "2026-01-15 01:00:00"
+            with patch('src.product_sync.logging'):
+                result = sync.sync_products()
+            with open(self.config["LOG_FILE"]) as f:
+                return result, f.read(), sync.stats
+        
+        sequential = run(1)
+        parallel = run(3)
+        
+        self.assertEqual(parallel, sequential)
+        self.assertEqual(sequential[2]["missing_in_erp"], 6)
+        self.assertGreater(sequential[2]["failed_validation"], 0)
+    
+    def test_parallel_sync_reads_eshop_products_in_chunks(self):
+        """Test worker processes get bounded chunks as outcomes are consumed"""
+        self.config.update({"SYNC_WORKERS": 2, "SYNC_CHUNK_SIZE": 10, "LOG_FILE": os.devnull})
+        sync = ProductSync(self.config)
+        sync.start_run()
+        erp_index = {f"SKU-{i}": {"ItemName": "Name", "ItemPrice": "5", "ItemSku": f"SKU-{i}", "ItemStock": "1"}
+                     for i in range(200)}
+        read = []
+        
+        def eshop_products():
+            for i in range(200):
+                read.append(i)
+                yield {"id": i + 1, "sku": f"SKU-{i}", "name": "", "price": 1.0, "stock": 0}
+        
+        products = sync.sync_loaded_products(eshop_products(), erp_index, sync.create_field_mapper({}, {}))
+        self.assertEqual(next(products)["sku"], "SKU-0")
+        # Two chunks per worker in flight, plus the one read after the first result
+        self.assertLessEqual(len(read), 50)
+        
+        self.assertEqual([p["sku"] for p in products], [f"SKU-{i}" for i in range(1, 200)])
+        self.assertEqual(len(read), 200)
+    
+    def test_compact_records_match_dicts(self):
+        """Test COMPACT_RECORDS writes the same output, sequentially and in parallel"""
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        erp_products = [
+            {"ItemId": str(i), "ItemName": f"Product {i}", "ItemPrice": str(i % 5 - 1), "ItemSku": f"SKU-{i}",
+             "ItemStock": str(i), "ItemDescription": "Unmapped"}
+            for i in range(40) if i % 9
+        ]
+        eshop_products = [
+            {"id": 1000 + i, "name": "Product 3" if i == 3 else "", "price": 2.0, "sku": f"SKU-{i}",
+             "stock": 3 if i == 3 else 0, "category": "Unmapped"}
+            for i in range(40)
+        ]
+        self.config.update({
+            "ERP_DATA_FILE": os.path.join(temp_dir.name, "erp.json"),
+            "ESHOP_DATA_FILE": os.path.join(temp_dir.name, "eshop.json"),
+            "LOG_FILE": os.path.join(temp_dir.name, "sync.log"),
+            "DELTA_SYNC": True
+        })
+        for path, products in ((self.config["ERP_DATA_FILE"], erp_products),
+                               (self.config["ESHOP_DATA_FILE"], eshop_products)):
+            with open(path, "w") as f:
+                json.dump({"products": products}, f)
+        
+        def run(compact, workers):
+            self.config.update({
+                "COMPACT_RECORDS": compact,
+                "SYNC_WORKERS": workers,
+                "OUTPUT_FILE": os.path.join(temp_dir.name, f"out_{compact}_{workers}.json")
+            })
+            sync = ProductSync(self.config)
+            with patch('src.product_sync.logging'):
+                sync.save_synced_products(sync.iter_synced_products())
+            with open(self.config["OUTPUT_FILE"]) as f:
+                return f.read(), sync.stats
+        
+        expected = run(False, 1)
+        
+        self.assertEqual(run(True, 1), expected)
+        self.assertEqual(run(True, 3), expected)
+        self.assertEqual(expected[1]["unchanged"], 1)
+        self.assertIn('"changes": {', expected[0])
+    
+    @patch('src.product_sync.DataLoader')
+    def test_sync_products_from_erp_api(self, mock_data_loader_class):
+        """Test ERP products are fetched from the API when ERP_API_URL is set"""
+        server = StubServer(self.erp_products)
+        server.start_in_thread()
+        self.addCleanup(server.stop_in_thread)
+        
+        mock_loader = MagicMock()
+        mock_loader.load_eshop_products.return_value = self.eshop_products
+        mock_loader.get_field_types.return_value = {"price": "float", "stock": "int"}
+        mock_loader.start_timestamp = "2026-01-15 01:00:00"
+        mock_data_loader_class.return_value = mock_loader
+        
+        self.config["ERP_API_URL"] = server.url
+        sync = ProductSync(self.config)
+        
+        result = sync.sync_products()
+        
+        mock_loader.load_erp_products.assert_not_called()
+        self.assertEqual(len(result), 1)
+        self.assertEqual(result[0]["price"], 150.0)
+    
+    def test_metrics_and_run_report(self):
+        """Test a run reports every stage, its throughput and a JSON run report"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            erp_file = os.path.join(tmpdir, "erp.json")
+            eshop_file = os.path.join(tmpdir, "eshop.json")
+            report_file = os.path.join(tmpdir, "report.json")
+            with open(erp_file, 'w') as f:
+                json.dump({"products": self.erp_products}, f)
+            with open(eshop_file, 'w') as f:
+                json.dump({"products": self.eshop_products}, f)
+            
+            self.config.update({
+                "ERP_DATA_FILE": erp_file,
+                "ESHOP_DATA_FILE": eshop_file,
+                "OUTPUT_FILE": os.path.join(tmpdir, "out.json")
+            })
+            sync = ProductSync(self.config)
+            sync.save_synced_products(sync.iter_synced_products())
+            sync.write_run_report(report_file)
+            
+            with open(report_file, 'r') as f:
+                report = json.load(f)
+        
+        self.assertEqual(list(report["stages"]), [
+            "load_erp", "load_eshop", "type_inference", "index_build", "match", "map", "validate", "write"
+        ])
+        self.assertEqual(report["rows"], 1)
+        self.assertEqual(report["synced"], 1)
+        self.assertEqual(report["stats"]["missing_in_erp"], 0)
+        self.assertGreater(report["wall_seconds"], 0)
+    
+    @patch('src.product_sync.DataLoader')
+    def test_schema_cache_skips_inference(self, mock_data_loader_class):
+        """Test a second run reuses cached field types instead of inferring them"""
+        mock_loader = MagicMock()
+        mock_loader.load_erp_products.return_value = self.erp_products
+        mock_loader.load_eshop_products.return_value = self.eshop_products
+        mock_loader.get_field_types.return_value = {"ItemId": "str", "ItemSku": "str", "ItemName": "str", "ItemPrice": "str",
+                                                    "ItemStock": "str", "id": "int", "name": "str",
+                                                    "price": "float", "sku": "str", "stock": "int"}
+        mock_data_loader_class.return_value = mock_loader
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            self.config["SCHEMA_CACHE_FILE"] = os.path.join(tmpdir, "schema.json")
+            first = list(ProductSync(self.config).iter_synced_products())
+            self.assertEqual(mock_loader.get_field_types.call_count, 2)
+            
+            second = list(ProductSync(self.config).iter_synced_products())
+            self.assertEqual(mock_loader.get_field_types.call_count, 2)
+            
+            # New fields in the input invalidate the cached schema
+            mock_loader.load_eshop_products.return_value = [dict(self.eshop_products[0], colour="red")]
+            list(ProductSync(self.config).iter_synced_products())
+            self.assertEqual(mock_loader.get_field_types.call_count, 3)
+        
+        self.assertEqual(first, second)
+    
+    def test_money_fields_written_exactly(self):
+        """Test money fields are validated, diffed and written as exact amounts"""
+        erp_products = self.erp_products + [
+            {"ItemSku": "TEST-002", "ItemName": "Cheap", "ItemPrice": "0.29", "ItemStock": "1"},
+            {"ItemSku": "TEST-003", "ItemName": "Free", "ItemPrice": "0.00", "ItemStock": "1"}
+        ]
+        eshop_products = self.eshop_products + [
+            {"id": 457, "name": "Cheap", "price": 0.29, "sku": "TEST-002", "stock": 1},
+            {"id": 458, "name": "Free", "price": 1.0, "sku": "TEST-003", "stock": 1}
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            erp_file = os.path.join(tmpdir, "erp.json")
+            eshop_file = os.path.join(tmpdir, "eshop.json")
+            output_file = os.path.join(tmpdir, "out.json")
+            with open(erp_file, 'w') as f:
+                json.dump({"products": erp_products}, f)
+            with open(eshop_file, 'w') as f:
+                json.dump({"products": eshop_products}, f)
+            
+            self.config.update({
+                "ERP_DATA_FILE": erp_file,
+                "ESHOP_DATA_FILE": eshop_file,
+                "OUTPUT_FILE": output_file,
+                "LOG_FILE": os.path.join(tmpdir, "sync.log"),
+                "MONEY_FIELDS": ["price"],
+                "DELTA_SYNC": True
+            })
+            sync = ProductSync(self.config)
+            sync.save_synced_products(sync.iter_synced_products())
+            
+            with open(output_file, 'r') as f:
+                written = f.read()
+        
+        # The unchanged cheap product is skipped and the free one fails validation
+        self.assertEqual(sync.stats["unchanged"], 1)
+        self.assertEqual(sync.stats["failed_validation"], 1)
+        synced = json.loads(written)
+        self.assertEqual([product["sku"] for product in synced], ["TEST-001"])
+        self.assertIn('"price": 150.0', written)
+        self.assertEqual(synced[0]["changes"]["price"], {"old": 100.0, "new": 150.0})
+    
+    def test_schema_sample_covers_null_first_row(self):
+        """Test a null in the first product does not decide a field's type"""
+        eshop_products = [
+            {"id": 1, "name": "A", "price": 5, "sku": "MISSING", "stock": None},
+            dict(self.eshop_products[0], price=99.9)
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            erp_file = os.path.join(tmpdir, "erp.json")
+            eshop_file = os.path.join(tmpdir, "eshop.json")
+            with open(erp_file, 'w') as f:
+                json.dump({"products": self.erp_products}, f)
+            with open(eshop_file, 'w') as f:
+                json.dump({"products": eshop_products}, f)
+            
+            self.config.update({"ERP_DATA_FILE": erp_file, "ESHOP_DATA_FILE": eshop_file, "STREAM_INPUT": True})
+            for sample_size in (1000, 0):
+                self.config["SCHEMA_SAMPLE_SIZE"] = sample_size
+                sync = ProductSync(self.config)
+                _, field_types = sync.load_eshop_products()
+                self.assertEqual(field_types["stock"], "int")
+                self.assertEqual(field_types["price"], "float")
+                
+                synced = list(sync.iter_synced_products())
+                self.assertEqual(len(synced), 1)
+                self.assertEqual(synced[0]["price"], 150.0)
+
+    def test_eshop_snapshot_reused_until_file_changes(self):
+        """Test later runs read the Eshop snapshot instead of the JSON file until it changes"""
+        eshop_products = self.eshop_products + [
+            {"id": 457, "name": "Other", "price": 5.0, "sku": "MISSING", "stock": 1, "colour": "red"}
+        ]
+
+        with tempfile.TemporaryDirectory() as tmpdir:
+            erp_file = os.path.join(tmpdir, "erp.json")
+            eshop_file = os.path.join(tmpdir, "eshop.json")
+            with open(erp_file, 'w') as f:
+                json.dump({"products": self.erp_products}, f)
+            with open(eshop_file, 'w') as f:
+                json.dump({"products": eshop_products}, f)
+
+            self.config.update({"ERP_DATA_FILE": erp_file, "ESHOP_DATA_FILE": eshop_file, "DELTA_SYNC": True})
+            expected = list(ProductSync(self.config).iter_synced_products())
+
+            self.config["ESHOP_SNAPSHOT_FILE"] = os.path.join(tmpdir, "eshop.snapshot")
+            for stream_input in (False, True):
+                self.config["STREAM_INPUT"] = stream_input
+                if os.path.exists(self.config["ESHOP_SNAPSHOT_FILE"]):
+                    os.unlink(self.config["ESHOP_SNAPSHOT_FILE"])
+                self.assertEqual(list(ProductSync(self.config).iter_synced_products()), expected)
+                self.assertTrue(os.path.exists(self.config["ESHOP_SNAPSHOT_FILE"]))
+
+                with patch('src.data_loader.DataLoader.load_eshop_products') as load, \
+                        patch('src.data_loader.DataLoader.iter_eshop_products') as iterate:
+                    sync = ProductSync(self.config)
+                    self.assertEqual(list(sync.iter_synced_products()), expected)
+                    load.assert_not_called()
+                    iterate.assert_not_called()
+                    self.assertEqual(sync.stats["missing_in_erp"], 1)
+
+    def test_metrics_textfile(self):
+        """Test a run writes Prometheus counters for matches, failures and batches"""
+        erp_products = self.erp_products + [
+            {"ItemSku": "TEST-002", "ItemName": "Broken", "ItemPrice": "n/a", "ItemStock": "1"}
+        ]
+        eshop_products = self.eshop_products + [
+            {"id": 457, "name": "B", "price": 5.0, "sku": "TEST-002", "stock": 1},
+            {"id": 458, "name": "C", "price": 5.0, "sku": "TEST-003", "stock": 1}
+        ]
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            paths = {name: os.path.join(tmpdir, name) for name in ("erp.json", "eshop.json", "sync.prom")}
+            with open(paths["erp.json"], 'w') as f:
+                json.dump({"products": erp_products}, f)
+            with open(paths["eshop.json"], 'w') as f:
+                json.dump({"products": eshop_products}, f)
+            
+            self.config.update({
+                "ERP_DATA_FILE": paths["erp.json"],
+                "ESHOP_DATA_FILE": paths["eshop.json"],
+                "OUTPUT_FILE": os.path.join(tmpdir, "out.json"),
+                "LOG_FILE": os.path.join(tmpdir, "sync.log"),
+                "METRICS_TEXTFILE": paths["sync.prom"]
+            })
+            sync = ProductSync(self.config)
+            with self.assertLogs(level="WARNING"):
+                sync.save_synced_products(sync.iter_synced_products())
+            
+            with open(paths["sync.prom"], 'r') as f:
+                textfile = f.read()
+        
+        self.assertEqual(sync.stats["failed_rules"], {"positive_fields": {"price": 1}})
+        self.assertEqual(sync.stats["cast_failures"], {"price": 1})
+        self.assertIn("erp_sync_products_matched_total 2", textfile)
+        self.assertIn("erp_sync_products_missing_in_erp_total 1", textfile)
+        self.assertIn("erp_sync_products_synced_total 1", textfile)
+        self.assertIn('erp_sync_validation_failures_total{rule="positive_fields",field="price"} 1', textfile)
+        self.assertIn('erp_sync_cast_failures_total{field="price"} 1', textfile)
+        self.assertIn("erp_sync_batch_latency_seconds_count 1", textfile)
+    
     def test_find_matching_erp_product_success(self):
         """Test successful ERP product matching"""
         result = self.sync._find_matching_erp_product(
@@ -163,6 +835,56 @@ class TestProductSync(unittest.TestCase):
         
         self.assertIsNone(result)
     
+    def test_build_erp_index_first_wins(self):
+        """Test duplicate ERP SKUs keep the first product by default"""
+        erp_products = [
+            {"ItemSku": "TEST-001", "ItemName": "First"},
+            {"ItemSku": "TEST-001", "ItemName": "Second"},
+            {"ItemSku": "TEST-002", "ItemName": "Other"},
+            {"ItemName": "No SKU"}
+        ]
+        
+        index = self.sync._build_erp_index(erp_products, "ItemSku")
+        
+        self.assertEqual(len(index), 2)
+        self.assertEqual(index["TEST-001"]["ItemName"], "First")
+        self.assertEqual(self.sync.stats["duplicate_erp_skus"], 1)
+        self.assertEqual(self.sync.stats["erp_products_without_sku"], 1)
+    
+    def test_build_erp_index_last_wins(self):
+        """Test duplicate ERP SKUs keep the last product with the "last" policy"""
+        self.config["ERP_DUPLICATE_SKU_POLICY"] = "last"
+        sync = ProductSync(self.config)
+        erp_products = [
+            {"ItemSku": "TEST-001", "ItemName": "First"},
+            {"ItemSku": "TEST-001", "ItemName": "Second"}
+        ]
+        
+        index = sync._build_erp_index(erp_products, "ItemSku")
+        
+        self.assertEqual(index["TEST-001"]["ItemName"], "Second")
+        self.assertEqual(sync.stats["duplicate_erp_skus"], 1)
+    
+    def test_build_erp_index_reject(self):
+        """Test duplicate ERP SKUs raise with the "reject" policy"""
+        self.config["ERP_DUPLICATE_SKU_POLICY"] = "reject"
+        sync = ProductSync(self.config)
+        erp_products = [
+            {"ItemSku": "TEST-001", "ItemName": "First"},
+            {"ItemSku": "TEST-001", "ItemName": "Second"}
+        ]
+        
+        with self.assertRaises(ValueError) as context:
+            sync._build_erp_index(erp_products, "ItemSku")
+        self.assertIn("Duplicate SKU TEST-001", str(context.exception))
+    
+    def test_invalid_duplicate_sku_policy(self):
+        """Test unknown duplicate SKU policies are rejected"""
+        self.config["ERP_DUPLICATE_SKU_POLICY"] = "random"
+        
+        with self.assertRaises(ValueError):
+            ProductSync(self.config)
+    
     def test_save_synced_products_success(self):
         """Test successful saving of synced products"""
         products = [
@@ -189,6 +911,64 @@ class TestProductSync(unittest.TestCase):
         finally:
             os.unlink(temp_file)
     
+    def test_save_synced_products_ndjson_generator(self):
+        """Test saving a generator of products as NDJSON"""
+        products = ({"id": i, "sku": f"TEST-00{i}"} for i in range(3))
+        
+        with tempfile.NamedTemporaryFile(mode='w', suffix='.ndjson', delete=False) as f:
+            temp_file = f.name
+        
+        try:
+            self.config["OUTPUT_FILE"] = temp_file
+            self.config["OUTPUT_FORMAT"] = "ndjson"
+            sync = ProductSync(self.config)
+            
+            count = sync.save_synced_products(products)
+            
+            with open(temp_file, 'r') as f:
+                saved_data = [json.loads(line) for line in f]
+            
+            self.assertEqual(count, 3)
+            self.assertEqual([p["sku"] for p in saved_data], ["TEST-000", "TEST-001", "TEST-002"])
+            
+        finally:
+            os.unlink(temp_file)
+    
+    def test_push_to_sink_batches(self):
+        """Test products are sent in order in growing batches"""
+        self.config["SINK_BATCH_SIZE"] = 10
+        sync = ProductSync(self.config)
+        sink = RecordingSink()
+        
+        count = sync.push_to_sink(({"sku": f"TEST-{i}"} for i in range(100)), sink)
+        
+        self.assertEqual(count, 100)
+        self.assertTrue(sink.closed)
+        self.assertEqual(len(sink.batches[0]), 10)
+        self.assertGreater(max(len(batch) for batch in sink.batches), 10)
+        self.assertEqual([p["sku"] for batch in sink.batches for p in batch],
+                         [f"TEST-{i}" for i in range(100)])
+    
+    def test_push_to_sink_shrinks_after_throttling(self):
+        """Test a throttled batch is resent in smaller batches without losing products"""
+        self.config["SINK_BATCH_SIZE"] = 40
+        sync = ProductSync(self.config)
+        sink = RecordingSink(throttle_above=15)
+        
+        count = sync.push_to_sink([{"sku": f"TEST-{i}"} for i in range(100)], sink)
+        
+        self.assertEqual(count, 100)
+        self.assertTrue(all(len(batch) <= 15 for batch in sink.batches))
+        self.assertEqual(len([p for batch in sink.batches for p in batch]), 100)
+    
+    def test_push_to_sink_gives_up_after_retries(self):
+        """Test persistent throttling raises SinkError"""
+        self.config["SINK_MAX_RETRIES"] = 2
+        sync = ProductSync(self.config)
+        
+        with self.assertRaises(SinkError):
+            sync.push_to_sink([{"sku": f"TEST-{i}"} for i in range(100)], RecordingSink(throttle_above=0))
+    
     def test_save_synced_products_file_error(self):
         """Test handling of file write errors"""
         products = [{"id": 1, "sku": "TEST-001"}]
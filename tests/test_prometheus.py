@@ -0,0 +1,115 @@
+"""
+Unit tests for the Prometheus metrics exporter
+"""
+
+import unittest
+import os
+import tempfile
+import urllib.request
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.metrics import SyncMetrics
+from src.prometheus import Counter, Histogram, MetricsRegistry, SyncExporter
+
+
+class TestPrometheusMetrics(unittest.TestCase):
+    """Test cases for metric types and the text exposition format"""
+    
+    def test_counter_render(self):
+        """Test labelled counters render with escaped label values"""
+        registry = MetricsRegistry()
+        counter = registry.register(Counter("things_total", "Things", ("field",)))
+        
+        counter.inc(field="price")
+        counter.inc(2, field='say "hi"')
+        
+        self.assertEqual(registry.render(), "\n".join([
+            "# HELP things_total Things",
+            "# TYPE things_total counter",
+            'things_total{field="price"} 1',
+            'things_total{field="say \\"hi\\""} 2',
+        ]) + "\n")
+    
+    def test_counter_rejects_decrease_and_bad_labels(self):
+        """Test counters only go up and require their declared labels"""
+        counter = Counter("things_total", "Things", ("field",))
+        
+        with self.assertRaises(ValueError):
+            counter.inc(-1, field="price")
+        with self.assertRaises(ValueError):
+            counter.inc(rule="x")
+    
+    def test_histogram_buckets_are_cumulative(self):
+        """Test histogram buckets, sum and count"""
+        histogram = Histogram("latency_seconds", "Latency", buckets=(0.1, 1.0))
+        
+        for value in (0.05, 0.5, 0.7, 3.0):
+            histogram.observe(value)
+        
+        lines = histogram.render()
+        self.assertIn('latency_seconds_bucket{le="0.1"} 1', lines)
+        self.assertIn('latency_seconds_bucket{le="1"} 3', lines)
+        self.assertIn('latency_seconds_bucket{le="+Inf"} 4', lines)
+        self.assertIn("latency_seconds_sum 4.25", lines)
+        self.assertIn("latency_seconds_count 4", lines)
+    
+    def test_write_textfile(self):
+        """Test the textfile is replaced atomically without leftovers"""
+        registry = MetricsRegistry()
+        registry.register(Counter("runs_total", "Runs")).inc()
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            textfile = os.path.join(tmpdir, "sync.prom")
+            registry.write_textfile(textfile)
+            registry.write_textfile(textfile)
+            
+            self.assertEqual(os.listdir(tmpdir), ["sync.prom"])
+            with open(textfile, 'r') as f:
+                self.assertIn("runs_total 1", f.read())
+    
+    def test_serve(self):
+        """Test /metrics is served over HTTP"""
+        registry = MetricsRegistry()
+        registry.register(Counter("runs_total", "Runs")).inc(3)
+        server = registry.serve(0)
+        self.addCleanup(registry.close)
+        
+        url = f"http://127.0.0.1:{server.server_address[1]}/metrics"
+        with urllib.request.urlopen(url, timeout=5) as response:
+            body = response.read().decode("utf-8")
+            content_type = response.headers["Content-Type"]
+        
+        self.assertIn("runs_total 3", body)
+        self.assertTrue(content_type.startswith("text/plain; version=0.0.4"))
+    
+    def test_sync_exporter_record_run(self):
+        """Test a run's stats and metrics feed the sync counters"""
+        exporter = SyncExporter()
+        metrics = SyncMetrics()
+        metrics.rows = 10
+        metrics.synced = 6
+        metrics.add("write", 0.5, 0.4)
+        metrics.finish()
+        stats = {
+            "missing_in_erp": 3,
+            "failed_rules": {"positive_fields": {"price": 1}},
+            "cast_failures": {"stock": 2}
+        }
+        
+        exporter.record_run(stats, metrics, 1700000000.0)
+        exporter.record_run(stats, metrics, 1700000060.0)
+        
+        self.assertEqual(exporter.runs.get(), 2)
+        self.assertEqual(exporter.products_matched.get(), 14)
+        self.assertEqual(exporter.products_missing.get(), 6)
+        self.assertEqual(exporter.products_synced.get(), 12)
+        self.assertEqual(exporter.validation_failures.get(rule="positive_fields", field="price"), 2)
+        self.assertEqual(exporter.cast_failures.get(field="stock"), 4)
+        self.assertEqual(exporter.last_run_timestamp.get(), 1700000060.0)
+        self.assertEqual(exporter.stage_seconds.get(stage="write"), 0.5)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+"""
+Unit tests for compact product records
+"""
+
+import unittest
+import json
+import os
+import pickle
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.records import Record, record_type, json_default
+from src.field_mapper import FieldMapper
+from src.money import Money
+from src.validator import ProductValidator
+
+
+class TestRecord(unittest.TestCase):
+    """Test cases for record types"""
+    
+    def setUp(self):
+        self.record_class = record_type(("id", "sku", "price", "Item Name"))
+    
+    def test_record_type_is_cached(self):
+        """Test the same fields and name give the same class"""
+        self.assertIs(record_type(["id", "sku", "price", "Item Name"]), self.record_class)
+        self.assertIsNot(record_type(("id", "sku", "price", "Item Name"), "Other"), self.record_class)
+        self.assertTrue(issubclass(self.record_class, Record))
+    
+    def test_from_mapping_keeps_only_record_fields(self):
+        """Test unknown fields are dropped and unset fields are missing"""
+        record = self.record_class.from_mapping({"id": 1, "sku": "A", "Item Name": None, "extra": 5})
+        
+        self.assertEqual(record, {"id": 1, "sku": "A", "Item Name": None})
+        self.assertEqual(list(record), ["id", "sku", "Item Name"])
+        self.assertEqual(len(record), 3)
+        self.assertIsNone(record.get("price"))
+        self.assertEqual(record.get("price", "missing"), "missing")
+        self.assertNotIn("price", record)
+        self.assertNotIn("extra", record)
+        with self.assertRaises(KeyError):
+            record["price"]
+    
+    def test_item_assignment(self):
+        """Test fields can be set and deleted, but not added"""
+        record = self.record_class()
+        record["price"] = 2.5
+        self.assertEqual(record.to_dict(), {"price": 2.5})
+        
+        del record["price"]
+        self.assertFalse(record)
+        with self.assertRaises(KeyError):
+            record["colour"] = "red"
+        with self.assertRaises(KeyError):
+            del record["price"]
+    
+    def test_has_no_instance_dict(self):
+        """Test records store fields in slots"""
+        record = self.record_class.from_mapping({"id": 1})
+        
+        self.assertFalse(hasattr(record, "__dict__"))
+    
+    def test_pickle_round_trip(self):
+        """Test records survive pickling for parallel workers"""
+        record = self.record_class.from_mapping({"id": 1, "sku": "A"})
+        
+        restored = pickle.loads(pickle.dumps(record))
+        
+        self.assertIs(type(restored), self.record_class)
+        self.assertEqual(restored, record)
+        self.assertIs(pickle.loads(pickle.dumps(self.record_class)), self.record_class)
+    
+    def test_json_default(self):
+        """Test records and Money amounts serialize through the json hook"""
+        record = self.record_class.from_mapping({"id": 1, "sku": "A", "price": Money.parse("9.90")})
+        
+        self.assertEqual(json.dumps(record, default=json_default), '{"id": 1, "sku": "A", "price": 9.9}')
+        with self.assertRaises(TypeError):
+            json_default(object())
+    
+    def test_mapper_and_validator_accept_records(self):
+        """Test FieldMapper maps records into records and ProductValidator checks them"""
+        output_class = record_type(("id", "sku", "name", "price"))
+        mapper = FieldMapper({"ItemName": "name", "ItemPrice": "price"}, {}, {"price": "float"},
+                             record_type=output_class)
+        erp_record = record_type(("ItemSku", "ItemName", "ItemPrice")).from_mapping(
+            {"ItemSku": "A", "ItemPrice": "-1"}
+        )
+        eshop_record = self.record_class.from_mapping({"id": 7, "sku": "A", "price": 3.0})
+        eshop_record = dict(eshop_record, name="Kept")
+        
+        mapped = mapper.map_product_fields(erp_record, eshop_record)
+        
+        self.assertIs(type(mapped), output_class)
+        self.assertEqual(mapped, {"id": 7, "sku": "A", "name": "Kept", "price": -1.0})
+        validator = ProductValidator({"required_fields": ["id"], "positive_fields": ["price"]})
+        self.assertEqual(validator.validate_product(mapped), ["Invalid price: must be greater than 0"])
+
+
+if __name__ == '__main__':
+    unittest.main()
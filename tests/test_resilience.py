@@ -0,0 +1,286 @@
+"""
+Unit tests for sink retries, circuit breaking and dead-lettering
+"""
+
+import unittest
+import asyncio
+import os
+import random
+import tempfile
+import time
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.product_sync import ProductSync
+from src.resilience import RetryPolicy, CircuitBreaker, DeadLetterLog, CLOSED, OPEN, HALF_OPEN
+from src.sinks import HttpSink, SinkError, SinkUnavailable
+from tests.stub_server import StubServer
+
+
+class FaultInjectingStubServer(StubServer):
+    """Stub answering bulk updates with injected faults before accepting them
+
+    Faults are taken one per request: an HTTP status to answer with, a
+    (status, text) pair to answer with a non-JSON body, or "slow" to answer
+    only after slow_seconds. With down set every request gets a 500, or the
+    down fault when it is one of these.
+    """
+
+    def __init__(self, faults=(), slow_seconds=1.0):
+        super().__init__()
+        self.faults = list(faults)
+        self.slow_seconds = slow_seconds
+        self.down = False
+
+    async def handle(self, method, path, query, body):
+        if method == "POST":
+            if self.down:
+                fault = 500 if self.down is True else self.down
+            elif self.faults:
+                fault = self.faults.pop(0)
+            else:
+                fault = None
+            if fault == "slow":
+                await asyncio.sleep(self.slow_seconds)
+            elif isinstance(fault, tuple):
+                return fault[0], fault[1], {}
+            elif fault is not None:
+                return fault, {"error": "injected"}, {}
+        return await super().handle(method, path, query, body)
+
+
+class TestRetryPolicy(unittest.TestCase):
+    """Test cases for RetryPolicy"""
+
+    def test_delays_are_jittered_and_capped(self):
+        """Test delays stay below the exponential ceiling and the maximum"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0, rng=random.Random(0))
+
+        for attempt in range(10):
+            delays = [policy.delay(attempt) for _ in range(50)]
+            self.assertTrue(all(0 <= delay <= min(5.0, 2 ** attempt) for delay in delays))
+            self.assertGreater(len(set(delays)), 1)
+
+    def test_retry_after_is_honored_up_to_the_maximum(self):
+        """Test a Retry-After from the endpoint replaces the backoff, capped at max_delay"""
+        policy = RetryPolicy(base_delay=1.0, max_delay=5.0)
+
+        self.assertEqual(policy.delay(0, retry_after=3.0), 3.0)
+        self.assertEqual(policy.delay(0, retry_after=60.0), 5.0)
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Test cases for CircuitBreaker"""
+
+    def setUp(self):
+        self.now = 0.0
+        self.breaker = CircuitBreaker(failure_threshold=3, reset_timeout=10.0, clock=lambda: self.now)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the circuit opens at the threshold and successes reset the count"""
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.breaker.record_success()
+        self.breaker.record_failure()
+        self.breaker.record_failure()
+        self.assertTrue(self.breaker.allow())
+
+        with self.assertLogs(level="WARNING"):
+            self.breaker.record_failure()
+
+        self.assertEqual(self.breaker.state, OPEN)
+        self.assertFalse(self.breaker.allow())
+
+    def test_half_open_trial(self):
+        """Test one trial call is allowed after the reset timeout"""
+        with self.assertLogs(level="WARNING"):
+            for _ in range(3):
+                self.breaker.record_failure()
+
+        self.now = 10.0
+        self.assertTrue(self.breaker.allow())
+        self.assertEqual(self.breaker.state, HALF_OPEN)
+        with self.assertLogs(level="WARNING"):
+            self.breaker.record_failure()
+        self.assertFalse(self.breaker.allow())
+
+        self.now = 20.0
+        self.assertTrue(self.breaker.allow())
+        self.breaker.record_success()
+        self.assertEqual(self.breaker.state, CLOSED)
+
+
+class TestDeadLetterLog(unittest.TestCase):
+    """Test cases for DeadLetterLog"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.path = os.path.join(temp_dir.name, "dead_letters.jsonl")
+        self.log = DeadLetterLog(self.path)
+
+    def test_replay_keeps_failing_batches(self):
+        """Test replayed batches are removed and failing ones kept"""
+        self.log.write("shop", [{"sku": "A"}, {"sku": "B"}], SinkError("HTTP 500"))
+        self.log.write("shop", [{"sku": "C"}], SinkError("HTTP 500"))
+        received = []
+
+        def send(batch):
+            if batch[0]["sku"] == "C":
+                raise SinkError("still down")
+            received.extend(batch)
+
+        with self.assertLogs(level="WARNING"):
+            self.assertEqual(self.log.replay(send), (2, 1))
+
+        self.assertEqual(received, [{"sku": "A"}, {"sku": "B"}])
+        entries = self.log.read()
+        self.assertEqual([entry["products"] for entry in entries], [[{"sku": "C"}]])
+        self.assertEqual(entries[0]["error"], "still down")
+
+        self.assertEqual(self.log.replay(received.extend), (1, 0))
+        self.assertFalse(os.path.exists(self.path))
+
+
+class TestResilientPush(unittest.TestCase):
+    """Test push_to_sink against a fault-injecting Eshop stub"""
+
+    def setUp(self):
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self.dead_letter_file = os.path.join(temp_dir.name, "dead_letters.jsonl")
+        self.config = {
+            "ERP_DATA_FILE": "test_erp.json",
+            "ESHOP_DATA_FILE": "test_eshop.json",
+            "OUTPUT_FILE": "test_output.json",
+            "LOG_FILE": os.path.join(temp_dir.name, "test.log"),
+            "ERP_IDENTIFIER_FIELD": "ItemSku",
+            "ESHOP_IDENTIFIER_FIELD": "sku",
+            "FIELD_MAPPINGS": {"ItemName": "name"},
+            "VALIDATION_RULES": {"required_fields": ["id", "sku"]},
+            # A fixed batch size, so request counts do not depend on timing
+            "SINK_BATCH_SIZE": 10,
+            "SINK_MIN_BATCH_SIZE": 10,
+            "SINK_MAX_BATCH_SIZE": 10,
+            "SINK_RETRY_BASE_DELAY": 0.001,
+            "SINK_MAX_RETRIES": 2,
+            "SINK_CIRCUIT_FAILURE_THRESHOLD": 3,
+            "SINK_CIRCUIT_RESET_TIMEOUT": 60.0
+        }
+        self.products = [{"id": i, "sku": f"SKU-{i}"} for i in range(50)]
+
+    def start_server(self, server):
+        server.start_in_thread()
+        self.addCleanup(server.stop_in_thread)
+        return server
+
+    def test_transient_failures_are_retried(self):
+        """Test 5xx responses and connection errors are retried with backoff until accepted"""
+        server = self.start_server(FaultInjectingStubServer([500, 502]))
+        sync = ProductSync(self.config)
+
+        with self.assertLogs(level="WARNING"):
+            count = sync.push_to_sink(self.products, HttpSink(server.url))
+
+        self.assertEqual(count, 50)
+        self.assertEqual([p["sku"] for p in server.received], [p["sku"] for p in self.products])
+        self.assertEqual(sync.stats["dead_lettered"], 0)
+
+    def test_malformed_responses_are_retried(self):
+        """Test an HTML 5xx body and an undecodable 200 body are retried like other failures"""
+        server = self.start_server(FaultInjectingStubServer([(502, "<html>Bad Gateway</html>"), (200, "OK")]))
+        sync = ProductSync(self.config)
+
+        with self.assertLogs(level="WARNING"):
+            count = sync.push_to_sink(self.products, HttpSink(server.url))
+
+        self.assertEqual(count, 50)
+        self.assertEqual(server.requests, 7)
+        self.assertEqual(sync.stats["dead_lettered"], 0)
+
+    def test_malformed_5xx_body_is_dead_lettered(self):
+        """Test a batch that keeps getting an HTML 5xx body is retried, then dead-lettered"""
+        server = self.start_server(FaultInjectingStubServer())
+        server.down = (502, "<html><body>502 Bad Gateway</body></html>")
+        self.config["SINK_DEAD_LETTER_FILE"] = self.dead_letter_file
+        self.config["SINK_CIRCUIT_FAILURE_THRESHOLD"] = 100
+        sync = ProductSync(self.config)
+
+        with self.assertLogs(level="WARNING"):
+            count = sync.push_to_sink(self.products, HttpSink(server.url))
+
+        self.assertEqual(count, 0)
+        # Every batch is tried once and retried SINK_MAX_RETRIES times
+        self.assertEqual(server.requests, 15)
+        self.assertEqual(sync.stats["dead_lettered"], 50)
+        entries = DeadLetterLog(self.dead_letter_file).read()
+        self.assertEqual(len(entries), 5)
+        self.assertIn("502 Bad Gateway", entries[0]["error"])
+
+    def test_failures_without_dead_letter_file_stop_the_run(self):
+        """Test a batch that keeps failing raises SinkUnavailable when nothing can be dead-lettered"""
+        server = self.start_server(FaultInjectingStubServer())
+        server.down = True
+        sync = ProductSync(self.config)
+
+        with self.assertLogs(level="WARNING"):
+            with self.assertRaises(SinkUnavailable):
+                sync.push_to_sink(self.products, HttpSink(server.url))
+
+        self.assertEqual(server.requests, 3)
+
+    def test_open_circuit_dead_letters_and_replays(self):
+        """Test a down endpoint trips the circuit, batches are dead-lettered without being sent, then replayed"""
+        server = self.start_server(FaultInjectingStubServer())
+        server.down = True
+        self.config["SINK_DEAD_LETTER_FILE"] = self.dead_letter_file
+        sync = ProductSync(self.config)
+
+        with self.assertLogs(level="WARNING"):
+            count = sync.push_to_sink(self.products, HttpSink(server.url))
+
+        self.assertEqual(count, 0)
+        self.assertEqual(sync.stats["dead_lettered"], 50)
+        # Three failed attempts open the circuit; the remaining batches are not sent
+        self.assertEqual(server.requests, 3)
+        self.assertEqual(len(DeadLetterLog(self.dead_letter_file).read()), 5)
+
+        server.down = False
+        sync = ProductSync(self.config)
+        self.assertEqual(sync.replay_dead_letters(HttpSink(server.url)), 50)
+        self.assertEqual([p["sku"] for p in server.received], [p["sku"] for p in self.products])
+        self.assertFalse(os.path.exists(self.dead_letter_file))
+
+    def test_rejected_batch_is_dead_lettered_and_run_continues(self):
+        """Test a 400 is not retried, and later batches are still sent"""
+        server = self.start_server(FaultInjectingStubServer([400]))
+        self.config["SINK_DEAD_LETTER_FILE"] = self.dead_letter_file
+        sync = ProductSync(self.config)
+
+        with self.assertLogs(level="ERROR"):
+            count = sync.push_to_sink(self.products, HttpSink(server.url))
+
+        self.assertEqual(count, 40)
+        self.assertEqual(server.requests, 5)
+        self.assertEqual([p["sku"] for p in server.received], [p["sku"] for p in self.products[10:]])
+        self.assertEqual(DeadLetterLog(self.dead_letter_file).read()[0]["products"], self.products[:10])
+
+    def test_slow_endpoint_does_not_stall_the_run(self):
+        """Test timeouts open the circuit so a hanging endpoint costs a bounded time"""
+        server = self.start_server(FaultInjectingStubServer(["slow"] * 100, slow_seconds=2.0))
+        self.config["SINK_DEAD_LETTER_FILE"] = self.dead_letter_file
+        sync = ProductSync(self.config)
+
+        start = time.perf_counter()
+        with self.assertLogs(level="WARNING"):
+            count = sync.push_to_sink(self.products, HttpSink(server.url, timeout=0.05))
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(count, 0)
+        self.assertEqual(sync.stats["dead_lettered"], 50)
+        self.assertLess(elapsed, 1.0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+"""
+Unit tests for schema inference and the schema cache
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.schema import Schema, SchemaCache
+
+
+class TestSchema(unittest.TestCase):
+    """Test cases for Schema inference"""
+    
+    def test_infer_single_types(self):
+        """Test fields with one type keep it"""
+        schema = Schema.infer([{"id": 1, "name": "A", "price": 1.5, "active": True}])
+        
+        self.assertEqual(schema, {"id": "int", "name": "str", "price": "float", "active": "bool"})
+        self.assertEqual(schema.nullable, set())
+        self.assertEqual(schema.sample_size, 1)
+    
+    def test_infer_widens_numbers(self):
+        """Test int and float values reconcile to float"""
+        schema = Schema.infer([{"price": 10}, {"price": 10.5}, {"price": 3}])
+        
+        self.assertEqual(schema["price"], "float")
+    
+    def test_infer_skips_nulls(self):
+        """Test nulls and missing fields mark a field nullable without deciding its type"""
+        schema = Schema.infer([
+            {"sku": "A", "stock": None},
+            {"sku": "B", "stock": 5, "note": "x"},
+            {"sku": "C", "stock": 2, "empty": None}
+        ])
+        
+        self.assertEqual(schema["stock"], "int")
+        self.assertEqual(schema["note"], "str")
+        self.assertEqual(schema["empty"], "NoneType")
+        self.assertEqual(schema.nullable, {"stock", "note", "empty"})
+    
+    def test_infer_mixed_types_takes_most_common(self):
+        """Test non-numeric mixes take the most common type"""
+        schema = Schema.infer([{"code": "A1"}, {"code": 7}, {"code": "B2"}])
+        
+        self.assertEqual(schema["code"], "str")
+    
+    def test_covers(self):
+        """Test covers() rejects products with unknown fields"""
+        schema = Schema({"sku": "str", "stock": "int"})
+        
+        self.assertTrue(schema.covers({"sku": "A"}))
+        self.assertFalse(schema.covers({"sku": "A", "colour": "red"}))
+    
+    def test_dict_round_trip(self):
+        """Test a schema survives to_dict/from_dict"""
+        schema = Schema({"sku": "str", "stock": "int"}, {"stock"}, 10)
+        
+        restored = Schema.from_dict(json.loads(json.dumps(schema.to_dict())))
+        
+        self.assertEqual(restored, schema)
+        self.assertEqual(restored.nullable, {"stock"})
+        self.assertEqual(restored.sample_size, 10)
+
+
+class TestSchemaCache(unittest.TestCase):
+    """Test cases for SchemaCache"""
+    
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cache_file = os.path.join(self.temp_dir.name, "schema.json")
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_put_and_get_across_instances(self):
+        """Test schemas are written to disk and read by a new cache"""
+        SchemaCache(self.cache_file).put("erp:a.json", Schema({"ItemSku": "str"}, sample_size=1))
+        
+        cached = SchemaCache(self.cache_file).get("erp:a.json")
+        
+        self.assertEqual(cached, {"ItemSku": "str"})
+        self.assertIsNone(SchemaCache(self.cache_file).get("eshop:b.json"))
+    
+    def test_corrupt_file_is_ignored(self):
+        """Test an unreadable cache file behaves like an empty cache"""
+        with open(self.cache_file, 'w') as f:
+            f.write("{not json")
+        
+        cache = SchemaCache(self.cache_file)
+        
+        self.assertIsNone(cache.get("erp:a.json"))
+        cache.put("erp:a.json", Schema({"ItemSku": "str"}))
+        self.assertEqual(SchemaCache(self.cache_file).get("erp:a.json"), {"ItemSku": "str"})
+    
+    def test_unwritable_file_is_logged(self):
+        """Test a failed write is logged rather than raised"""
+        cache = SchemaCache(os.path.join(self.temp_dir.name, "missing", "schema.json"))
+        
+        with self.assertLogs(level="ERROR"):
+            cache.put("erp:a.json", Schema({"ItemSku": "str"}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,159 @@
+"""
+Unit tests for product sinks and adaptive batch sizing
+"""
+
+import unittest
+import json
+import os
+import tempfile
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.sinks import AdaptiveBatchSizer, FileSink, HttpSink, SinkError, SinkThrottled
+from tests.stub_server import StubServer
+
+
+class ThrottlingStubServer(StubServer):
+    """Stub answering bulk updates with the given statuses before accepting them"""
+
+    def __init__(self, statuses):
+        super().__init__()
+        self.statuses = list(statuses)
+
+    async def handle(self, method, path, query, body):
+        if method == "POST" and self.statuses:
+            return self.statuses.pop(0), {"error": "slow down"}, {"Retry-After": "0"}
+        return await super().handle(method, path, query, body)
+
+
+class TestAdaptiveBatchSizer(unittest.TestCase):
+    """Test cases for AdaptiveBatchSizer"""
+    
+    def test_grows_while_throughput_improves(self):
+        """Test the size grows while larger batches are faster per product"""
+        sizer = AdaptiveBatchSizer(initial_size=100, max_size=1000)
+        
+        sizer.record_success(100, 1.0)
+        sizer.record_success(150, 1.0)
+        
+        self.assertEqual(sizer.batch_size, 225)
+    
+    def test_holds_when_throughput_is_flat(self):
+        """Test the size stays put when throughput no longer improves"""
+        sizer = AdaptiveBatchSizer(initial_size=100, max_size=1000)
+        
+        sizer.record_success(100, 1.0)
+        sizer.record_success(150, 1.5)
+        
+        self.assertEqual(sizer.batch_size, 150)
+    
+    def test_shrinks_when_throughput_drops(self):
+        """Test the size shrinks when throughput falls"""
+        sizer = AdaptiveBatchSizer(initial_size=100, max_size=1000)
+        
+        sizer.record_success(100, 1.0)
+        sizer.record_success(150, 3.0)
+        
+        self.assertEqual(sizer.batch_size, 100)
+    
+    def test_throttle_halves_and_pauses_growth(self):
+        """Test throttling cuts the size and growth waits for the cooldown"""
+        sizer = AdaptiveBatchSizer(initial_size=400, min_size=50, cooldown_batches=2)
+        
+        sizer.record_throttle()
+        self.assertEqual(sizer.batch_size, 200)
+        
+        sizer.record_success(200, 0.1)
+        sizer.record_success(200, 0.1)
+        self.assertEqual(sizer.batch_size, 200)
+        
+        sizer.record_success(200, 0.1)
+        self.assertEqual(sizer.batch_size, 300)
+    
+    def test_respects_bounds(self):
+        """Test the size never leaves [min_size, max_size]"""
+        sizer = AdaptiveBatchSizer(initial_size=80, min_size=50, max_size=100)
+        
+        sizer.record_success(80, 1.0)
+        self.assertEqual(sizer.batch_size, 100)
+        
+        for _ in range(5):
+            sizer.record_throttle()
+        self.assertEqual(sizer.batch_size, 50)
+
+
+class TestFileSink(unittest.TestCase):
+    """Test cases for FileSink"""
+    
+    def test_output_matches_json_dump(self):
+        """Test batched writes produce the same file as json.dump of the full list"""
+        products = [{"id": i, "sku": f"TEST-{i:03d}", "name": "Προϊόν"} for i in range(7)]
+        
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = os.path.join(tmpdir, "out.json")
+            with FileSink(output_file) as sink:
+                sink.write_batch(products[:3])
+                sink.write_batch(products[3:])
+            
+            with open(output_file, 'r', encoding='utf-8') as f:
+                written = f.read()
+        
+        self.assertEqual(written, json.dumps(products, indent=4, ensure_ascii=False))
+    
+    def test_abort_leaves_no_file(self):
+        """Test a failed run does not replace the output file"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            output_file = os.path.join(tmpdir, "out.json")
+            
+            with self.assertRaises(RuntimeError):
+                with FileSink(output_file) as sink:
+                    sink.write_batch([{"id": 1}])
+                    raise RuntimeError("boom")
+            
+            self.assertEqual(os.listdir(tmpdir), [])
+
+
+class TestHttpSink(unittest.TestCase):
+    """Test cases for HttpSink"""
+    
+    def start_server(self, server):
+        server.start_in_thread()
+        self.addCleanup(server.stop_in_thread)
+        return server
+    
+    def test_batches_reuse_one_connection(self):
+        """Test each batch is one bulk request over a kept-alive connection"""
+        server = self.start_server(StubServer())
+        
+        with HttpSink(server.url) as sink:
+            sink.write_batch([{"sku": "A"}, {"sku": "B"}])
+            sink.write_batch([{"sku": "C"}])
+        
+        self.assertEqual([p["sku"] for p in server.received], ["A", "B", "C"])
+        self.assertEqual(server.requests, 2)
+        self.assertEqual(server.connections, 1)
+    
+    def test_429_raises_throttled(self):
+        """Test a 429 response is reported as throttling with its Retry-After"""
+        server = self.start_server(ThrottlingStubServer([429]))
+        
+        with HttpSink(server.url) as sink:
+            with self.assertRaises(SinkThrottled) as context:
+                sink.write_batch([{"sku": "A"}])
+        
+        self.assertEqual(context.exception.retry_after, 0.0)
+    
+    def test_other_errors_raise_sink_error(self):
+        """Test non-throttling error statuses are not retried as throttling"""
+        server = self.start_server(ThrottlingStubServer([400]))
+        
+        with HttpSink(server.url) as sink:
+            with self.assertRaises(SinkError) as context:
+                sink.write_batch([{"sku": "A"}])
+        
+        self.assertNotIsInstance(context.exception, SinkThrottled)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,163 @@
+"""
+Unit tests for the memory-mapped Eshop snapshot
+"""
+
+import unittest
+import json
+import os
+import pickle
+import tempfile
+import sys
+from unittest.mock import patch
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.snapshot import EshopSnapshot, SnapshotError, source_signature, write_snapshot
+
+
+class TestEshopSnapshot(unittest.TestCase):
+    """Test cases for writing and reading Eshop snapshots"""
+
+    def setUp(self):
+        """Set up a source file and its snapshot paths"""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.source_path = os.path.join(self.tmpdir.name, "eshop.json")
+        self.snapshot_path = os.path.join(self.tmpdir.name, "eshop.snapshot")
+        self.products = [
+            {"id": 1, "name": "Ώρα Café", "price": 10.5, "sku": "A-1", "stock": 3, "active": True,
+             "tags": ["x", "y"], "barcode": 2 ** 70},
+            {"id": 2, "name": None, "price": 0.0, "sku": "B-2", "active": False, "note": None},
+            {"id": 3, "name": "", "price": -1.25, "sku": "A-1", "stock": None, "tags": {"k": 1}}
+        ]
+        self._write_source()
+
+    def tearDown(self):
+        """Clean up temporary files"""
+        self.tmpdir.cleanup()
+
+    def _write_source(self, products=None):
+        with open(self.source_path, 'w', encoding='utf-8') as f:
+            json.dump({"products": products or self.products}, f)
+
+    def _write_snapshot(self):
+        return write_snapshot(self.snapshot_path, lambda: self.products, "sku", source_signature(self.source_path))
+
+    def test_round_trip(self):
+        """Test types, nulls and missing fields survive a snapshot"""
+        self.assertEqual(self._write_snapshot(), 3)
+        snapshot = EshopSnapshot(self.snapshot_path)
+        try:
+            self.assertEqual(len(snapshot), 3)
+            self.assertEqual(list(snapshot), self.products)
+            self.assertEqual(snapshot[1:], self.products[1:])
+            self.assertEqual(snapshot[-1].to_dict(), self.products[-1])
+            self.assertEqual(dict(snapshot[0]), self.products[0])
+            self.assertIs(snapshot[0]["active"], True)
+            self.assertIsNone(snapshot[1]["name"])
+            self.assertNotIn("stock", snapshot[1])
+            self.assertEqual(snapshot[1].get("stock", "missing"), "missing")
+            with self.assertRaises(KeyError):
+                snapshot[1]["tags"]
+            with self.assertRaises(IndexError):
+                snapshot[3]
+        finally:
+            snapshot.close()
+
+    def test_iterate_selected_fields(self):
+        """Test iteration decodes only the selected fields, across chunks"""
+        self._write_snapshot()
+        snapshot = EshopSnapshot(self.snapshot_path, ["sku", "stock", "unknown"])
+        try:
+            self.assertEqual(list(snapshot.iter_products(chunk_size=2)), [
+                {"sku": "A-1", "stock": 3}, {"sku": "B-2"}, {"sku": "A-1", "stock": None}
+            ])
+        finally:
+            snapshot.close()
+
+    def test_find_first_sku(self):
+        """Test the SKU index finds the first product with a SKU"""
+        self._write_snapshot()
+        snapshot = EshopSnapshot(self.snapshot_path)
+        try:
+            self.assertEqual(snapshot.find("A-1")["id"], 1)
+            self.assertEqual(snapshot.find("B-2")["id"], 2)
+            self.assertIsNone(snapshot.find("C-3"))
+            self.assertIsNone(snapshot.find(None))
+        finally:
+            snapshot.close()
+
+    def test_open_detects_stale_snapshot(self):
+        """Test a snapshot is only used while its source file is unchanged"""
+        self.assertIsNone(EshopSnapshot.open(self.snapshot_path, self.source_path))
+
+        self._write_snapshot()
+        snapshot = EshopSnapshot.open(self.snapshot_path, self.source_path)
+        self.assertIsNotNone(snapshot)
+        snapshot.close()
+
+        # The source is only hashed once its mtime changed
+        with patch('src.snapshot.source_signature') as signature:
+            snapshot = EshopSnapshot.open(self.snapshot_path, self.source_path)
+            self.assertIsNotNone(snapshot)
+            snapshot.close()
+            signature.assert_not_called()
+
+        # Unchanged content with a new mtime
+        stat = os.stat(self.source_path)
+        os.utime(self.source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10 ** 9))
+        snapshot = EshopSnapshot.open(self.snapshot_path, self.source_path)
+        self.assertIsNotNone(snapshot)
+        snapshot.close()
+
+        # Same size, different content and a new mtime
+        with open(self.source_path, 'r+', encoding='utf-8') as f:
+            content = f.read().replace("A-1", "A-9")
+            f.seek(0)
+            f.write(content)
+        os.utime(self.source_path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 2 * 10 ** 9))
+        self.assertEqual(os.path.getsize(self.source_path), stat.st_size)
+        self.assertIsNone(EshopSnapshot.open(self.snapshot_path, self.source_path))
+
+    def test_open_ignores_corrupt_snapshot(self):
+        """Test an unreadable snapshot is treated as missing"""
+        with open(self.snapshot_path, 'wb') as f:
+            f.write(b"not a snapshot at all, just some bytes")
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(EshopSnapshot.open(self.snapshot_path, self.source_path))
+
+        self._write_snapshot()
+        with open(self.snapshot_path, 'r+b') as f:
+            f.truncate(200)
+        with self.assertLogs(level='WARNING'):
+            self.assertIsNone(EshopSnapshot.open(self.snapshot_path, self.source_path))
+
+    def test_rows_pickle_as_dicts(self):
+        """Test rows can be sent to worker processes"""
+        self._write_snapshot()
+        snapshot = EshopSnapshot(self.snapshot_path)
+        try:
+            row = pickle.loads(pickle.dumps(snapshot[0]))
+        finally:
+            snapshot.close()
+
+        self.assertIs(type(row), dict)
+        self.assertEqual(row, self.products[0])
+
+    def test_write_rejects_changed_products(self):
+        """Test products changing between the two passes are detected"""
+        passes = [self.products, self.products[:2]]
+
+        with self.assertRaises(ValueError):
+            write_snapshot(self.snapshot_path, passes.pop, "sku", source_signature(self.source_path))
+        self.assertFalse(os.path.exists(self.snapshot_path))
+
+    def test_write_failure(self):
+        """Test an unwritable snapshot path raises SnapshotError"""
+        snapshot_path = os.path.join(self.tmpdir.name, "missing", "eshop.snapshot")
+
+        with self.assertRaises(SnapshotError):
+            write_snapshot(snapshot_path, lambda: self.products, "sku", source_signature(self.source_path))
+
+
+if __name__ == '__main__':
+    unittest.main()
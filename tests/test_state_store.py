@@ -0,0 +1,79 @@
+"""
+Unit tests for SyncStateStore class
+"""
+
+import unittest
+import tempfile
+import os
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.field_mapper import FieldMapper
+from src.money import Money
+from src.state_store import SyncStateStore
+
+
+class TestSyncStateStore(unittest.TestCase):
+    """Test cases for SyncStateStore functionality"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.db_path = os.path.join(self.temp_dir.name, "state.db")
+        self.store = SyncStateStore(self.db_path, ["ItemName", "ItemPrice"], "config-v1")
+    
+    def tearDown(self):
+        self.temp_dir.cleanup()
+    
+    def test_hash_product_uses_mapped_fields_only(self):
+        """Test hashes change with mapped fields and ignore unmapped ones"""
+        product = {"ItemSku": "TEST-001", "ItemName": "Test", "ItemPrice": "10.00", "ItemWarehouse": "A"}
+        
+        base_hash = self.store.hash_product(product)
+        
+        self.assertEqual(base_hash, self.store.hash_product(dict(product, ItemWarehouse="B")))
+        self.assertNotEqual(base_hash, self.store.hash_product(dict(product, ItemPrice="10.01")))
+    
+    def test_save_and_load_hashes(self):
+        """Test hashes persist across store instances"""
+        self.assertEqual(self.store.load_hashes(), {})
+        
+        self.store.save_hashes({"TEST-001": "a", "TEST-002": "b"})
+        self.store.save_hashes({"TEST-002": "c"})
+        
+        reopened = SyncStateStore(self.db_path, ["ItemName", "ItemPrice"], "config-v1")
+        self.assertEqual(reopened.load_hashes(), {"TEST-001": "a", "TEST-002": "c"})
+    
+    def test_config_change_discards_hashes(self):
+        """Test a different configuration fingerprint invalidates stored hashes"""
+        self.store.save_hashes({"TEST-001": "a"})
+        
+        changed = SyncStateStore(self.db_path, ["ItemName", "ItemPrice"], "config-v2")
+        self.assertEqual(changed.load_hashes(), {})
+        
+        changed.save_hashes({"TEST-002": "b"})
+        self.assertEqual(changed.load_hashes(), {"TEST-002": "b"})
+    
+    def test_synced_values_keep_their_type(self):
+        """Test Money amounts are stored as numbers and cast back to their field's type"""
+        mapper = FieldMapper({"ItemPrice": "price", "ItemStock": "stock"}, {}, {"stock": "int"},
+                             money_fields=["price"])
+        self.store.save_hashes({}, {"TEST-001": {"price": Money.parse("12.50"), "stock": 3}})
+        
+        self.assertEqual(self.store.load_synced_values(), {"TEST-001": {"price": 12.5, "stock": 3}})
+        
+        values = self.store.load_synced_values(mapper.cast_to_eshop_type)["TEST-001"]
+        self.assertIs(type(values["price"]), Money)
+        self.assertEqual(values, {"price": Money.parse("12.50"), "stock": 3})
+    
+    def test_fingerprint_is_stable(self):
+        """Test fingerprints ignore dictionary ordering"""
+        self.assertEqual(
+            SyncStateStore.fingerprint({"a": 1, "b": 2}),
+            SyncStateStore.fingerprint({"b": 2, "a": 1})
+        )
+
+
+if __name__ == '__main__':
+    unittest.main()
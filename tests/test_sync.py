@@ -10,6 +10,7 @@ import os
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from src.field_mapper import FieldMapper
+from src.money import Money
 from src.validator import ProductValidator
 
 class TestFieldMapper(unittest.TestCase):
@@ -63,6 +64,107 @@ class TestFieldMapper(unittest.TestCase):
         
         self.assertEqual(result, expected)
 
+    def test_mapping_plan_compiled_once(self):
+        """Test converters are resolved at construction"""
+        self.assertEqual(self.mapper.mapping_plan, [
+            ("ItemName", "name", str),
+            ("ItemPrice", "price", float),
+            ("ItemStock", "stock", int)
+        ])
+    
+    def test_cast_fallbacks(self):
+        """Test casting of unknown types, missing types and failed conversions"""
+        mapper = FieldMapper({}, {}, {"stock": "int", "created": "datetime"})
+        
+        self.assertEqual(mapper.cast_to_eshop_type("2026-01-15", "created"), "2026-01-15")
+        self.assertEqual(mapper.cast_to_eshop_type(5, "unknown"), 5)
+        self.assertIsNone(mapper.cast_to_eshop_type(None, "stock"))
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(mapper.cast_to_eshop_type("many", "stock"), "many")
+        self.assertIn("Failed to cast value many to type int", logs.output[0])
+    
+    def test_cast_failures_counted_per_field(self):
+        """Test failed casts are counted per Eshop field"""
+        with self.assertLogs(level="WARNING"):
+            self.mapper.map_product_fields({"ItemPrice": "n/a", "ItemStock": "many"}, {"id": 1, "sku": "A"})
+            self.mapper.cast_to_eshop_type("lots", "stock")
+        
+        self.assertEqual(self.mapper.cast_failures, {"price": 1, "stock": 2})
+    
+    def test_money_fields(self):
+        """Test money fields are cast to exact Money amounts"""
+        mapper = FieldMapper(self.field_mappings, self.erp_field_types, self.eshop_field_types, ["price"])
+        
+        result = mapper.map_product_fields({"ItemPrice": "32.10", "ItemStock": "3"}, {"id": 1, "sku": "A"})
+        
+        self.assertIsInstance(result["price"], Money)
+        self.assertEqual(result["price"].minor, 3210)
+        self.assertEqual(result["stock"], 3)
+        with self.assertLogs(level="WARNING") as logs:
+            self.assertEqual(mapper.cast_to_eshop_type("n/a", "price"), "n/a")
+        self.assertIn("to type Money", logs.output[0])
+        self.assertEqual(mapper.cast_failures, {"price": 1})
+    
+    def test_map_product_fields_falls_back_to_eshop_value(self):
+        """Test fields missing in ERP keep the Eshop value"""
+        result = self.mapper.map_product_fields(
+            {"ItemName": "New Name", "ItemStock": None},
+            {"id": 1, "sku": "TEST-001", "price": "12.5", "stock": 3}
+        )
+        
+        self.assertEqual(result, {"id": 1, "sku": "TEST-001", "name": "New Name", "price": 12.5, "stock": None})
+    
+    def test_diff_product_fields(self):
+        """Test change detection between mapped and Eshop products"""
+        eshop_product = {"id": 123, "sku": "TEST-001", "name": "Test Product", "price": 99.99, "stock": 10}
+        mapped_product = dict(eshop_product, price=89.99)
+        
+        self.assertEqual(self.mapper.diff_product_fields(eshop_product, eshop_product), {})
+        self.assertEqual(
+            self.mapper.diff_product_fields(mapped_product, eshop_product),
+            {"price": {"old": 99.99, "new": 89.99}}
+        )
+
+    def test_eshop_owned_fields_map_back_to_erp(self):
+        """Test Eshop-owned fields keep the Eshop value and are cast back to the ERP type"""
+        mapper = FieldMapper(self.field_mappings, {"ItemName": "str", "ItemPrice": "str", "ItemStock": "str"},
+                             self.eshop_field_types, field_ownership={"price": "erp", "stock": "eshop"})
+        erp_product = {"ItemName": "New Name", "ItemPrice": "12.50", "ItemStock": "10"}
+        eshop_product = {"id": 1, "sku": "TEST-001", "name": "Old Name", "price": 9.99, "stock": 7}
+        
+        self.assertEqual(mapper.map_product_fields(erp_product, eshop_product),
+                         {"id": 1, "sku": "TEST-001", "name": "New Name", "price": 12.5, "stock": 7})
+        self.assertEqual(mapper.map_erp_update(erp_product, eshop_product), {"ItemStock": "7"})
+        self.assertEqual(mapper.map_erp_update(dict(erp_product, ItemStock="7"), eshop_product), {})
+        self.assertEqual(mapper.map_erp_update(erp_product, dict(eshop_product, stock=None)), {})
+        self.assertEqual(self.mapper.map_erp_update(erp_product, eshop_product), {})
+    
+    def test_shared_fields_reconcile_with_last_sync(self):
+        """Test shared stock keeps ERP restocks and reports Eshop sales as adjustments"""
+        mapper = FieldMapper(self.field_mappings, {"ItemName": "str", "ItemPrice": "str", "ItemStock": "str"},
+                             self.eshop_field_types, field_ownership={"stock": "shared"})
+        # Last sync left 10 in stock; the ERP restocked 5 and the Eshop sold 3 since
+        erp_product = {"ItemName": "Name", "ItemPrice": "12.50", "ItemStock": "15"}
+        eshop_product = {"id": 1, "sku": "TEST-001", "name": "Name", "price": 12.5, "stock": 7}
+        
+        self.assertEqual(mapper.map_product_fields(erp_product, eshop_product, {"stock": 10})["stock"], 12)
+        self.assertEqual(mapper.map_erp_update(erp_product, eshop_product, {"stock": 10}),
+                         {"adjustments": {"ItemStock": -3}})
+        self.assertEqual(mapper.map_erp_update(erp_product, eshop_product, {"stock": 7}), {})
+        
+        # Without a last sync the ERP value is taken and nothing is reported
+        self.assertEqual(mapper.map_product_fields(erp_product, eshop_product)["stock"], 15)
+        self.assertEqual(mapper.map_erp_update(erp_product, eshop_product), {})
+    
+    def test_invalid_field_ownership(self):
+        """Test unknown owners and unmapped fields are rejected"""
+        with self.assertRaises(ValueError):
+            FieldMapper(self.field_mappings, self.erp_field_types, self.eshop_field_types,
+                        field_ownership={"stock": "warehouse"})
+        with self.assertRaises(ValueError):
+            FieldMapper(self.field_mappings, self.erp_field_types, self.eshop_field_types,
+                        field_ownership={"weight": "eshop"})
+
 class TestProductValidator(unittest.TestCase):
     
     def setUp(self):
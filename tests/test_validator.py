@@ -5,6 +5,11 @@ Unit tests for ProductValidator class
 import unittest
 from src.validator import ProductValidator
 
+try:
+    import numpy as np
+except ImportError:
+    np = None
+
 
 class TestProductValidator(unittest.TestCase):
     """Test cases for ProductValidator functionality"""
@@ -141,6 +146,61 @@ class TestProductValidator(unittest.TestCase):
         errors = self.validator.validate_product(valid_product)
         self.assertEqual(len(errors), 0)
     
+    def test_validate_product_valid_returns_new_empty_list(self):
+        """Test valid products get their own empty error list"""
+        first = self.validator.validate_product(self.valid_product)
+        second = self.validator.validate_product(dict(self.valid_product, price=5))
+        
+        self.assertEqual(first, [])
+        self.assertIsNot(first, second)
+        first.append("Checked by caller")
+        self.assertEqual(second, [])
+    
+    def test_validate_product_fail_fast(self):
+        """Test fail-fast mode stops at the first error"""
+        invalid_product = {"id": 123, "price": -1}
+        
+        self.assertEqual(self.validator.validate_product(invalid_product, fail_fast=True), ["Missing sku"])
+        self.assertEqual(len(self.validator.validate_product(invalid_product)), 4)
+    
+    def test_is_valid(self):
+        """Test boolean validity check"""
+        self.assertTrue(self.validator.is_valid(self.valid_product))
+        self.assertFalse(self.validator.is_valid(dict(self.valid_product, stock=None)))
+    
+    def test_validate_product_error_order(self):
+        """Test errors are reported as required, non-null, then positive checks"""
+        errors = self.validator.validate_product({"price": "abc"})
+        
+        self.assertEqual(errors, [
+            "Missing id", "Missing sku", "Missing name", "Missing stock", "Invalid price format: abc"
+        ])
+    
+    def test_validate_product_positive_values(self):
+        """Test positive checks across value types"""
+        cases = [
+            (1, 0), (0.5, 0), (True, 0), ("3", 0), (float("nan"), 0),
+            (0, 1), (-2.5, 1), (False, 1), ("-1", 1), ("0.0", 1), ([1], 1)
+        ]
+        
+        for value, error_count in cases:
+            with self.subTest(value=value):
+                errors = self.validator.validate_product(dict(self.valid_product, price=value))
+                self.assertEqual(len(errors), error_count)
+    
+    def test_failure_counts(self):
+        """Test failed checks are counted per rule and field"""
+        self.validator.validate_product(self.valid_product)
+        self.validator.validate_product({"id": 1, "price": -1, "stock": None})
+        self.validator.validate_product({"id": 2, "sku": "X", "name": "Y", "price": 0, "stock": 1})
+        
+        self.assertEqual(self.validator.failure_counts, {
+            ("required_fields", "sku"): 1,
+            ("required_fields", "name"): 1,
+            ("non_null_fields", "stock"): 1,
+            ("positive_fields", "price"): 2
+        })
+    
     def test_log_product_errors(self):
         """Test error logging functionality"""
         import tempfile
@@ -166,5 +226,88 @@ class TestProductValidator(unittest.TestCase):
             os.unlink(log_file)
 
 
+@unittest.skipIf(np is None, "numpy is not installed")
+class TestProductValidatorBatch(unittest.TestCase):
+    """Test cases for columnar batch validation"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.validator = ProductValidator({
+            "required_fields": ["id", "sku", "name"],
+            "positive_fields": ["price"],
+            "non_null_fields": ["stock"]
+        })
+        self.products = [
+            {"id": 1, "sku": "A", "name": "Valid", "price": 10.5, "stock": 3},
+            {"id": 2, "sku": "", "name": "Empty SKU", "price": 0, "stock": None},
+            {"id": 0, "sku": "C", "price": -1.0, "stock": 0},
+            {"id": 4, "sku": "D", "name": "String price", "price": "12.00", "stock": 1},
+            {"id": 5, "sku": "E", "name": "Bad price", "price": "abc", "stock": 1},
+            {"id": 6, "sku": "F", "name": "No price", "stock": 1},
+            {"id": 7, "sku": "G", "name": "Bool price", "price": True, "stock": 1},
+            {"id": None, "sku": None, "name": None, "price": [1], "stock": None}
+        ]
+    
+    def test_validate_batch_matches_validate_product(self):
+        """Test batch results match validate_product row by row"""
+        result = self.validator.validate_batch(self.validator.build_columns(self.products))
+        
+        for row, product in enumerate(self.products):
+            with self.subTest(row=row):
+                expected = list(self.validator.validate_product(product))
+                self.assertEqual(result.errors.get(row, []), expected)
+                self.assertEqual(bool(result.valid_mask[row]), not expected)
+    
+    def test_validate_batch_numeric_only_column(self):
+        """Test numeric columns use vectorized comparisons"""
+        products = [p for p in self.products if type(p.get("price")) in (int, float)]
+        columns = self.validator.build_columns(products)
+        columns["price"] = columns["price"].astype(np.float64)
+        
+        result = self.validator.validate_batch(columns)
+        
+        for row, product in enumerate(products):
+            self.assertEqual(result.errors.get(row, []), list(self.validator.validate_product(product)))
+    
+    def test_validate_batch_bitmap(self):
+        """Test bitmap bits follow the check plan order"""
+        result = self.validator.validate_batch(self.validator.build_columns(self.products[:2]))
+        
+        self.assertEqual(int(result.bitmap[0]), 0)
+        # sku (bit 1), stock (bit 3) and price (bit 4) failed
+        self.assertEqual(int(result.bitmap[1]), 0b11010)
+    
+    def test_validate_batch_missing_column(self):
+        """Test fields without a column are reported missing"""
+        result = self.validator.validate_batch({"id": np.array([1, 2])})
+        
+        self.assertEqual(result.errors[0], ["Missing sku", "Missing name", "Missing stock", "Missing price"])
+
+    def test_validate_batch_matches_validate_product_on_generated_rows(self):
+        """Test batch results match validate_product over a mixed generated catalog"""
+        import random
+        from decimal import Decimal
+        from src.money import Money
+
+        rng = random.Random(8)
+        values = [None, 0, 1, -1, 2.5, -0.5, 0.0, float("nan"), "", "x", "7", " 3.5 ", "0",
+                  "-2", "abc", True, False, [], [1], {}, Decimal("1.10"), Decimal("0"),
+                  Money.parse("4.20"), Money.parse("0.00"), 10 ** 20]
+        products = []
+        for index in range(2000):
+            product = {}
+            for field in ("id", "sku", "name", "price", "stock"):
+                if rng.random() < 0.9:
+                    product[field] = rng.choice(values)
+            products.append(product)
+
+        result = self.validator.validate_batch(self.validator.build_columns(products))
+
+        for row, product in enumerate(products):
+            expected = list(self.validator.validate_product(product))
+            self.assertEqual(result.errors.get(row, []), expected, product)
+            self.assertEqual(bool(result.valid_mask[row]), not expected)
+
+
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,90 @@
+"""
+Unit tests for the file watcher
+"""
+
+import unittest
+import os
+import tempfile
+import threading
+import sys
+
+sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
+
+from src.watcher import FileWatcher, file_signature
+
+
+class TestFileWatcher(unittest.TestCase):
+    """Test cases for FileWatcher with inotify and with polling"""
+    
+    use_inotify = True
+    
+    def setUp(self):
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.file_path = os.path.join(self.tmpdir.name, "erp.json")
+        self.write("v1")
+        self.watcher = FileWatcher(self.file_path, interval=0.05, debounce=0.02, use_inotify=self.use_inotify)
+        self.addCleanup(self.watcher.close)
+    
+    def write(self, content):
+        with open(self.file_path, 'w') as f:
+            f.write(content)
+    
+    def write_later(self, content, delay=0.05):
+        timer = threading.Timer(delay, self.write, (content,))
+        timer.start()
+        self.addCleanup(timer.join)
+    
+    def test_detects_change(self):
+        """Test a rewritten file is reported once"""
+        self.write_later("version 2")
+        
+        self.assertTrue(self.watcher.wait_for_change(timeout=5))
+        self.assertEqual(self.watcher.signature, file_signature(self.file_path))
+        self.assertFalse(self.watcher.wait_for_change(timeout=0.1))
+    
+    def test_detects_atomic_replace(self):
+        """Test a file replaced by rename is reported"""
+        def replace():
+            temp_path = self.file_path + ".tmp"
+            with open(temp_path, 'w') as f:
+                f.write("v2")
+            os.replace(temp_path, self.file_path)
+        
+        timer = threading.Timer(0.05, replace)
+        timer.start()
+        self.addCleanup(timer.join)
+        
+        self.assertTrue(self.watcher.wait_for_change(timeout=5))
+    
+    def test_timeout_without_change(self):
+        """Test waiting times out when nothing changes"""
+        self.assertFalse(self.watcher.wait_for_change(timeout=0.1))
+    
+    def test_stop_event(self):
+        """Test a set stop event ends the wait"""
+        stop_event = threading.Event()
+        stop_event.set()
+        
+        self.assertFalse(self.watcher.wait_for_change(stop_event=stop_event))
+    
+    def test_missing_file_is_not_a_change(self):
+        """Test a file that disappears is not reported until it is back"""
+        os.unlink(self.file_path)
+        self.assertFalse(self.watcher.wait_for_change(timeout=0.1))
+        
+        self.write_later("back")
+        self.assertTrue(self.watcher.wait_for_change(timeout=5))
+
+
+class TestPollingFileWatcher(TestFileWatcher):
+    """Test cases for FileWatcher without inotify"""
+    
+    use_inotify = False
+    
+    def test_uses_polling(self):
+        self.assertFalse(self.watcher.uses_inotify)
+
+
+if __name__ == '__main__':
+    unittest.main()